@@ -0,0 +1,202 @@
+"""Reproducible benchmark of the estimation pipeline
+
+Measures the latency of each stage of `get_estimation` and of the whole
+call, the latency of the similarity search and of the text and metadata
+suggestions alone, and the sequential throughput of the `/overview` and
+`/estimation` endpoints with the Flask test client.
+
+The projects are variants of the mock estimation request, with short and
+long content in every domain and type. The token and peer group caches
+are disabled, so every estimation segments its texts and aggregates its
+peers. Without `--data`, the stand-in data of `make_bundle.py` is
+generated with a fixed seed into a temporary directory, so the results
+only depend on the code and the machine.
+
+    Typical usage example:
+
+    python benchmarks/bench_estimation.py --output baseline.json
+    python benchmarks/bench_estimation.py --baseline baseline.json
+    python benchmarks/bench_estimation.py --data main/app/data
+
+"""
+import argparse
+import copy
+import json
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from unittest import mock
+
+import numpy as np
+
+from make_bundle import make_bundle
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(1, str(FILE_PATH / '../main'))
+
+MOCK_PATH = FILE_PATH / '../mock_data/estimation_request.json'
+LONG_CONTENT_REPEAT = 8
+SHORT_CONTENT_LENGTH = 100
+
+def get_variants(request: dict, categories: 'dict[str, list[str]]') -> 'list[dict]':
+    """Returns requests with short and long content in every domain and type"""
+    paragraphs = [p for p in request['content'].splitlines() if p.strip()]
+    contents = {
+        'short': request['content'][:SHORT_CONTENT_LENGTH],
+        'long': '\n'.join(paragraphs * LONG_CONTENT_REPEAT)
+    }
+    return [
+        {**request, 'domain': domain, 'type': project_type, 'content': content}
+        for content in contents.values()
+        for domain in categories['domain']
+        for project_type in categories['type']
+    ]
+
+def summarize(seconds: 'list[float]') -> dict:
+    """Returns count, mean and percentiles of samples in milliseconds"""
+    samples = np.asarray(seconds) * 1000
+    return {
+        'count': len(samples),
+        'mean': float(np.mean(samples)),
+        'p50': float(np.percentile(samples, 50)),
+        'p95': float(np.percentile(samples, 95))
+    }
+
+def measure(func, samples: 'list[float]'):
+    """Calls func and appends its seconds to samples"""
+    start_time = time.perf_counter()
+    result = func()
+    samples.append(time.perf_counter() - start_time)
+    return result
+
+def run(args: argparse.Namespace) -> dict:
+    """Runs the benchmark on the data of DATA_DIR and returns the result"""
+    # pylint: disable=import-error,import-outside-toplevel
+    from app import app
+    from app.utils.estimate import get_estimation, metadata_encoder, tokenize, vectorize
+    from app.utils.metrics import metrics
+    from app.utils.registry import registry
+    from app.utils.schema import ProjectSchema
+    from app.utils.suggest import get_meta_suggestion, get_similar_project, get_text_suggestion
+
+    with open(MOCK_PATH, 'r', encoding='utf-8') as file:
+        request = json.load(file)
+    variants = get_variants(request, metadata_encoder.categories)
+    projects = [ProjectSchema().load(v) for v in variants]
+    for name in registry.loaders:
+        registry.get(name)
+    get_estimation(copy.deepcopy(projects[0]))
+
+    stages = defaultdict(list)
+    functions = defaultdict(list)
+    with mock.patch.object(metrics, 'observe', lambda s, t: stages[s].append(t)):
+        for _ in range(args.repeat):
+            for project in projects:
+                measure(lambda p=copy.deepcopy(project): get_estimation(p), functions['estimation'])
+    for _ in range(args.repeat):
+        for project in projects:
+            project = copy.deepcopy(project)
+            metadata_encoder.encode([project])
+            tokens = tokenize([project])[0]
+            vector = {c: v[0] for c, v in vectorize([tokens])[0].items()}
+            sim_proj, _ = measure(lambda v=vector: get_similar_project(v),
+                                  functions['similar_project'])
+            measure(lambda s=sim_proj, t=tokens: get_text_suggestion(s, t),
+                    functions['text_suggestion'])
+            measure(lambda s=sim_proj, p=project: get_meta_suggestion(s, p),
+                    functions['meta_suggestion'])
+
+    throughput = {}
+    client = app.test_client()
+    for endpoint, call in [
+        ('/overview', lambda i: client.get('/overview')),
+        ('/estimation', lambda i: client.post('/estimation', json=variants[i % len(variants)]))
+    ]:
+        call(0)
+        start_time = time.perf_counter()
+        for i in range(args.requests):
+            response = call(i)
+            if response.status_code != 200:
+                raise RuntimeError(f'{endpoint} responded {response.status_code}')
+        throughput[endpoint] = args.requests / (time.perf_counter() - start_time)
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'data': str(args.data) if args.data else 'synthetic',
+            'variants': len(variants),
+            'repeat': args.repeat
+        },
+        'loading': {k: v['seconds'] for k, v in registry.status().items()},
+        'stages': {k: summarize(v) for k, v in sorted(stages.items())},
+        'functions': {k: summarize(v) for k, v in functions.items()},
+        'throughput': throughput
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints the changes against baseline, returns false on a regression"""
+    print(f'{"metric":>36} {"baseline":>10} {"current":>10} {"change":>8}')
+    passed = True
+    rows = [
+        (f'{group}.{name} p50 (ms)', baseline[group][name]['p50'], value['p50'], False)
+        for group in ['stages', 'functions']
+        for name, value in result[group].items()
+        if name in baseline.get(group, {})
+    ] + [
+        (f'{name} (req/s)', baseline['throughput'][name], value, True)
+        for name, value in result['throughput'].items()
+        if name in baseline.get('throughput', {})
+    ]
+    for name, before, after, higher_is_better in rows:
+        change = after / before - 1 if before else 0.
+        regressed = -change > tolerance if higher_is_better else change > tolerance
+        passed = passed and not regressed
+        print(f'{name:>36} {before:>10.3f} {after:>10.3f} {change:>+7.1%}'
+              f'{" !" if regressed else ""}')
+    return passed
+
+def main() -> None:
+    """Runs the benchmark, writes and compares the result"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--data', type=pathlib.Path, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--output', type=pathlib.Path, default=None)
+    parser.add_argument('--baseline', type=pathlib.Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=.2)
+    args = parser.parse_args()
+    os.environ.update({
+        'TOKEN_CACHE_SIZE': '0',
+        'TOKEN_CACHE_DIR': '',
+        'PEER_CACHE_SIZE': '0',
+        'MODEL_WARM_UP': '0',
+        'METRICS_LOG_SAMPLE_RATE': '0'
+    })
+    with tempfile.TemporaryDirectory() as directory:
+        if args.data is None:
+            make_bundle(directory)
+        os.environ['DATA_DIR'] = str(args.data or directory)
+        result = run(args)
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=2)
+    print(f'{"function":>36} {"p50 (ms)":>10} {"p95 (ms)":>10}')
+    for group in ['stages', 'functions']:
+        for name, value in result[group].items():
+            print(f'{group + "." + name:>36} {value["p50"]:>10.3f} {value["p95"]:>10.3f}')
+    for name, value in result['throughput'].items():
+        print(f'{name:>36} {value:>10.1f} req/s')
+    if args.baseline is not None:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if not compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
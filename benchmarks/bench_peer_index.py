@@ -0,0 +1,75 @@
+"""Recall and latency benchmark of the peer retrieval index
+
+Compares the approximate IVF index against the exact top-20 peers for a
+range of probed clusters. Queries are taken from the dataset vectors
+themselves (with `--source data`) or from synthetic clustered vectors.
+
+    Typical usage example:
+
+    python benchmarks/bench_peer_index.py
+    python benchmarks/bench_peer_index.py --source data --probes 1 4 16
+
+"""
+import argparse
+import pathlib
+import pickle
+import sys
+import time
+
+import numpy as np
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(1, str(FILE_PATH / '../main'))
+
+from app.utils.peer_index import ExactIndex, IVFIndex # pylint: disable=import-error,wrong-import-position
+
+DATA_PATH = FILE_PATH / '../main/app/data/model/vectors_norm.pickle'
+
+def synthetic_vectors(n_projects: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Returns normalized vectors scattered around random topics"""
+    topics = rng.random((max(1, n_projects // 100), dim)) ** 8
+    vectors = topics[rng.integers(len(topics), size=n_projects)]
+    vectors = vectors + rng.random((n_projects, dim)) ** 16
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def main() -> None:
+    """Runs the benchmark and prints the result table"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--source', choices=['synthetic', 'data'], default='synthetic')
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--lists', type=int, default=None)
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--threshold', type=float, default=.05)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    if args.source == 'data':
+        with open(DATA_PATH, 'rb') as file:
+            vectors = pickle.load(file)['content']
+    else:
+        vectors = synthetic_vectors(args.projects, args.dim, rng)
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+
+    start_time = time.perf_counter()
+    ivf = IVFIndex.build(vectors, n_lists=args.lists)
+    print(f'projects: {len(vectors)}, clusters: {len(ivf.centroids)}, '
+          f'build: {time.perf_counter() - start_time:.2f}s')
+
+    exact = ExactIndex(vectors)
+    start_time = time.perf_counter()
+    truth = [set(exact.search(q, args.k, args.threshold)[0]) for q in queries]
+    exact_time = (time.perf_counter() - start_time) / len(queries)
+    print(f'{"backend":>10} {"probes":>6} {"recall@" + str(args.k):>10} {"latency (ms)":>13}')
+    print(f'{"exact":>10} {"-":>6} {1:>10.3f} {exact_time * 1000:>13.3f}')
+    for n_probe in args.probes:
+        ivf.n_probe = min(n_probe, len(ivf.centroids))
+        start_time = time.perf_counter()
+        found = [set(ivf.search(q, args.k, args.threshold)[0]) for q in queries]
+        ivf_time = (time.perf_counter() - start_time) / len(queries)
+        recall = np.mean([len(f & t) / len(t) if t else 1. for f, t in zip(found, truth)])
+        print(f'{"ivf":>10} {ivf.n_probe:>6} {recall:>10.3f} {ivf_time * 1000:>13.3f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Serialization benchmark of the estimation response
+
+Compares marshalling the mock estimation response with
+EstimationResponseSchema and `jsonify` against FastSerializer, with
+orjson and with the json module fallback.
+
+    Typical usage example:
+
+    python benchmarks/bench_serializer.py
+    python benchmarks/bench_serializer.py --repeat 1000
+
+"""
+import argparse
+import json
+import pathlib
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(1, str(FILE_PATH / '../main'))
+
+from flask import jsonify # pylint: disable=wrong-import-position
+from app import app # pylint: disable=import-error,wrong-import-position
+from app.views.estimation import EstimationResponseSchema, estimation_serializer # pylint: disable=import-error,wrong-import-position
+
+MOCK_PATH = FILE_PATH / '../mock_data/estimation_response.json'
+
+def measure(func, repeat: int) -> float:
+    """Returns the median seconds of func"""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start_time)
+    return float(np.median(times))
+
+def main() -> None:
+    """Runs the benchmark and prints the result table"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+    with open(MOCK_PATH, 'r', encoding='utf-8') as file:
+        response = json.load(file)
+    schema = EstimationResponseSchema()
+    with app.app_context():
+        before = measure(lambda: jsonify(schema.dump(response)), args.repeat)
+        fast = measure(lambda: estimation_serializer.make_response(response), args.repeat)
+        with mock.patch('app.utils.serializer.orjson', None):
+            fallback = measure(lambda: estimation_serializer.make_response(response), args.repeat)
+    print(f'{"serializer":>12} {"time (ms)":>10} {"speedup":>8}')
+    for name, seconds in [('marshmallow', before), ('orjson', fast), ('json', fallback)]:
+        print(f'{name:>12} {seconds * 1000:>10.3f} {before / seconds:>7.2f}x')
+
+if __name__ == "__main__":
+    main()
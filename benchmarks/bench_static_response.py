@@ -0,0 +1,72 @@
+"""Requests per second of the overview and advice endpoints
+
+Compares marshalling the payload per request (marshmallow dump and
+`jsonify`, as the endpoints did before) against serving the body
+pre-serialized by StaticResponse, for each content coding and for
+a conditional request answered with 304 Not Modified.
+
+    Typical usage example:
+
+    python benchmarks/bench_static_response.py
+    python benchmarks/bench_static_response.py --seconds 5
+
+"""
+import argparse
+import pathlib
+import pickle
+import sys
+import time
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(1, str(FILE_PATH / '../main'))
+
+from flask import jsonify # pylint: disable=wrong-import-position
+from app import app # pylint: disable=import-error,wrong-import-position
+from app.utils.registry import registry # pylint: disable=import-error,wrong-import-position
+from app.views import advice, overview # pylint: disable=import-error,wrong-import-position
+
+def measure(func, seconds: float) -> float:
+    """Returns the calls of func per second"""
+    count = 0
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < seconds:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start_time)
+
+def main() -> None:
+    """Runs the benchmark and prints the result table"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--seconds', type=float, default=2., help='seconds per case')
+    args = parser.parse_args()
+    client = app.test_client()
+    print(f'{"endpoint":>10} {"case":>12} {"bytes":>8} {"req / s":>10}')
+    for name, schema in [
+        ('overview', overview.OverviewResponseSchema()),
+        ('advice', advice.AdviceResponseSchema())
+    ]:
+        static_response = registry.get(name)
+        with open(static_response.filename, 'rb') as file:
+            data = pickle.load(file)
+        with app.test_request_context():
+            rate = measure(lambda: jsonify(schema.dump(data)), args.seconds)
+        size = len(static_response.bodies['identity'])
+        print(f'{name:>10} {"marshal":>12} {size:>8} {rate:>10.1f}')
+        cases = [('identity', {}), ('gzip', {'Accept-Encoding': 'gzip'}),
+                 ('br', {'Accept-Encoding': 'br, gzip'})]
+        for coding, headers in cases:
+            if coding not in static_response.bodies:
+                continue
+            with app.test_request_context(headers=headers):
+                rate = measure(static_response.make_response, args.seconds)
+            size = len(static_response.bodies[coding])
+            print(f'{name:>10} {coding:>12} {size:>8} {rate:>10.1f}')
+        headers = {'If-None-Match': static_response.etags['identity']}
+        with app.test_request_context(headers=headers):
+            rate = measure(static_response.make_response, args.seconds)
+        print(f'{name:>10} {"304":>12} {0:>8} {rate:>10.1f}')
+        rate = measure(lambda: client.get(f'/{name}', headers={'Accept-Encoding': 'gzip'}), args.seconds)
+        print(f'{name:>10} {"client gzip":>12} {len(static_response.bodies["gzip"]):>8} {rate:>10.1f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Throughput benchmark of the tokenization process pool
+
+Tokenizes the paragraphs of the mock request from concurrent clients,
+in the server process (segmenter and preprocessor behind one lock, as
+the GIL serializes them) and with TokenizerPool of each number of workers.
+
+    Typical usage example:
+
+    python benchmarks/bench_tokenize.py
+    python benchmarks/bench_tokenize.py --workers 1 2 4 8 --clients 16 --requests 64
+
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pathlib
+import sys
+import threading
+import time
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(1, str(FILE_PATH / '../main'))
+
+from ckip_transformers.nlp import CkipWordSegmenter # pylint: disable=wrong-import-position
+from app.utils.preprocessor import Preprocessor # pylint: disable=import-error,wrong-import-position
+from app.utils.tokenizer import TokenizerPool # pylint: disable=import-error,wrong-import-position
+
+MOCK_PATH = FILE_PATH / '../mock_data/estimation_request.json'
+
+def load_requests(n_requests: int) -> 'list[list[str]]':
+    """Returns requests of the mock paragraphs, each made unique"""
+    with open(MOCK_PATH, 'r', encoding='utf-8') as file:
+        mock_data = json.load(file)
+    paragraphs = [p for p in mock_data['content'].split('\n') if p.strip()]
+    return [[f'{p}{i}' for p in paragraphs] for i in range(n_requests)]
+
+def in_process() -> 'callable':
+    """Returns tokenization in the server process"""
+    segmentor = CkipWordSegmenter(level=3)
+    preprocessor = Preprocessor()
+    lock = threading.Lock()
+    def tokenize(texts):
+        with lock:
+            return [preprocessor.preprocess(s) for s in segmentor(texts, show_progress=False)]
+    return tokenize
+
+def measure(tokenize, requests: 'list[list[str]]', clients: int) -> float:
+    """Returns the texts tokenized per second"""
+    tokenize(requests[0])
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(tokenize, requests))
+    return sum(map(len, requests)) / (time.perf_counter() - start_time)
+
+def main() -> None:
+    """Runs the benchmark and prints the result table"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--clients', type=int, default=8, help='concurrent requests')
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--chunk', type=int, default=4, help='minimum texts per child')
+    args = parser.parse_args()
+    requests = load_requests(args.requests)
+    print(f'{"workers":>10} {"texts / s":>12} {"speedup":>8}')
+    baseline = measure(in_process(), requests, args.clients)
+    print(f'{"in-process":>10} {baseline:>12.1f} {1:>7.2f}x')
+    for workers in args.workers:
+        pool = TokenizerPool(workers, min_chunk_size=args.chunk)
+        pool.start()
+        throughput = measure(pool, requests, args.clients)
+        pool.shutdown()
+        print(f'{workers:>10} {throughput:>12.1f} {throughput / baseline:>7.2f}x')
+
+if __name__ == "__main__":
+    main()
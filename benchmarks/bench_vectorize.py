@@ -0,0 +1,76 @@
+"""Micro-benchmark of the vector filtering stage
+
+Compares the per-request column selection of `vectorize()` before
+(`np.isin` over the vocabulary) and after (column maps precomputed by
+ModelBundle) for growing vocabulary sizes. The selection with column maps
+only visits the stored values of the request, so its time should stay
+flat while the vocabulary grows.
+
+    Typical usage example:
+
+    python benchmarks/bench_vectorize.py
+    python benchmarks/bench_vectorize.py --sizes 1000 100000 --repeat 200
+
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(1, str(FILE_PATH / '../main'))
+
+from app.utils.bundle import COLS, ModelBundle, get_feature_names # pylint: disable=import-error,wrong-import-position
+
+def build_bundle(size: int, rng: np.random.Generator) -> ModelBundle:
+    """Builds a model bundle with a vocabulary of size tokens per column"""
+    vocabulary = [f't{i}' for i in range(size)]
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, tokenizer=str.split,
+                                 lowercase=False, token_pattern=None).fit([' '.join(vocabulary)])
+    selected = rng.choice(vocabulary, size // 10, replace=False).tolist()
+    return ModelBundle(
+        thresholder=None,
+        vectorizer={c: vectorizer for c in COLS},
+        selected_tokens={c: selected for c in COLS},
+        filter_tokens={c: rng.random(size) < .5 for c in COLS},
+        scores=np.zeros(1)
+    )
+
+def measure(func, repeat: int) -> float:
+    """Returns the median seconds of func"""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start_time)
+    return float(np.median(times))
+
+def main() -> None:
+    """Runs the benchmark and prints the result table"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--tokens', type=int, default=500, help='tokens per request')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    print(f'{"vocabulary":>10} {"np.isin (ms)":>14} {"bundle (ms)":>12}')
+    result = []
+    for size in args.sizes:
+        bundle = build_bundle(size, rng)
+        vectorizer = bundle.vectorizer['content']
+        doc = ' '.join(rng.choice(get_feature_names(vectorizer), args.tokens))
+        vector = vectorizer.transform([doc])
+        selected = bundle.features['content'].tolist()
+        before = measure(lambda: vector[:, np.isin(
+            get_feature_names(vectorizer).tolist(), selected)], args.repeat)
+        after = measure(lambda: bundle.select(vector, 'content'), args.repeat)
+        result.append(after)
+        print(f'{size:>10} {before * 1000:>14.3f} {after * 1000:>12.3f}')
+    ratio = max(result) / min(result)
+    print(f'bundle slowest / fastest: {ratio:.2f}x over {max(args.sizes) // min(args.sizes)}x vocabulary')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Stand-in data generator of the benchmarks
+
+Generates a synthetic model bundle and preprocessed data with the same
+layout as `main/app/data/`, so the benchmarks run without the downloaded
+data. Tokens are drawn from the keywords of the mock data with a Zipf
+distribution, and the model is a logistic regression fitted on the
+synthetic projects, so the shapes and sparsity are realistic while the
+estimations are meaningless.
+
+    Typical usage example:
+
+    python benchmarks/make_bundle.py --output /tmp/crowditor-data
+    DATA_DIR=/tmp/crowditor-data flask run
+
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import pathlib
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MaxAbsScaler
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+MOCK_PATH = FILE_PATH / '../mock_data'
+
+COLS = ['title', 'description', 'content']
+LENGTHS = {'title': (3, 12), 'description': (5, 30), 'content': (50, 600)}
+DELIM = ['，', '。', '！', '、', '|', '/', '【', '】', '「', '」']
+
+def load_metadata_module():
+    """Imports `app.utils.metadata` by path
+
+    Importing the app package loads the data this script generates, so
+    the module is imported on its own.
+
+    """
+    spec = importlib.util.spec_from_file_location(
+        'metadata', FILE_PATH / '../main/app/utils/metadata.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_mock(name: str) -> dict:
+    """Load mock response or request"""
+    with open(MOCK_PATH / f'{name}.json', 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def get_vocabulary(size: int) -> 'list[str]':
+    """Returns tokens of the mock data, padded with numbered tokens to size"""
+    overview = load_mock('overview_response')
+    request = load_mock('estimation_request')
+    tokens = [t['text'] for t in overview['helpful_tokens']]
+    tokens += [t['text'] for v in overview['keywords'].values() for t in v]
+    for col in COLS:
+        tokens += re.findall(r'[A-Za-z]{2,}|[一-鿿]{2}', request[col])
+    tokens = list(dict.fromkeys(tokens))
+    tokens += [f'詞{i}' for i in range(max(0, size - len(tokens)))]
+    return tokens[:size]
+
+def generate_projects(n_projects: int, vocabulary: 'list[str]', categories: dict,
+    rng: np.random.Generator) -> 'tuple[list[dict], dict]':
+    """Returns synthetic projects and their tokens of each column"""
+    weights = 1 / np.arange(1, len(vocabulary) + 1) ** 1.1
+    weights /= weights.sum()
+    tokens = {
+        col: [
+            [vocabulary[i] for i in rng.choice(len(vocabulary), rng.integers(low, high), p=weights)]
+            for _ in range(n_projects)
+        ]
+        for col, (low, high) in LENGTHS.items()
+    }
+    categories = {k: list(v) for k, v in categories.items()}
+    start_time = datetime.datetime(2021, 1, 1)
+    projects = []
+    for i in range(n_projects):
+        set_prices = np.sort(rng.integers(100, 30000, size=2))
+        projects.append({
+            'title': ''.join(tokens['title'][i]),
+            'description': ''.join(tokens['description'][i]),
+            'content': ''.join(tokens['content'][i]),
+            'link': f'https://www.zeczec.com/projects/project-{i}',
+            'domain': str(rng.choice(categories['domain'])),
+            'type': str(rng.choice(categories['type'])),
+            'facebook': bool(rng.random() < .8),
+            'instagram': bool(rng.random() < .5),
+            'youtube': bool(rng.random() < .4),
+            'website': bool(rng.random() < .6),
+            'set_count': int(rng.integers(1, 20)),
+            'goal': int(rng.integers(10, 1000) * 1000),
+            'start_time': start_time,
+            'end_time': start_time + datetime.timedelta(days=int(rng.integers(14, 90))),
+            'min_set_prices': int(set_prices[0]),
+            'max_set_prices': int(set_prices[1]),
+            'percentage': float(rng.lognormal(0, 1)),
+        })
+    return projects, tokens
+
+def make_bundle(output: 'str|pathlib.Path', n_projects: int = 3000, vocabulary_size: int = 3000,
+    seed: int = 0) -> None:
+    """Generates the model bundle and the preprocessed data into output"""
+    output = pathlib.Path(output)
+    (output / 'model').mkdir(parents=True, exist_ok=True)
+    (output / 'preprocessed').mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    metadata = load_metadata_module()
+    encoder = metadata.MetadataEncoder()
+    projects, tokens = generate_projects(
+        n_projects, get_vocabulary(vocabulary_size), encoder.categories, rng)
+    x_meta = encoder.encode(projects)
+    success = np.array([p['percentage'] >= 1 for p in projects])
+
+    model = {name: {} for name in ['vectorizer', 'filter_tokens', 'filter_corpus',
+                                   'selected_tokens', 'vectors_norm', 'chi2', 'odds']}
+    x_text = []
+    for col in COLS:
+        vectorizer = TfidfVectorizer(tokenizer=str.split, lowercase=False, token_pattern=None)
+        vector = vectorizer.fit_transform([' '.join(t) for t in tokens[col]])
+        names = vectorizer.get_feature_names_out()
+        mask = rng.random(len(names)) < .7
+        selected = rng.random(len(names)) < .5
+        filtered = vector[:, mask].toarray()
+        norm = np.linalg.norm(filtered, axis=1, keepdims=True)
+        model['vectorizer'][col] = vectorizer
+        model['filter_tokens'][col] = mask
+        model['filter_corpus'][col] = names[mask]
+        model['selected_tokens'][col] = list(names[selected])
+        model['vectors_norm'][col] = filtered / np.where(norm == 0, 1, norm)
+        model['chi2'][col] = rng.random(mask.sum())
+        model['odds'][col] = rng.random(mask.sum()) * 2
+        x_text.append(vector[:, selected].toarray())
+    x_all = np.hstack(x_text + [x_meta])
+    estimator = make_pipeline(MaxAbsScaler(), LogisticRegression(C=.1, max_iter=1000))
+    estimator.fit(x_all, success)
+
+    dataset = pd.DataFrame({
+        'title': [p['title'] for p in projects],
+        'link': [p['link'] for p in projects],
+        'domain': [p['domain'] for p in projects],
+        'type': [p['type'] for p in projects],
+        'percentage': [p['percentage'] for p in projects],
+        **{
+            col: [p[col] for p in projects]
+            for col in ['goal', 'content_length', 'duration_days', 'max_set_prices',
+                        'description_length', 'min_set_prices']
+        }
+    })
+    dataset.to_pickle(output / 'model/dataset.pickle')
+    files = {
+        'model/tokens': tokens,
+        'model/scores': estimator.predict_proba(x_all)[:, 1],
+        'model/delim': DELIM,
+        'model/model': {'estimator': estimator, 'threshold': .5},
+        'preprocessed/success_rates_by_score': {
+            'success_rates_by_score': load_mock('estimation_response')['success_rates_by_score']
+        },
+        'preprocessed/overview': load_mock('overview_response'),
+        'preprocessed/advice': load_mock('advice_response'),
+        **{f'model/{name}': value for name, value in model.items()}
+    }
+    for name, value in files.items():
+        with open(output / f'{name}.pickle', 'wb') as file:
+            pickle.dump(value, file)
+
+def main() -> None:
+    """Generates the data into the output directory"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--output', type=pathlib.Path, required=True)
+    parser.add_argument('--projects', type=int, default=3000)
+    parser.add_argument('--vocabulary', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    make_bundle(args.output, args.projects, args.vocabulary, args.seed)
+    print(f'Generated {args.projects} projects into {args.output}')
+
+if __name__ == "__main__":
+    main()
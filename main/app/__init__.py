@@ -15,21 +15,29 @@ and the swagger UI at /swagger-ui/.
 """
 import logging
 from logging.config import fileConfig
+import os
 import pathlib
+import time
 
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, g
 from flask_apispec.extension import FlaskApiSpec
 from flask_restful import Api
 from werkzeug.exceptions import HTTPException
 
 FILE_PATH = pathlib.Path(__file__).parent.resolve()
+DATA_PATH = pathlib.Path(os.environ.get('DATA_DIR') or FILE_PATH / 'data')
 
 fileConfig(FILE_PATH / 'logging.ini')
 
 logger = logging.getLogger()
 
+from app.utils.metrics import metrics  # pylint: disable=wrong-import-position
+from app.utils.registry import registry  # pylint: disable=wrong-import-position
+
+MODEL_VERSION_HEADER = 'X-Model-Version'
+
 app = Flask(__name__)
 app.config.update({
     'APISPEC_SPEC': APISpec(
@@ -49,9 +57,12 @@ docs = FlaskApiSpec(app)
 def handle_before_request() -> None:
     """Records the request path and method.
 
-    Logs the request path and method before handling request.
+    Logs the request path and method before handling request, and
+    pins the active version of the data for the whole request.
 
     """
+    g.start_time = time.perf_counter_ns()
+    g.registry_token = registry.pin()
     log_head = f'{request.method} {request.path}'
     logger.debug('[%s] get request', log_head)
 
@@ -60,7 +71,9 @@ def handle_before_request() -> None:
 def handle_after_request(response: Response) -> Response:
     """Records the response status.
 
-    Logs the response status after handling request.
+    Logs the response status after handling request, counts it
+    with its latency in the metrics, and adds the version of the
+    data used to the headers.
 
     Args:
         response: The response object.
@@ -79,12 +92,28 @@ def handle_after_request(response: Response) -> Response:
     else:  # pragma: no cover
         logger.warning(
             '[%s] failed to handle request (server errors)', log_head)
+    if 'start_time' in g:
+        metrics.count_request(
+            request.method,
+            request.url_rule.rule if request.url_rule else 'unmatched',
+            response.status_code,
+            (time.perf_counter_ns() - g.start_time) / 1e9
+        )
+    response.headers[MODEL_VERSION_HEADER] = registry.version()
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE')
+    response.headers.add('Access-Control-Expose-Headers', MODEL_VERSION_HEADER)
     return response
 
 
+@app.teardown_request
+def handle_teardown_request(_error: 'Exception|None') -> None:
+    """Unpins the version of the data pinned for the request."""
+    if 'registry_token' in g:
+        registry.unpin(g.pop('registry_token'))
+
+
 @app.errorhandler(Exception)
 def handle_error(error: Exception) -> Response:
     """Generates response with error.
@@ -112,5 +141,12 @@ def handle_error(error: Exception) -> Response:
 
 from app import views  # pylint: disable=wrong-import-position
 
+if os.environ.get('MODEL_WARM_UP', '0') != '0':
+    registry.warm_up()
+
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+if MODEL_WATCH_INTERVAL > 0:
+    registry.watch(MODEL_WATCH_INTERVAL)
+
 if __name__ == "__main__":  # pragma: no cover
     app.run()
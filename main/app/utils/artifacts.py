@@ -0,0 +1,235 @@
+"""Model artifacts
+
+This module exports the model artifacts used by the suggestion into
+memory-mappable `.npy` files, and loads them back with a fallback to the
+legacy pickles. Memory-mapped arrays are backed by the page cache, so all
+workers on a host share one copy and loading takes no time.
+
+    Typical usage example:
+
+    from app.utils.artifacts import export_artifacts, load_artifacts
+
+    export_artifacts('path/to/model/')
+    artifacts = load_artifacts('path/to/model/')
+
+    Export the artifacts offline (from main/):
+
+    python -m app.utils.artifacts
+
+"""
+import json
+import os
+import pathlib
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from app import DATA_PATH, logger
+
+EXPORT_DIR = 'mmap'
+MANIFEST = 'manifest.json'
+SOURCES = ['dataset', 'vectors_norm', 'tokens', 'filter_corpus', 'chi2', 'odds', 'scores']
+
+class StringTable(object):
+    """Read-only table of strings stored as one UTF-8 buffer with offsets
+
+    Attributes:
+        data (np.ndarray): UTF-8 bytes of all strings
+        offsets (np.ndarray): Start of each string in data, and the end
+
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: 'list[str]') -> 'StringTable':
+        """Builds table of strings"""
+        encoded = [str(s).encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if not -len(self) <= i < len(self):
+            raise IndexError('StringTable index out of range')
+        i = i % len(self)
+        return self.data[self.offsets[i]:self.offsets[i+1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        data = self.data.tobytes()
+        for start, end in zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist()):
+            yield data[start:end].decode('utf-8')
+
+    def to_numpy(self) -> np.ndarray:
+        """Returns strings as an object array"""
+        return np.array(list(self), dtype=object)
+
+    def save(self, prefix: pathlib.Path) -> None:
+        """Save table as `<prefix>.data.npy` and `<prefix>.offsets.npy`"""
+        np.save(f'{prefix}.data.npy', self.data)
+        np.save(f'{prefix}.offsets.npy', self.offsets)
+
+    @classmethod
+    def load(cls, prefix: pathlib.Path, mmap_mode: 'str|None' = 'r') -> 'StringTable':
+        """Load table saved with `save`"""
+        return cls(
+            np.load(f'{prefix}.data.npy', mmap_mode=mmap_mode),
+            np.load(f'{prefix}.offsets.npy', mmap_mode=mmap_mode)
+        )
+
+def build_token_index(docs: 'list[list[str]]', corpus: 'np.ndarray|StringTable'
+    ) -> 'tuple[dict[str, int], sparse.csr_matrix]':
+    """Builds token to corpus index and document by corpus token matrix
+
+    The matrix marks which corpus tokens each document contains, so the
+    document frequency of tokens among peers is a sum over peer rows.
+
+    """
+    index = {t: i for i, t in enumerate(corpus)}
+    ids = [sorted({index[t] for t in d if t in index}) for d in docs]
+    indptr = np.concatenate([[0], np.cumsum([len(d) for d in ids])])
+    indices = np.fromiter((i for d in ids for i in d), dtype=np.int64, count=indptr[-1])
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int8), indices, indptr),
+        shape=(len(docs), len(corpus))
+    )
+    return index, matrix
+
+def get_sources(directory: pathlib.Path) -> dict:
+    """Returns size and modified time of each legacy pickle"""
+    result = {}
+    for name in SOURCES:
+        stat = os.stat(directory / f'{name}.pickle')
+        result[name] = [stat.st_size, stat.st_mtime_ns]
+    return result
+
+def is_exported(directory: 'str|pathlib.Path') -> bool:
+    """Returns true if the exported artifacts are up to date with the pickles"""
+    directory = pathlib.Path(directory)
+    try:
+        with open(directory / EXPORT_DIR / MANIFEST, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return False
+    try:
+        sources = get_sources(directory)
+    except OSError:
+        return True
+    if manifest.get('sources') != sources:
+        logger.warning('Exported artifacts in %s are stale, loading pickles',
+                       str(directory / EXPORT_DIR))
+        return False
+    return True
+
+def load_pickles(directory: pathlib.Path) -> dict:
+    """Load artifacts from the legacy pickles"""
+    artifacts = {'dataset': pd.read_pickle(directory / 'dataset.pickle')}
+    for name in ['vectors_norm', 'tokens', 'filter_corpus', 'chi2', 'odds']:
+        with open(directory / f'{name}.pickle', 'rb') as file:
+            artifacts[name] = pickle.load(file)
+    artifacts['doc_tokens'] = {
+        c: build_token_index(v, artifacts['filter_corpus'][c])[1]
+        for c, v in artifacts.pop('tokens').items()
+    }
+    return artifacts
+
+def export_artifacts(directory: 'str|pathlib.Path') -> None:
+    """Export the legacy pickles of directory into `.npy` files
+
+    Dense arrays are saved as they are, the document by corpus token matrix
+    as its CSR components, the corpus and the text columns of the dataset
+    as string tables. The manifest is written last, so a partial export is
+    never loaded.
+
+    """
+    directory = pathlib.Path(directory)
+    out = directory / EXPORT_DIR
+    out.mkdir(exist_ok=True)
+    (out / MANIFEST).unlink(missing_ok=True)
+    sources = get_sources(directory)
+    artifacts = load_pickles(directory)
+    manifest = {'sources': sources, 'cols': list(artifacts['doc_tokens']), 'dataset': {}}
+    for name in ['vectors_norm', 'chi2', 'odds']:
+        for col, array in artifacts[name].items():
+            np.save(out / f'{name}.{col}.npy', np.ascontiguousarray(array))
+    for col, corpus in artifacts['filter_corpus'].items():
+        StringTable.from_strings(corpus).save(out / f'filter_corpus.{col}')
+    for col, matrix in artifacts['doc_tokens'].items():
+        for part in ['data', 'indices', 'indptr']:
+            np.save(out / f'doc_tokens.{col}.{part}.npy', getattr(matrix, part))
+    with open(directory / 'scores.pickle', 'rb') as file:
+        np.save(out / 'scores.npy', np.sort(np.asarray(pickle.load(file)).ravel()))
+    dataset = artifacts['dataset'].reset_index(drop=True)
+    for col in dataset.columns:
+        if dataset[col].dtype == object:
+            StringTable.from_strings(dataset[col]).save(out / f'dataset.{col}')
+            manifest['dataset'][col] = 'text'
+        else:
+            np.save(out / f'dataset.{col}.npy', dataset[col].to_numpy())
+            manifest['dataset'][col] = 'array'
+    with open(out / MANIFEST, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    logger.info('Exported artifacts to %s', str(out))
+
+def load_exported(directory: pathlib.Path) -> dict:
+    """Load artifacts exported with `export_artifacts`, memory-mapped"""
+    out = directory / EXPORT_DIR
+    with open(out / MANIFEST, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    cols = manifest['cols']
+    artifacts = {
+        name: {c: np.load(out / f'{name}.{c}.npy', mmap_mode='r') for c in cols}
+        for name in ['vectors_norm', 'chi2', 'odds']
+    }
+    artifacts['filter_corpus'] = {c: StringTable.load(out / f'filter_corpus.{c}') for c in cols}
+    artifacts['doc_tokens'] = {}
+    for col in cols:
+        parts = [np.load(out / f'doc_tokens.{col}.{p}.npy', mmap_mode='r')
+                 for p in ['data', 'indices', 'indptr']]
+        artifacts['doc_tokens'][col] = sparse.csr_matrix(
+            tuple(parts),
+            shape=(len(parts[2]) - 1, len(artifacts['filter_corpus'][col])),
+            copy=False
+        )
+    artifacts['dataset'] = pd.DataFrame({
+        col: StringTable.load(out / f'dataset.{col}').to_numpy() if kind == 'text'
+        else np.load(out / f'dataset.{col}.npy', mmap_mode='r')
+        for col, kind in manifest['dataset'].items()
+    }, copy=False)
+    return artifacts
+
+def load_artifacts(directory: 'str|pathlib.Path', mmap: bool = True) -> dict:
+    """Load artifacts of the suggestion
+
+    Loads the exported `.npy` files memory-mapped if they are up to date,
+    otherwise the legacy pickles.
+
+    Returns:
+        Dict with `dataset` (DataFrame), and `vectors_norm`,
+        `filter_corpus`, `doc_tokens`, `chi2` and `odds` (dict of column
+        to array).
+
+    """
+    directory = pathlib.Path(directory)
+    if mmap and is_exported(directory):
+        logger.info('Loading memory-mapped artifacts from %s', str(directory / EXPORT_DIR))
+        return load_exported(directory)
+    return load_pickles(directory)
+
+def load_scores(directory: 'str|pathlib.Path', mmap: bool = True) -> np.ndarray:
+    """Load predicted scores of the dataset, memory-mapped and sorted if exported"""
+    directory = pathlib.Path(directory)
+    if mmap and is_exported(directory):
+        return np.load(directory / EXPORT_DIR / 'scores.npy', mmap_mode='r')
+    with open(directory / 'scores.pickle', 'rb') as file:
+        return pickle.load(file)
+
+if __name__ == "__main__":  # pragma: no cover
+    export_artifacts(DATA_PATH / 'model')
@@ -0,0 +1,128 @@
+"""Micro-batching scheduler
+
+This module contains MicroBatcher to merge concurrent calls of a batch
+function (e.g. the word segmenter) into one call.
+
+    Typical usage example:
+
+    from app.utils.batcher import MicroBatcher
+
+    batcher = MicroBatcher(segmentor, max_batch_size=64, max_wait=.005)
+    batcher(['text', 'another text'])
+    batcher.stats()
+
+"""
+from collections import Counter
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+from app import logger
+
+class MicroBatcher(object):
+    """Micro-batching scheduler
+
+    Gathers inputs from concurrent callers for at most `max_wait` seconds,
+    or until `max_batch_size` inputs are gathered, runs `func` once on all of
+    them and hands each caller its own slice of the outputs. Inputs of one
+    caller are never split across batches, so a caller with more inputs than
+    `max_batch_size` forms a batch of its own.
+
+    Attributes:
+        func (Callable[[list], list]): Function mapping inputs to outputs
+        max_batch_size (int): Maximum number of inputs per batch
+        max_wait (float): Maximum seconds to wait for other callers,
+                          0 disables batching
+        kwargs (dict): Extra keyword arguments for `func`
+        batch_sizes (Counter): Number of batches formed per batch size
+
+    """
+
+    def __init__(self, func, max_batch_size: int = 64, max_wait: float = .005, **kwargs) -> None:
+        self.func = func
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.kwargs = kwargs
+        self.batch_sizes = Counter()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def __call__(self, inputs: list) -> list:
+        """Runs `func` on inputs together with those of concurrent callers"""
+        if not inputs:
+            return []
+        if self.max_wait <= 0:
+            self._record(len(inputs))
+            return self.func(list(inputs), **self.kwargs)
+        future = Future()
+        self._start_worker()
+        self._queue.put((list(inputs), future))
+        return future.result()
+
+    def stats(self) -> dict:
+        """Returns the batch sizes formed so far"""
+        with self._lock:
+            sizes = dict(self.batch_sizes)
+        batches = sum(sizes.values())
+        inputs = sum(k * v for k, v in sizes.items())
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait': self.max_wait,
+            'batches': batches,
+            'inputs': inputs,
+            'mean_batch_size': inputs / batches if batches else 0.,
+            'batch_sizes': sizes
+        }
+
+    def _record(self, size: int) -> None:
+        """Records the size of a formed batch"""
+        with self._lock:
+            self.batch_sizes[size] += 1
+        logger.debug('Micro-batch Size: %d', size)
+
+    def _start_worker(self) -> None:
+        """Starts the worker thread if it is not running (e.g. after fork)"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Forms and runs batches forever"""
+        carry = None
+        while True:
+            batch = [carry or self._queue.get()]
+            carry = None
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if size + len(item[0]) > self.max_batch_size:
+                    carry = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._run_batch(batch, size)
+
+    def _run_batch(self, batch: 'list[tuple[list, Future]]', size: int) -> None:
+        """Runs `func` on a batch and resolves the futures of callers"""
+        self._record(size)
+        try:
+            outputs = self.func([x for inputs, _ in batch for x in inputs], **self.kwargs)
+        except Exception as error:  # pylint: disable=broad-except
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        start = 0
+        for inputs, future in batch:
+            future.set_result(outputs[start:start+len(inputs)])
+            start += len(inputs)
@@ -0,0 +1,191 @@
+"""Model bundle
+
+This module contains ModelBundle to load the estimation model together with
+the static column indexes the per-request path needs.
+
+    Typical usage example:
+
+    from app.utils.bundle import ModelBundle
+
+    bundle = ModelBundle.load('path/to/model/')
+    bundle.select(vector, 'content')
+    bundle.filter(vector, 'content')
+    bundle.predict_prob(x)
+    bundle.percentile(probs)
+
+"""
+import pathlib
+import pickle
+
+import numpy as np
+from scipy import sparse
+
+from app.utils.artifacts import load_scores
+from app.utils.metadata import META_FEATURES
+from app.utils.thresholder import Thresholder
+
+COLS = ['title', 'description', 'content']
+
+def get_feature_names(vectorizer) -> np.ndarray:
+    """Returns the vocabulary of vectorizer in column order"""
+    if hasattr(vectorizer, 'get_feature_names_out'):
+        return np.asarray(vectorizer.get_feature_names_out(), dtype=object)
+    return np.asarray(vectorizer.get_feature_names(), dtype=object)
+
+def get_column_map(n_cols: int, index: np.ndarray) -> np.ndarray:
+    """Maps each column to its position in index, or -1 if not in index"""
+    columns = np.full(n_cols, -1, dtype=np.int64)
+    columns[index] = np.arange(len(index))
+    return columns
+
+def take_columns(matrix: sparse.spmatrix, columns: np.ndarray, n_cols: int) -> sparse.csr_matrix:
+    """Takes the columns of a sparse matrix by a column map
+
+    Only visits the stored values, so the cost does not depend on the
+    number of columns of the matrix.
+
+    """
+    matrix = matrix.tocsr()
+    new_cols = columns[matrix.indices]
+    keep = new_cols >= 0
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[keep], minlength=matrix.shape[0]), out=indptr[1:])
+    return sparse.csr_matrix(
+        (matrix.data[keep], new_cols[keep], indptr),
+        shape=(matrix.shape[0], n_cols)
+    )
+
+class ModelBundle(object):
+    """Estimation model with static indexes precomputed at load time
+
+    Attributes:
+        thresholder (Thresholder): Model to predict success probability
+        vectorizer (dict[str, TfidfVectorizer]): Vectorizer of each column
+        scores (np.ndarray): Sorted predicted scores of the dataset
+        features (dict[str, np.ndarray]): Selected tokens of each column
+        selected_columns (dict[str, np.ndarray]): Column map of selected tokens
+        filter_columns (dict[str, np.ndarray]): Column map of filtered tokens
+        n_filtered (dict[str, int]): Number of filtered tokens
+        feature_names (list[str]): Names of text features of model input
+        input_names (list[str]): Names of all columns of model input
+        input_order (np.ndarray|None): Column order the estimator was fitted
+                                       with, None if it is the same as input_names
+        sparse_input (bool): True if the estimator handles sparse input
+                             the same as dense input
+
+    """
+
+    def __init__(self,
+        thresholder: Thresholder,
+        vectorizer: dict,
+        selected_tokens: dict,
+        filter_tokens: dict,
+        scores: np.ndarray
+    ) -> None:
+        self.thresholder = thresholder
+        self.vectorizer = vectorizer
+        scores = np.asarray(scores).ravel()
+        if np.any(scores[1:] < scores[:-1]):
+            scores = np.sort(scores)
+        self.scores = np.ascontiguousarray(scores)
+        vocabulary = {c: get_feature_names(vectorizer[c]) for c in COLS}
+        selected_tokens = {c: set(v) for c, v in selected_tokens.items()}
+        selected_index = {
+            c: np.flatnonzero([t in selected_tokens[c] for t in v])
+            for c, v in vocabulary.items()
+        }
+        filter_index = {
+            c: np.flatnonzero(v) if np.asarray(v).dtype == bool else np.asarray(v)
+            for c, v in filter_tokens.items()
+        }
+        self.features = {
+            c: vocabulary[c][v]
+            for c, v in selected_index.items()
+        }
+        self.selected_columns = {
+            c: get_column_map(len(vocabulary[c]), v)
+            for c, v in selected_index.items()
+        }
+        self.filter_columns = {
+            c: get_column_map(len(vocabulary[c]), filter_index[c])
+            for c in COLS
+        }
+        self.n_filtered = {c: len(v) for c, v in filter_index.items()}
+        self.feature_names = [
+            f'{c}:{f}'
+            for c in COLS
+            for f in self.features[c]
+        ]
+        self.input_names = self.feature_names + [f'meta:{f}' for f in META_FEATURES]
+        self.input_order = None
+        self.sparse_input = False
+        if thresholder is not None:
+            self._check_input()
+
+    def _check_input(self) -> None:
+        """Checks the column order and sparse support of the estimator
+
+        Feature names are checked once here, so the per-request input can be
+        an unnamed matrix instead of a DataFrame. Sparse input is only used
+        if the estimator gives the same result as on dense input, since some
+        estimators (e.g. xgboost) treat missing sparse values as unknown
+        rather than zero.
+
+        Raises:
+            ValueError: If the estimator was fitted with other features
+
+        """
+        fitted_names = self.thresholder.feature_names()
+        if fitted_names is not None and fitted_names != self.input_names:
+            if sorted(fitted_names) != sorted(self.input_names):
+                raise ValueError('The model was fitted with different features')
+            position = {f: i for i, f in enumerate(self.input_names)}
+            self.input_order = np.array([position[f] for f in fitted_names])
+        self.thresholder.drop_feature_names()
+        probe = np.zeros((4, len(self.input_names)))
+        probe[1, ::2] = 1.
+        probe[2, 1::2] = 1.
+        probe[3] = 1.
+        try:
+            self.sparse_input = bool(np.allclose(
+                self.thresholder.predict_prob(sparse.csr_matrix(probe)),
+                self.thresholder.predict_prob(probe)
+            ))
+        except (TypeError, ValueError):
+            self.sparse_input = False
+
+    @classmethod
+    def load(cls, directory: 'str|pathlib.Path', mmap: bool = True) -> 'ModelBundle':
+        """Load model bundle from directory, with memory-mapped scores if exported"""
+        directory = pathlib.Path(directory)
+        data = {}
+        for name in ['vectorizer', 'selected_tokens', 'filter_tokens']:
+            with open(directory / f'{name}.pickle', 'rb') as file:
+                data[name] = pickle.load(file)
+        return cls(
+            thresholder=Thresholder().load(directory / 'model.pickle'),
+            scores=load_scores(directory, mmap),
+            **data
+        )
+
+    def select(self, matrix: sparse.spmatrix, col: str) -> sparse.csr_matrix:
+        """Takes the columns of selected tokens as model input"""
+        return take_columns(matrix, self.selected_columns[col], len(self.features[col]))
+
+    def filter(self, matrix: sparse.spmatrix, col: str) -> sparse.csr_matrix:
+        """Takes the columns of filtered tokens for similarity search"""
+        return take_columns(matrix, self.filter_columns[col], self.n_filtered[col])
+
+    def percentile(self, probs: 'np.ndarray|list[float]') -> np.ndarray:
+        """Returns the fraction of dataset scores lower than each probability"""
+        probs = np.asarray(probs, dtype=self.scores.dtype)
+        return np.searchsorted(self.scores, probs, side='left') / len(self.scores)
+
+    def predict_prob(self, x: sparse.csr_matrix) -> np.ndarray:
+        """Predicts the success probability of rows of model input"""
+        if self.input_order is not None:
+            x = x[:, self.input_order]
+        if not self.sparse_input:
+            x = x.toarray()
+        return self.thresholder.predict_prob(x)
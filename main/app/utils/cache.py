@@ -0,0 +1,257 @@
+"""Token and peer group caches
+
+This module contains TokenCache to keep preprocessed tokens of texts,
+keyed by the hash of the text, and PeerGroupCache to keep aggregates of
+peer groups, keyed by the set of peers.
+
+    Typical usage example:
+
+    from app.utils.cache import PeerGroupCache, TokenCache
+
+    cache = TokenCache(max_size=1024, directory='path/to/cache', disk_max_size=100000)
+    cache.set(text, tokens)
+    cache.get(text)
+    cache.stats()
+
+    peer_cache = PeerGroupCache(max_size=256)
+    peer_cache.get(peer_ids, lambda: aggregate(peer_ids))
+    peer_cache.stats()
+
+"""
+from collections import OrderedDict
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+
+from app import logger
+
+class TokenCache(object):
+    """Content-addressed LRU cache of preprocessed tokens
+
+    Texts are keyed by the SHA-256 hash of the namespace and the text, so the
+    same text is never segmented twice. The in-memory tier keeps at most
+    `max_size` entries and evicts the least recently used one. The optional
+    on-disk tier keeps one pickle file per entry under `directory`, which
+    survives worker restarts and is shared by workers on the same host.
+    Once it holds more than `disk_max_size` files, the least recently used
+    files (by modification time, refreshed on disk hits) are removed until
+    it is back to `DISK_PRUNE_RATIO` of the limit.
+
+    Attributes:
+        max_size (int): Maximum number of entries in memory, 0 disables
+                        the in-memory tier
+        directory (pathlib.Path|None): Directory of the on-disk tier
+        disk_max_size (int): Maximum number of entries on disk, 0 for no
+                             limit
+        namespace (str): Prefix of keys, change it to invalidate entries
+        hits (int): Number of lookups served from memory
+        disk_hits (int): Number of lookups served from disk
+        misses (int): Number of lookups not in cache
+
+    """
+
+    DISK_PRUNE_RATIO = .9
+
+    def __init__(self,
+        max_size: int = 1024,
+        directory: 'str|pathlib.Path|None' = None,
+        namespace: str = '',
+        disk_max_size: int = 100000
+    ) -> None:
+        self.max_size = max_size
+        self.directory = pathlib.Path(directory) if directory else None
+        self.namespace = namespace
+        self.disk_max_size = disk_max_size
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_size = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_size = len(self._disk_files())
+
+    def key(self, text: str) -> str:
+        """Returns the key of text"""
+        return hashlib.sha256(f'{self.namespace}\0{text}'.encode('utf-8')).hexdigest()
+
+    def get(self, text: str) -> 'list[str]|None':
+        """Returns cached tokens of text, or None if not cached"""
+        key = self.key(text)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return list(self._data[key])
+        tokens = self._load(key)
+        with self._lock:
+            if tokens is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put(key, tokens)
+        return list(tokens)
+
+    def set(self, text: str, tokens: 'list[str]') -> None:
+        """Caches tokens of text"""
+        key = self.key(text)
+        tokens = tuple(tokens)
+        with self._lock:
+            self._put(key, tokens)
+        self._dump(key, tokens)
+
+    def clear(self) -> None:
+        """Clears the in-memory tier and the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns size, size limit and hit / miss counters"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'disk': str(self.directory) if self.directory else None,
+                'disk_size': self._disk_size,
+                'disk_max_size': self.disk_max_size,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.
+            }
+
+    def _put(self, key: str, tokens: 'tuple[str]') -> None:
+        """Puts entry into memory and evicts the oldest ones, lock must be held"""
+        if self.max_size <= 0:
+            return
+        self._data[key] = tokens
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def _path(self, key: str) -> pathlib.Path:
+        """Returns the file path of key in the on-disk tier"""
+        return self.directory / key[:2] / f'{key}.pickle'
+
+    def _load(self, key: str) -> 'tuple[str]|None':
+        """Loads entry from disk, returns None if missing or broken"""
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                tokens = tuple(pickle.load(file))
+            os.utime(path)
+            return tokens
+        except FileNotFoundError:
+            return None
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning('Failed to load token cache %s: %s', key, str(error))
+            return None
+
+    def _dump(self, key: str, tokens: 'tuple[str]') -> None:
+        """Writes entry to disk atomically"""
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=path.parent, delete=False) as file:
+                pickle.dump(tokens, file)
+            os.replace(file.name, path)
+        except OSError as error:
+            logger.warning('Failed to write token cache %s: %s', key, str(error))
+            return
+        with self._disk_lock:
+            self._disk_size += 1
+            if 0 < self.disk_max_size < self._disk_size:
+                self._prune()
+
+    def _disk_files(self) -> 'list[pathlib.Path]':
+        """Returns the entry files of the on-disk tier"""
+        return list(self.directory.glob('*/*.pickle'))
+
+    def _prune(self) -> None:
+        """Removes the least recently used files from disk until the tier
+        is back to DISK_PRUNE_RATIO of its limit, disk lock must be held
+
+        Files are counted again, since other workers may share the directory.
+
+        """
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        files.sort()
+        excess = max(len(files) - int(self.disk_max_size * self.DISK_PRUNE_RATIO), 0)
+        for _, path in files[:excess]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self._disk_size = len(files) - excess
+        logger.info('Pruned %d entries of token cache %s', excess, str(self.directory))
+
+class PeerGroupCache(object):
+    """LRU cache of peer group aggregates
+
+    Popular topics keep producing the same peers, so the aggregates which
+    only depend on the set of peers are computed once per set. Entries are
+    keyed by the sorted tuple of peer positions and must not be modified.
+
+    Attributes:
+        max_size (int): Maximum number of entries, 0 disables the cache
+        hits (int): Number of lookups served from cache
+        misses (int): Number of lookups computed
+
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: 'tuple[int]', compute):
+        """Returns the cached aggregates of key, computes them if not cached"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        if self.max_size > 0:
+            with self._lock:
+                self._data[key] = value
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Clears the entries and the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns size, size limit and hit / miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.
+            }
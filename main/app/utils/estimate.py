@@ -4,165 +4,249 @@ This module provides function to estimate project.
 
     Typical usage example:
 
-    from app.utils.estimate import get_estimation
+    from app.utils.estimate import get_estimation, get_estimations, get_scenarios
 
     get_estimation(project)
+    get_estimations([project, another_project])
+    get_scenarios(project, [{'goal': 50000}, {'goal': 100000, 'duration_days': 45}])
 
 """
-import pathlib
-import pickle
-import time
+import datetime
+import itertools
+import os
+import re
 
 import numpy as np
-import pandas as pd
-from ckip_transformers.nlp import CkipWordSegmenter
+from scipy import sparse
 
 from app import logger
+from app.utils.batcher import MicroBatcher
+from app.utils.bundle import COLS, ModelBundle
+from app.utils.cache import TokenCache
+from app.utils.metadata import MetadataEncoder
+from app.utils.metrics import metrics
 from app.utils.preprocessor import Preprocessor
-from app.utils.thresholder import Thresholder
+from app.utils.registry import registry
 from app.utils.suggest import get_suggestion
 
-FILE_PATH = pathlib.Path(__file__).parent.resolve()
+SEGMENT_BATCH_SIZE = int(os.environ.get('SEGMENT_BATCH_SIZE', 64))
+SEGMENT_BATCH_WAIT = float(os.environ.get('SEGMENT_BATCH_WAIT', .005))
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+TOKEN_CACHE_DIR = os.environ.get('TOKEN_CACHE_DIR') or None
+TOKEN_CACHE_DISK_MAX = int(os.environ.get('TOKEN_CACHE_DISK_MAX', 100000))
+TOKENIZE_WORKERS = int(os.environ.get('TOKENIZE_WORKERS', 0))
+TOKENIZE_CHUNK_SIZE = int(os.environ.get('TOKENIZE_CHUNK_SIZE', 4))
+TOKENIZE_PARAGRAPHS = os.environ.get('TOKENIZE_PARAGRAPHS', '0') != '0'
 
-segmentor = CkipWordSegmenter(level=3)
 preprocessor = Preprocessor()
-thresholder = Thresholder().load(FILE_PATH / '../data/model/model.pickle')
-
-with open(FILE_PATH / '../data/model/vectorizer.pickle', 'rb') as file:
-    vectorizer = pickle.load(file)
-
-with open(FILE_PATH / '../data/model/selected_tokens.pickle', 'rb') as file:
-    selected_tokens = pickle.load(file)
-
-with open(FILE_PATH / '../data/model/scores.pickle', 'rb') as file:
-    dataset_scores = pickle.load(file)
-
-with open(FILE_PATH / '../data/model/filter_tokens.pickle', 'rb') as file:
-    filter_tokens = pickle.load(file)
-
-features = {
-    c: v.get_feature_names()
-    for c, v in vectorizer.items()
-}
-features = {
-    c: np.array(v)[np.isin(v, selected_tokens[c])]
-    for c, v in features.items()
-}
-
-def tokenize(project: dict) -> dict:
-    """Tokenizes text data"""
-    cols = ['title', 'description', 'content']
-    start_time = time.time()
-    tmp = segmentor([project[c] for c in cols], show_progress=False)
-    logger.info('Segmentation Time: %f', time.time() - start_time)
-    start_time = time.time()
-    result = {
-        c: preprocessor.preprocess(t)
-        for c, t in zip(cols, tmp)
-    }
-    logger.info('Preprocessing Time: %f', time.time() - start_time)
-    return result
-
-def vectorize(tokens: dict) -> dict:
-    """Vectorizes text data"""
-    start_time = time.time()
-    vector_all = {
-        c: vectorizer[c].transform([' '.join(v)])
-        for c, v in tokens.items()
-    }
-    logger.info('Vectorization Time: %f', time.time() - start_time)
-    start_time = time.time()
-    norm_filtered_vector = {
-        k: v[:, filter_tokens[k]]
-        for k, v in vector_all.items()
-    }
-    norm_filtered_vector = {
-        k: v / np.linalg.norm(v.A)
-        for k, v in norm_filtered_vector.items()
-    }
-    logger.info('Normalization Time: %f', time.time() - start_time)
-    start_time = time.time()
-    input_vector = {
-        k: v[:, np.isin(
-            vectorizer[k].get_feature_names(), selected_tokens[k])
-        ]
-        for k, v in vector_all.items()
-    }
-    logger.info('Vector Filtering Time: %f', time.time() - start_time)
+metadata_encoder = MetadataEncoder()
+token_cache = TokenCache(max_size=TOKEN_CACHE_SIZE, directory=TOKEN_CACHE_DIR,
+                         disk_max_size=TOKEN_CACHE_DISK_MAX)
+
+def load_segmentor() -> 'MicroBatcher|TokenizerPool':
+    """Load the word segmenter, or the tokenization process pool if enabled
+
+    The children of the pool are forked on first use rather than here,
+    since the warm-up may run while the app package is being imported.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    if TOKENIZE_WORKERS > 0:
+        from app.utils.tokenizer import TokenizerPool
+        return TokenizerPool(TOKENIZE_WORKERS, min_chunk_size=TOKENIZE_CHUNK_SIZE)
+    from ckip_transformers.nlp import CkipWordSegmenter
+    return MicroBatcher(
+        CkipWordSegmenter(level=3),
+        max_batch_size=SEGMENT_BATCH_SIZE,
+        max_wait=SEGMENT_BATCH_WAIT,
+        show_progress=False
+    )
+
+registry.register('segmentor', load_segmentor)
+registry.register('bundle', lambda directory: ModelBundle.load(directory / 'model'),
+                  versioned=True)
+
+metrics.add_gauges('token_cache', token_cache.stats)
+metrics.add_gauges('segmentor', lambda: (
+    registry.get('segmentor').stats()
+    if registry.is_loaded('segmentor') and TOKENIZE_WORKERS == 0 else {}
+))
+
+PARAGRAPH_COLS = ['content']
+PARAGRAPH_PATTERN = re.compile(r'[\r\n]+')
+
+def split_paragraphs(text: str) -> 'list[str]':
+    """Splits text into non-blank paragraphs at line breaks"""
+    return [p for p in PARAGRAPH_PATTERN.split(text) if p.strip()]
+
+def tokenize(projects: 'list[dict]') -> 'list[dict]':
+    """Tokenizes text data of projects
+
+    If TOKENIZE_PARAGRAPHS is enabled, long texts are segmented paragraph
+    by paragraph and the tokens are stitched back in order, so editing one
+    paragraph only re-segments that paragraph. It is opt-in, since the
+    segmenter does not see across line breaks then and may split words at
+    the boundaries differently than segmenting the whole text as the model
+    was trained. Texts and paragraphs found in the token cache skip
+    segmentation, the others are segmented with one call and preprocessed,
+    or sent to the tokenization process pool if it is enabled.
+
+    """
+    pieces = [
+        {
+            c: split_paragraphs(p[c]) if TOKENIZE_PARAGRAPHS and c in PARAGRAPH_COLS else [p[c]]
+            for c in COLS
+        }
+        for p in projects
+    ]
+    texts = [t for p in pieces for c in COLS for t in p[c]]
+    tokens = {t: token_cache.get(t) for t in dict.fromkeys(texts)}
+    missing = [t for t, v in tokens.items() if v is None]
+    logger.debug('Token Cache Misses: %d / %d', len(missing), len(tokens))
+    if missing:
+        segmentor = registry.get('segmentor')
+        if TOKENIZE_WORKERS > 0:
+            with metrics.timer('tokenization'):
+                preprocessed = segmentor(missing)
+        else:
+            with metrics.timer('segmentation'):
+                tmp = segmentor(missing)
+            with metrics.timer('preprocessing'):
+                preprocessed = [preprocessor.preprocess(segmented) for segmented in tmp]
+        for text, text_tokens in zip(missing, preprocessed):
+            tokens[text] = text_tokens
+            token_cache.set(text, text_tokens)
+    return [
+        {c: [x for t in p[c] for x in tokens[t]] for c in COLS}
+        for p in pieces
+    ]
+
+def vectorize(tokens: 'list[dict]') -> 'tuple[dict, dict]':
+    """Vectorizes text data, one row per project"""
+    bundle = registry.get('bundle')
+    with metrics.timer('vectorization'):
+        vector_all = {
+            c: bundle.vectorizer[c].transform([' '.join(t[c]) for t in tokens])
+            for c in COLS
+        }
+    with metrics.timer('normalization'):
+        norm_filtered_vector = {
+            k: bundle.filter(v, k)
+            for k, v in vector_all.items()
+        }
+        for v in norm_filtered_vector.values():
+            norm = np.sqrt(v.multiply(v).sum(axis=1)).A1
+            v.data = v.data / np.repeat(norm, np.diff(v.indptr))
+    with metrics.timer('vector_filtering'):
+        input_vector = {
+            k: bundle.select(v, k)
+            for k, v in vector_all.items()
+        }
     return norm_filtered_vector, input_vector
 
-def get_metadata(project: dict):
-    """Preprocesses metadata and feature names"""
-    cols = ['facebook', 'instagram', 'youtube', 'website', 'set_count', 'start_time', 'end_time']
-    df_project = pd.DataFrame([project])[cols]
-
-    df_project['duration_days'] = (df_project['end_time'] - df_project['start_time']).dt.days
-    project['duration_days'] = int(df_project['duration_days'].values[0])
-
-    df_project['description_length'] = project['description_length'] = len(project['description'])
-    df_project['content_length'] = project['content_length'] = len(project['content'])
-    df_project['title_length'] = len(project['title'])
-
-    cate = ['type_群眾集資', 'type_訂閱式專案', 'type_預購式專案', 'domain_出版', 'domain_地方創生',
-        'domain_挺好店', 'domain_插畫漫畫', 'domain_攝影', 'domain_教育', 'domain_時尚',
-        'domain_社會', 'domain_科技', 'domain_空間', 'domain_藝術', 'domain_表演',
-        'domain_設計', 'domain_遊戲', 'domain_電影動畫', 'domain_音樂', 'domain_飲食']
-
-    df_project[cate] = 0
-    df_project[f'type_{project["type"]}'] = 1
-    df_project[f'domain_{project["domain"]}'] = 1
-
-    df_project['log_goal'] = np.log(project['goal']) if project['goal'] else 1
-    df_project['log_max_set_prices'] = np.log(
-        project['max_set_prices']) if project['max_set_prices'] else 1
-    df_project['log_min_set_prices'] = np.log(project['min_set_prices'] + 1)
-
-    drop_cols = ['start_time', 'end_time']
-
-    df_project = df_project.drop(columns=drop_cols)
-
-    cols = ['facebook', 'instagram', 'youtube', 'website', 'set_count',
-        'duration_days', 'description_length', 'content_length', 'title_length',
-        'type_群眾集資', 'type_訂閱式專案', 'type_預購式專案', 'domain_出版', 'domain_地方創生',
-        'domain_挺好店', 'domain_插畫漫畫', 'domain_攝影', 'domain_教育', 'domain_時尚',
-        'domain_社會', 'domain_科技', 'domain_空間', 'domain_藝術', 'domain_表演',
-        'domain_設計', 'domain_遊戲', 'domain_電影動畫', 'domain_音樂', 'domain_飲食',
-        'log_goal', 'log_max_set_prices', 'log_min_set_prices']
-
-    df_project = df_project[cols]
-    return df_project.to_numpy().astype(float), df_project.columns, project
-
-def get_input(project: dict, vector: dict):
-    """Construct input dataframe for model"""
-    start_time = time.time()
-    x_meta, meta_features, project = get_metadata(project)
-    logger.info('Getting Metadata Time: %f', time.time() - start_time)
-    start_time = time.time()
-    cols = ['title', 'description', 'content']
-    x_all = vector[cols[0]].A
-    feature_name = [f'{cols[0]}:{f}' for f in features[cols[0]]]
-    for col in cols[1:]:
-        x_all = np.hstack((x_all, vector[col].A))
-        feature_name.extend([f'{col}:{f}' for f in features[col]])
-    x_all = np.hstack((x_all, x_meta))
-    feature_name.extend([f'meta:{f}' for f in meta_features])
-    df_x = pd.DataFrame(x_all, columns=feature_name)
-    logger.info('Input Construction Time: %f', time.time() - start_time)
-    return df_x, project
+def get_input(projects: 'list[dict]', vector: dict):
+    """Construct sparse input for model, one row per project
+
+    The columns follow `bundle.input_names`, which is fixed at load time.
+    Also stores the derived metadata into the projects for the suggestion.
+
+    """
+    with metrics.timer('metadata'):
+        x_meta = metadata_encoder.encode(projects)
+    with metrics.timer('input_construction'):
+        x_all = sparse.hstack(
+            [vector[c] for c in COLS] + [sparse.csr_matrix(x_meta)],
+            format='csr'
+        )
+    return x_all
+
+def get_estimations(projects: 'list[dict]') -> 'list[dict]':
+    """Estimates projects in a batch
+
+    Segments every text field with one call, vectorizes each column once and
+    predicts all projects with one model call. Every model comes from the
+    same version of the data, even if a reload finishes meanwhile.
+
+    """
+    with registry.snapshot():
+        if not projects:
+            return []
+        tokens = tokenize(projects)
+        norm_filtered_vector, input_vector = vectorize(tokens)
+        x_all = get_input(projects, input_vector)
+        bundle = registry.get('bundle')
+        with metrics.timer('prediction'):
+            probs = bundle.predict_prob(x_all)
+        greater_than = bundle.percentile(probs)
+        results = []
+        for i, (project, prob) in enumerate(zip(projects, probs)):
+            suggestion = get_suggestion(project, {
+                k: v[i] for k, v in norm_filtered_vector.items()
+            }, tokens[i])
+            results.append({
+                'score': float(prob),
+                'greater_than': float(greater_than[i]),
+                **suggestion
+            })
+        return results
 
 def get_estimation(project: dict) -> dict:
     """Estimates project"""
-    tokens = tokenize(project)
-    norm_filtered_vector, input_vector = vectorize(tokens)
-    df_x, project = get_input(project, input_vector)
-    start_time = time.time()
-    prob = float(thresholder.predict_prob(df_x)[0])
-    logger.info('Model Prediction Time: %f', time.time() - start_time)
-    greater_than = float((dataset_scores < prob).mean())
-    suggestion = get_suggestion(project, norm_filtered_vector, tokens)
-    result = {
-        'score': prob,
-        'greater_than': greater_than,
-        **suggestion
-    }
-    return result
+    return get_estimations([project])[0]
+
+SCENARIO_FIELDS = ['goal', 'duration_days', 'set_count', 'min_set_prices', 'max_set_prices']
+
+def expand_grid(grid: 'dict[str, list]') -> 'list[dict]':
+    """Expands the values of each field into every combination of overrides"""
+    fields = [f for f in SCENARIO_FIELDS if f in grid]
+    return [dict(zip(fields, values)) for values in itertools.product(*(grid[f] for f in fields))]
+
+def apply_scenario(project: dict, overrides: dict) -> dict:
+    """Returns a copy of project with metadata overrides
+
+    The duration is overridden by moving the end time, since it is derived
+    from the start and end times.
+
+    """
+    variant = {**project, **{k: v for k, v in overrides.items() if k != 'duration_days'}}
+    if 'duration_days' in overrides:
+        variant['end_time'] = project['start_time'] + datetime.timedelta(
+            days=overrides['duration_days'])
+    return variant
+
+def get_scenarios(project: dict, scenarios: 'list[dict]') -> dict:
+    """Estimates project and its variants with metadata overrides
+
+    Text data is tokenized and vectorized once, and its row is repeated
+    for every variant next to the metadata of the variant, so all variants
+    are predicted with one model call and cost about one estimation.
+
+    Returns:
+        Dict with `score` and `greater_than` of project, and `scenarios`
+        with the overrides, score and greater_than of each variant.
+
+    """
+    with registry.snapshot():
+        tokens = tokenize([project])
+        _, input_vector = vectorize(tokens)
+        variants = [project] + [apply_scenario(project, s) for s in scenarios]
+        with metrics.timer('metadata'):
+            x_meta = metadata_encoder.encode(variants)
+        with metrics.timer('input_construction'):
+            x_text = sparse.hstack([input_vector[c] for c in COLS], format='csr')
+            x_all = sparse.hstack(
+                [x_text[np.zeros(len(variants), dtype=np.int64)], sparse.csr_matrix(x_meta)],
+                format='csr'
+            )
+        bundle = registry.get('bundle')
+        with metrics.timer('prediction'):
+            probs = bundle.predict_prob(x_all)
+        greater_than = bundle.percentile(probs)
+        return {
+            'score': float(probs[0]),
+            'greater_than': float(greater_than[0]),
+            'scenarios': [
+                {'overrides': s, 'score': float(p), 'greater_than': float(g)}
+                for s, p, g in zip(scenarios, probs[1:], greater_than[1:])
+            ]
+        }
@@ -0,0 +1,252 @@
+"""Estimation jobs
+
+This module contains JobQueue to run estimations in the background with a
+bounded thread pool, and the job stores keeping their status and results
+until they expire, in memory or in a local SQLite database shared by the
+workers on a host.
+
+    Typical usage example:
+
+    from app.utils.jobs import JobQueue, MemoryJobStore, SQLiteJobStore
+
+    queue = JobQueue(MemoryJobStore(ttl=600), workers=2, max_queued=32)
+    queue = JobQueue(SQLiteJobStore('path/to/jobs.sqlite3', ttl=600))
+    job_id = queue.submit(get_estimation, project)
+    queue.get(job_id)
+    queue.cancel(job_id)
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+import pathlib
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+from app import logger
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue has too many jobs waiting to run"""
+
+def new_job(job_id: str) -> dict:
+    """Returns the record of a queued job"""
+    now = time.time()
+    return {
+        'id': job_id,
+        'status': QUEUED,
+        'created_at': now,
+        'updated_at': now,
+        'result': None,
+        'error': None
+    }
+
+class MemoryJobStore(object):
+    """Job store in the memory of the process
+
+    Attributes:
+        ttl (float): Seconds to keep finished jobs
+
+    """
+
+    def __init__(self, ttl: float = 600) -> None:
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def put(self, job: dict) -> None:
+        """Stores job"""
+        with self._lock:
+            self._jobs[job['id']] = dict(job)
+
+    def get(self, job_id: str) -> 'dict|None':
+        """Returns job, or None if not found or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or self._is_expired(job, time.time()):
+                self._jobs.pop(job_id, None)
+                return None
+            return dict(job)
+
+    def transition(self, job_id: str, statuses: 'tuple[str]', **fields) -> bool:
+        """Updates job if its status is one of statuses, returns true if updated"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in statuses:
+                return False
+            job.update(fields, updated_at=time.time())
+            return True
+
+    def purge(self) -> None:
+        """Removes expired jobs"""
+        now = time.time()
+        with self._lock:
+            for job_id in [k for k, v in self._jobs.items() if self._is_expired(v, now)]:
+                del self._jobs[job_id]
+
+    def _is_expired(self, job: dict, now: float) -> bool:
+        """Returns true if job finished more than ttl seconds ago"""
+        return job['status'] in FINISHED and job['updated_at'] < now - self.ttl
+
+class SQLiteJobStore(object):
+    """Job store in a local SQLite database
+
+    Workers on the same host sharing the database can poll and cancel the
+    jobs of each other. Results are stored pickled. Each thread opens its
+    own connection on first use, so the store can be created before the
+    server forks its workers.
+
+    Attributes:
+        path (pathlib.Path): File of the database
+        ttl (float): Seconds to keep finished jobs
+
+    """
+
+    COLUMNS = ['id', 'status', 'created_at', 'updated_at', 'result', 'error']
+
+    def __init__(self, path: 'str|pathlib.Path', ttl: float = 600) -> None:
+        self.path = pathlib.Path(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, '
+            'created_at REAL NOT NULL, updated_at REAL NOT NULL, result BLOB, error TEXT)'
+        )
+
+    def put(self, job: dict) -> None:
+        """Stores job"""
+        self._connect().execute(
+            'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)',
+            self._to_row(job)
+        )
+
+    def get(self, job_id: str) -> 'dict|None':
+        """Returns job, or None if not found or expired"""
+        row = self._connect().execute(
+            f'SELECT {", ".join(self.COLUMNS)} FROM jobs WHERE id = ? '
+            f'AND NOT (status IN ({", ".join("?" * len(FINISHED))}) AND updated_at < ?)',
+            (job_id, *FINISHED, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job['result'] = None if job['result'] is None else pickle.loads(job['result'])
+        return job
+
+    def transition(self, job_id: str, statuses: 'tuple[str]', **fields) -> bool:
+        """Updates job if its status is one of statuses, returns true if updated"""
+        fields = {**fields, 'updated_at': time.time()}
+        if fields.get('result') is not None:
+            fields['result'] = pickle.dumps(fields['result'])
+        cursor = self._connect().execute(
+            f'UPDATE jobs SET {", ".join(f"{k} = ?" for k in fields)} '
+            f'WHERE id = ? AND status IN ({", ".join("?" * len(statuses))})',
+            (*fields.values(), job_id, *statuses)
+        )
+        return cursor.rowcount > 0
+
+    def purge(self) -> None:
+        """Removes expired jobs"""
+        self._connect().execute(
+            f'DELETE FROM jobs WHERE status IN ({", ".join("?" * len(FINISHED))}) '
+            'AND updated_at < ?',
+            (*FINISHED, time.time() - self.ttl)
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def _to_row(self, job: dict) -> tuple:
+        """Returns the row of job"""
+        row = dict(job)
+        row['result'] = None if row['result'] is None else pickle.dumps(row['result'])
+        return tuple(row[c] for c in self.COLUMNS)
+
+class JobQueue(object):
+    """Queue of background jobs with a bounded thread pool
+
+    At most `workers` jobs run at the same time, and submitting fails with
+    QueueFullError while `max_queued` jobs of this process are waiting.
+    Only waiting jobs can be cancelled, a running job always finishes. A
+    cancelled job frees its slot at once if cancelled through this queue,
+    otherwise when a worker skips it.
+
+    Attributes:
+        store (MemoryJobStore|SQLiteJobStore): Store of job records
+        workers (int): Number of threads running jobs
+        max_queued (int): Maximum number of waiting jobs
+
+    """
+
+    def __init__(self, store: 'MemoryJobStore|SQLiteJobStore', workers: int = 2,
+        max_queued: int = 32) -> None:
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+
+    def submit(self, func, *args) -> str:
+        """Queues `func(*args)`, returns the job ID
+
+        Raises:
+            QueueFullError: If too many jobs are waiting
+
+        """
+        with self._lock:
+            if len(self._queued) >= self.max_queued:
+                raise QueueFullError(f'{len(self._queued)} jobs are waiting')
+            job_id = uuid.uuid4().hex
+            self._queued.add(job_id)
+        self.store.purge()
+        self.store.put(new_job(job_id))
+        self._executor.submit(self._run, job_id, func, args)
+        return job_id
+
+    def get(self, job_id: str) -> 'dict|None':
+        """Returns job, or None if not found or expired"""
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels job if it is waiting, returns true if cancelled"""
+        cancelled = self.store.transition(job_id, (QUEUED,), status=CANCELLED)
+        if cancelled:
+            with self._lock:
+                self._queued.discard(job_id)
+        return cancelled
+
+    def stats(self) -> dict:
+        """Returns number of waiting jobs, limit and workers of this process"""
+        return {
+            'queued': len(self._queued),
+            'max_queued': self.max_queued,
+            'workers': self.workers
+        }
+
+    def _run(self, job_id: str, func, args: tuple) -> None:
+        """Runs job unless cancelled and stores its result or error"""
+        with self._lock:
+            self._queued.discard(job_id)
+        if not self.store.transition(job_id, (QUEUED,), status=RUNNING):
+            return
+        try:
+            result = func(*args)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning('Job %s failed: %s', job_id, str(error))
+            self.store.transition(job_id, (RUNNING,), status=FAILED, error=str(error))
+            return
+        self.store.transition(job_id, (RUNNING,), status=DONE, result=result)
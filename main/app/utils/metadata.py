@@ -0,0 +1,127 @@
+"""Metadata encoder
+
+This module contains MetadataEncoder to encode project metadata into the
+metadata features of the model input, and CategoryTable to code the
+names of a categorical column by small integers.
+
+    Typical usage example:
+
+    from app.utils.metadata import CategoryTable, MetadataEncoder
+
+    encoder = MetadataEncoder()
+    encoder.encode([project, another_project])
+
+    table = CategoryTable(['出版', '設計'])
+    table.encode(['設計', 'unknown'])
+
+"""
+import numpy as np
+
+META_FEATURES = ['facebook', 'instagram', 'youtube', 'website', 'set_count',
+    'duration_days', 'description_length', 'content_length', 'title_length',
+    'type_群眾集資', 'type_訂閱式專案', 'type_預購式專案', 'domain_出版', 'domain_地方創生',
+    'domain_挺好店', 'domain_插畫漫畫', 'domain_攝影', 'domain_教育', 'domain_時尚',
+    'domain_社會', 'domain_科技', 'domain_空間', 'domain_藝術', 'domain_表演',
+    'domain_設計', 'domain_遊戲', 'domain_電影動畫', 'domain_音樂', 'domain_飲食',
+    'log_goal', 'log_max_set_prices', 'log_min_set_prices']
+
+CATE_COLS = ['type', 'domain']
+
+class CategoryTable(object):
+    """Table of the names of a categorical column, coded by small integers
+
+    Attributes:
+        names (list[str]): Name of each code
+        codes (dict[str, int]): Code of each name
+
+    """
+
+    def __init__(self, names: 'list[str]') -> None:
+        self.names = list(names)
+        self.codes = {n: i for i, n in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def encode(self, values: 'list[str]', extend: bool = False) -> np.ndarray:
+        """Returns codes of values, -1 for unknown names
+
+        Unknown names are appended to the table instead if extend is true.
+
+        """
+        if extend:
+            for value in values:
+                if value not in self.codes:
+                    self.codes[value] = len(self.names)
+                    self.names.append(value)
+        return np.fromiter((self.codes.get(v, -1) for v in values),
+                           dtype=np.int16, count=len(values))
+
+class MetadataEncoder(object):
+    """Encoder of project metadata with a fixed column layout
+
+    Encodes projects into one float64 array with a row per project, including
+    the one-hot columns of type and domain (all zeros for unknown category),
+    the duration and lengths, and the log of goal and set prices.
+
+    Attributes:
+        features (list[str]): Names of encoded columns
+        index (dict[str, int]): Column of each feature
+        categories (dict[str, dict[str, int]]): Column of each category
+                                                of type and domain
+        tables (dict[str, CategoryTable]): Codes of categories of type and
+                                           domain, in column order
+        category_columns (dict[str, np.ndarray]): Column of each code
+
+    """
+
+    def __init__(self, features: 'list[str]' = META_FEATURES) -> None:
+        self.features = list(features)
+        self.index = {f: i for i, f in enumerate(self.features)}
+        self.categories = {
+            col: {
+                f[len(col)+1:]: i
+                for f, i in self.index.items()
+                if f.startswith(f'{col}_')
+            }
+            for col in CATE_COLS
+        }
+        self.tables = {col: CategoryTable(v) for col, v in self.categories.items()}
+        self.category_columns = {
+            col: np.array(list(v.values()), dtype=np.int64)
+            for col, v in self.categories.items()
+        }
+
+    def encode(self, projects: 'list[dict]') -> np.ndarray:
+        """Encodes metadata of projects
+
+        Also stores `duration_days`, `description_length` and
+        `content_length` into each project for the suggestion.
+
+        """
+        x_meta = np.zeros((len(projects), len(self.features)), dtype=np.float64)
+        for project in projects:
+            project['duration_days'] = (project['end_time'] - project['start_time']).days
+            project['description_length'] = len(project['description'])
+            project['content_length'] = len(project['content'])
+        for col in ['facebook', 'instagram', 'youtube', 'website', 'set_count',
+                    'duration_days', 'description_length', 'content_length']:
+            x_meta[:, self.index[col]] = [p[col] for p in projects]
+        x_meta[:, self.index['title_length']] = [len(p['title']) for p in projects]
+        for col, table in self.tables.items():
+            codes = table.encode([p[col] for p in projects])
+            rows = np.flatnonzero(codes >= 0)
+            x_meta[rows, self.category_columns[col][codes[rows]]] = 1
+        x_meta[:, self.index['log_goal']] = self.log_or_one([p['goal'] for p in projects])
+        x_meta[:, self.index['log_max_set_prices']] = self.log_or_one(
+            [p['max_set_prices'] for p in projects])
+        x_meta[:, self.index['log_min_set_prices']] = np.log(
+            np.array([p['min_set_prices'] for p in projects], dtype=np.float64) + 1)
+        return x_meta
+
+    @staticmethod
+    def log_or_one(values: 'list[int]') -> np.ndarray:
+        """Returns log of values, or 1 for zero values"""
+        values = np.array(values, dtype=np.float64)
+        nonzero = values != 0
+        return np.where(nonzero, np.log(np.where(nonzero, values, 1)), 1)
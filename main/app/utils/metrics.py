@@ -0,0 +1,187 @@
+"""Latency and request metrics
+
+This module contains Metrics to record latency histograms of the
+estimation stages and request counts, and to render them in the
+Prometheus text format. Only a sample of the stage timings is logged.
+
+    Typical usage example:
+
+    from app.utils.metrics import metrics
+
+    with metrics.timer('segmentation'):
+        segment(texts)
+    metrics.count_request('POST', '/estimation', 200, .5)
+    metrics.render()
+
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+import functools
+import os
+import random
+import threading
+import time
+
+from app import logger
+
+METRICS_PREFIX = 'crowditor'
+METRICS_LOG_SAMPLE_RATE = float(os.environ.get('METRICS_LOG_SAMPLE_RATE', .01))
+
+BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10.)
+
+def format_labels(labels: 'dict[str, str]') -> str:
+    """Formats labels of a sample, escaping the values"""
+    if not labels:
+        return ''
+    escaped = {
+        k: str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+        for k, v in labels.items()
+    }
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped.items()) + '}'
+
+def format_value(value: float) -> str:
+    """Formats value of a sample"""
+    if isinstance(value, bool):
+        return str(int(value))
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram(object):
+    """Histogram of observed seconds
+
+    Attributes:
+        buckets (tuple[float]): Upper bounds of buckets, in seconds
+        counts (list[int]): Number of observations in each bucket,
+                            the last one above every bound
+        sum (float): Sum of observations
+        count (int): Number of observations
+
+    """
+
+    def __init__(self, buckets: 'tuple[float]' = BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Records an observation, the lock of Metrics must be held"""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def samples(self, name: str, labels: 'dict[str, str]') -> 'list[str]':
+        """Returns the lines of cumulative buckets, sum and count"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": format_value(bound)})} '
+                         f'{cumulative}')
+        lines.append(f'{name}_sum{format_labels(labels)} {format_value(self.sum)}')
+        lines.append(f'{name}_count{format_labels(labels)} {self.count}')
+        return lines
+
+class Metrics(object):
+    """Registry of latency histograms, request counts and gauges
+
+    Attributes:
+        prefix (str): Prefix of metric names
+        log_sample_rate (float): Probability to log a stage timing
+        stages (dict[str, Histogram]): Latency of each stage
+        requests (dict[tuple, int]): Count of each method, endpoint and
+                                     status code
+        request_seconds (dict[str, Histogram]): Latency of each endpoint
+        gauges (dict[str, Callable[[], dict]]): Callbacks returning values
+                                                 of gauges
+
+    """
+
+    def __init__(self, prefix: str = METRICS_PREFIX, log_sample_rate: float = METRICS_LOG_SAMPLE_RATE
+        ) -> None:
+        self.prefix = prefix
+        self.log_sample_rate = log_sample_rate
+        self.stages = defaultdict(Histogram)
+        self.requests = defaultdict(int)
+        self.request_seconds = defaultdict(Histogram)
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Records the latency of a stage, logs it if sampled"""
+        with self._lock:
+            self.stages[stage].observe(seconds)
+        if self.log_sample_rate > 0 and random.random() < self.log_sample_rate:
+            logger.info('%s Time: %f', stage, seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Records the latency of the block as a stage"""
+        start_time = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter_ns() - start_time) / 1e9)
+
+    def timed(self, stage: str):
+        """Decorator to record the latency of a function as a stage"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count_request(self, method: str, endpoint: str, status: int, seconds: float) -> None:
+        """Records a handled request"""
+        with self._lock:
+            self.requests[(method, endpoint, status)] += 1
+            self.request_seconds[endpoint].observe(seconds)
+
+    def add_gauges(self, name: str, callback) -> None:
+        """Adds gauges `<prefix>_<name>_<key>` of the numbers returned by callback"""
+        self.gauges[name] = callback
+
+    def clear(self) -> None:
+        """Clears recorded histograms and counts"""
+        with self._lock:
+            self.stages.clear()
+            self.requests.clear()
+            self.request_seconds.clear()
+
+    def render(self) -> str:
+        """Returns the metrics in the Prometheus text format"""
+        stage_name = f'{self.prefix}_stage_seconds'
+        request_name = f'{self.prefix}_request_seconds'
+        count_name = f'{self.prefix}_requests_total'
+        lines = []
+        with self._lock:
+            lines += [f'# HELP {stage_name} Latency of estimation stages',
+                      f'# TYPE {stage_name} histogram']
+            for stage, histogram in sorted(self.stages.items()):
+                lines += histogram.samples(stage_name, {'stage': stage})
+            lines += [f'# HELP {request_name} Latency of requests',
+                      f'# TYPE {request_name} histogram']
+            for endpoint, histogram in sorted(self.request_seconds.items()):
+                lines += histogram.samples(request_name, {'endpoint': endpoint})
+            lines += [f'# HELP {count_name} Handled requests',
+                      f'# TYPE {count_name} counter']
+            for (method, endpoint, status), count in sorted(self.requests.items()):
+                labels = {'method': method, 'endpoint': endpoint, 'status': status}
+                lines.append(f'{count_name}{format_labels(labels)} {count}')
+        for name, callback in list(self.gauges.items()):
+            try:
+                values = callback()
+            except Exception as error:  # pylint: disable=broad-except
+                logger.warning('Failed to collect %s metrics: %s', name, str(error))
+                continue
+            for key, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    gauge_name = f'{self.prefix}_{name}_{key}'
+                    lines += [f'# TYPE {gauge_name} gauge', f'{gauge_name} {format_value(value)}']
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
@@ -0,0 +1,163 @@
+"""Peer retrieval index
+
+This module contains indexes to retrieve the projects with the highest
+cosine similarity to a normalized vector: ExactIndex scans every project,
+IVFIndex only scans the clusters closest to the query.
+
+    Typical usage example:
+
+    from app.utils.peer_index import load_peer_index
+
+    index = load_peer_index('ivf', vectors, 'path/to/peer_index.npz')
+    index.search(query, k=20, threshold=.05)
+
+    Build the IVF index offline (from main/):
+
+    python -m app.utils.peer_index
+
+"""
+import pathlib
+
+import numpy as np
+
+from app import logger
+
+BACKENDS = ['exact', 'ivf']
+
+def top_k(candidates: np.ndarray, cos: np.ndarray, k: int, threshold: float
+    ) -> 'tuple[np.ndarray, np.ndarray]':
+    """Returns the top-k candidates above threshold, in descending similarity"""
+    keep = cos >= threshold
+    candidates, cos = candidates[keep], cos[keep]
+    if len(candidates) > k:
+        part = np.argpartition(-cos, k - 1)[:k]
+        candidates, cos = candidates[part], cos[part]
+    order = np.lexsort((candidates, -cos))
+    return candidates[order], cos[order]
+
+class ExactIndex(object):
+    """Brute-force index over every project
+
+    Attributes:
+        vectors (np.ndarray): Normalized vectors of projects
+
+    """
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self.vectors = vectors
+
+    def search(self, query: np.ndarray, k: int, threshold: float
+        ) -> 'tuple[np.ndarray, np.ndarray]':
+        """Returns positions and cosine similarities of the top-k projects"""
+        cos = np.asarray(self.vectors @ query).ravel()
+        return top_k(np.arange(len(cos)), cos, k, threshold)
+
+class IVFIndex(object):
+    """Inverted file index with spherical k-means clusters
+
+    Projects are grouped by their nearest centroid. A query only scans the
+    projects of the `n_probe` centroids most similar to it, so the result is
+    approximate unless `n_probe` equals the number of clusters.
+
+    Attributes:
+        vectors (np.ndarray): Normalized vectors of projects
+        centroids (np.ndarray): Normalized centroids of clusters
+        order (np.ndarray): Positions of projects sorted by cluster
+        offsets (np.ndarray): Start of each cluster in order
+        n_probe (int): Number of clusters to scan per query
+
+    """
+
+    def __init__(self,
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        assignment: np.ndarray,
+        n_probe: int = 8
+    ) -> None:
+        self.vectors = vectors
+        self.centroids = centroids
+        self.order = np.argsort(assignment, kind='stable')
+        self.offsets = np.concatenate([
+            [0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))
+        ])
+        self.n_probe = min(n_probe, len(centroids))
+
+    @classmethod
+    def build(cls,
+        vectors: np.ndarray,
+        n_lists: 'int|None' = None,
+        n_probe: int = 8,
+        iterations: int = 10,
+        seed: int = 0
+    ) -> 'IVFIndex':
+        """Clusters vectors with spherical k-means"""
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        rng = np.random.default_rng(seed)
+        nonzero = np.flatnonzero(np.any(vectors != 0, axis=1))
+        pool = nonzero if len(nonzero) >= n_lists else np.arange(len(vectors))
+        centroids = np.array(vectors[rng.choice(pool, n_lists, replace=False)], dtype=np.float64)
+        for _ in range(iterations):
+            assignment = cls.assign(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            norm = np.linalg.norm(sums, axis=1)
+            filled = norm > 0
+            centroids[filled] = sums[filled] / norm[filled, None]
+        return cls(vectors, centroids, cls.assign(vectors, centroids), n_probe)
+
+    @staticmethod
+    def assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 4096) -> np.ndarray:
+        """Returns the most similar centroid of each vector"""
+        return np.concatenate([
+            np.argmax(vectors[i:i+chunk] @ centroids.T, axis=1)
+            for i in range(0, len(vectors), chunk)
+        ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+    def save(self, filename: 'str|pathlib.Path') -> None:
+        """Save centroids and cluster assignment"""
+        assignment = np.empty(len(self.order), dtype=np.int64)
+        assignment[self.order] = np.repeat(np.arange(len(self.centroids)), np.diff(self.offsets))
+        np.savez(filename, centroids=self.centroids, assignment=assignment)
+
+    @classmethod
+    def load(cls, filename: 'str|pathlib.Path', vectors: np.ndarray, n_probe: int = 8) -> 'IVFIndex':
+        """Load index built for vectors from file"""
+        with np.load(filename) as data:
+            if len(data['assignment']) != len(vectors):
+                raise ValueError('The index was built for other vectors')
+            return cls(vectors, data['centroids'], data['assignment'], n_probe)
+
+    def search(self, query: np.ndarray, k: int, threshold: float
+        ) -> 'tuple[np.ndarray, np.ndarray]':
+        """Returns positions and cosine similarities of the approximate top-k projects"""
+        probe = np.argpartition(-(self.centroids @ query), self.n_probe - 1)[:self.n_probe]
+        candidates = np.concatenate([
+            self.order[self.offsets[c]:self.offsets[c+1]]
+            for c in probe
+        ])
+        cos = np.asarray(self.vectors[candidates] @ query).ravel()
+        return top_k(candidates, cos, k, threshold)
+
+def load_peer_index(backend: str, vectors: np.ndarray, filename: 'str|pathlib.Path',
+    n_probe: int = 8) -> 'ExactIndex|IVFIndex':
+    """Loads peer index of backend, builds the IVF index if its file is missing
+
+    Raises:
+        ValueError: If the backend is unknown
+
+    """
+    if backend == 'exact':
+        return ExactIndex(vectors)
+    if backend == 'ivf':
+        if pathlib.Path(filename).exists():
+            return IVFIndex.load(filename, vectors, n_probe)
+        logger.warning('Peer index %s not found, building it at startup', str(filename))
+        return IVFIndex.build(vectors, n_probe=n_probe)
+    raise ValueError(f'Unknown peer index backend: {backend}')
+
+if __name__ == "__main__":  # pragma: no cover
+    from app.utils.registry import registry
+    from app.utils.suggest import PEER_INDEX_FILE
+    peer_index_file = registry.generation().directory / PEER_INDEX_FILE
+    IVFIndex.build(registry.get('artifacts')['vectors_norm']['content']).save(peer_index_file)
+    logger.info('Saved peer index to %s', str(peer_index_file))
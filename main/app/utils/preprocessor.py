@@ -11,13 +11,11 @@ This module contains Preprocessor to process splitted tokens.
 
 """
 import pickle
-import pathlib
 import re
-from functools import reduce
 
-FILE_PATH = pathlib.Path(__file__).parent.resolve()
+from app import DATA_PATH
 
-with open(FILE_PATH / '../data/model/delim.pickle', 'rb') as file:
+with open(DATA_PATH / 'model/delim.pickle', 'rb') as file:
     DELEMINATORS = pickle.load(file)
 
 EMOJI_PATTERN = re.compile("["
@@ -29,27 +27,56 @@ EMOJI_PATTERN = re.compile("["
 
 FITLER_WORDS = list(map(str,range(10))) + ['$', '%']
 
+# ref:https://segmentfault.com/a/1190000006197218
+FULL2HALF_TABLE = {0x3000: 32, **{i: i - 0xfee0 for i in range(0xFF01, 0xFF5F)}}
+
+SEPARATOR = '\n'
+
 def full2half(string: str) -> str:
     """Convert full-width text to half-width one"""
-    # ref:https://segmentfault.com/a/1190000006197218
-    result = ''
-    for char in string:
-        num = ord(char)
-        if num == 0x3000:
-            num = 32
-        elif 0xFF01 <= num <= 0xFF5E:
-            num -= 0xfee0
-        num = chr(num)
-        result += num
-    return result
+    return string.translate(FULL2HALF_TABLE)
+
+def is_order_free(deliminators: 'list[str]') -> bool:
+    """Returns true if replacing deliminators one by one in any order gives the same text
+
+    Holds if no deliminator is empty or contains whitespace, none is part of
+    another and none starts with the end of another, so occurrences of
+    different deliminators never overlap.
+
+    """
+    delims = set(deliminators)
+    if any(not d or any(c.isspace() for c in d) for d in delims):
+        return False
+    for a in delims:
+        for b in delims - {a}:
+            if a in b or any(a[-i:] == b[:i] for i in range(1, min(len(a), len(b)))):
+                return False
+    return True
+
+def compile_alternation(words: 'list[str]') -> 're.Pattern[str]|None':
+    """Compiles words into one regex matching any of them, longest first"""
+    if not words:
+        return None
+    words = sorted(set(words), key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, words)))
 
 class Preprocessor(object):
     """Preprocessor
 
+    Processes all tokens of a document in one pass over the joined text
+    when the deliminators cannot span the separator between tokens, and
+    replaces all deliminators with one regex when their order does not
+    matter. Either way the output is the same as processing token by token
+    and replacing deliminators one by one.
+
     Attributes:
         deliminators (list[str])
         emoji_pattern (re.Pattern[str])
         filter_words (list[str])
+        deli_pattern (re.Pattern[str]|None): Alternation of deliminators,
+                                             None if their order matters
+        filter_pattern (re.Pattern[str]|None): Alternation of filter words
+        join_tokens (bool): True if tokens can be processed as one text
 
     """
 
@@ -61,6 +88,10 @@ class Preprocessor(object):
         self.deliminators = deliminators
         self.emoji_pattern = emoji_pattern
         self.filter_words = filter_words
+        self.deli_pattern = (compile_alternation(deliminators)
+                             if is_order_free(deliminators) else None)
+        self.filter_pattern = compile_alternation(filter_words)
+        self.join_tokens = not any(SEPARATOR in d for d in deliminators)
 
     def remove_emoji(self, string: str) -> str:
         """Removes emoji from text"""
@@ -68,15 +99,25 @@ class Preprocessor(object):
 
     def deli(self, string: str) -> str:
         """Replaces deliminators with space"""
-        return reduce(lambda x, y: x.replace(y, ' '), self.deliminators, string)
+        if self.deli_pattern is not None:
+            return self.deli_pattern.sub(' ', string)
+        for deliminator in self.deliminators:
+            string = string.replace(deliminator, ' ')
+        return string
 
     def further_split(self, doc: 'list[str]') -> 'list[str]':
         """Splits tokens after further preprocessing"""
-        return reduce(lambda x, y: x+self.deli(self.remove_emoji(full2half(y))).split(), doc, [])
+        if self.join_tokens:
+            return self.deli(self.remove_emoji(full2half(SEPARATOR.join(doc)))).split()
+        result = []
+        for token in doc:
+            result.extend(self.deli(self.remove_emoji(full2half(token))).split())
+        return result
 
     def no_filter_word(self, string: str) -> bool:
         """Returns true if string is not empty and does not contain words to filter"""
-        return string and not any(f in string for f in self.filter_words)
+        return bool(string) and (
+            self.filter_pattern is None or self.filter_pattern.search(string) is None)
 
     def single_process(self, doc: 'list[str]') -> 'list[str]':
         """Preprocess single token"""
@@ -0,0 +1,314 @@
+"""Model registry
+
+This module contains ModelRegistry to load the models of the estimation
+on first use, or in the background at boot, and to report their status.
+Components loaded from the data directory are versioned: a new version
+is loaded in the background, validated and swapped in at once, while
+each request keeps using the version it started with.
+
+    Typical usage example:
+
+    from app.utils.registry import registry
+
+    registry.register('segmentor', lambda: CkipWordSegmenter())
+    registry.register('bundle', lambda directory: ModelBundle.load(directory / 'model'),
+                      versioned=True)
+    registry.get('bundle')
+    registry.warm_up()
+    registry.status()
+
+    with registry.snapshot():
+        registry.get('bundle')
+    registry.reload('path/to/new/data/')
+
+"""
+from contextlib import contextmanager
+import contextvars
+import itertools
+import pathlib
+import threading
+import time
+
+from app import DATA_PATH, logger
+
+VERSION_FILE = 'VERSION'
+
+def read_version(directory: pathlib.Path) -> str:
+    """Returns the content of the VERSION file of directory, or its name"""
+    try:
+        return (directory / VERSION_FILE).read_text(encoding='utf-8').strip() or directory.name
+    except OSError:
+        return directory.name
+
+class Components(object):
+    """Lazily loaded components
+
+    Each component is loaded by its loader the first time it is requested,
+    exactly once even if requested from many threads at the same time. A
+    failed load is recorded and retried by the next request.
+
+    """
+
+    def __init__(self) -> None:
+        self.components = {}
+        self.seconds = {}
+        self.errors = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str, loader):
+        """Returns the component, loads it if not loaded yet"""
+        if name in self.components:
+            return self.components[name]
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self.components:
+                start_time = time.time()
+                try:
+                    component = loader()
+                except Exception as error:
+                    self.errors[name] = str(error)
+                    raise
+                self.seconds[name] = time.time() - start_time
+                self.errors.pop(name, None)
+                self.components[name] = component
+                logger.info('Loading %s Time: %f', name, self.seconds[name])
+        return self.components[name]
+
+    def unload(self, name: str) -> None:
+        """Drops the component and its status"""
+        self.components.pop(name, None)
+        self.seconds.pop(name, None)
+        self.errors.pop(name, None)
+
+    def status(self, name: str) -> dict:
+        """Returns whether the component is loaded, its loading seconds and error"""
+        return {
+            'loaded': name in self.components,
+            'seconds': self.seconds.get(name),
+            'error': self.errors.get(name)
+        }
+
+class Generation(Components):
+    """Versioned components loaded from one data directory
+
+    Attributes:
+        number (int): Sequence number of the generation in the process
+        directory (pathlib.Path): Resolved data directory
+        version (str): Version of the data
+
+    """
+
+    def __init__(self, number: int, directory: 'str|pathlib.Path') -> None:
+        super().__init__()
+        self.number = number
+        self.directory = pathlib.Path(directory).resolve()
+        self.version = read_version(self.directory)
+
+class ModelRegistry(object):
+    """Registry of lazily loaded components
+
+    Versioned components are loaded from the data directory of the active
+    generation, the others are shared by all generations. `reload` loads
+    every versioned component of a new directory in the background, runs
+    the checks and replaces the active generation only if all of them
+    pass. Code running inside `snapshot` (or between `pin` and `unpin`)
+    keeps getting the components of the generation active when it
+    started.
+
+    Attributes:
+        loaders (dict[str, Callable]): Loader of each component, in
+                                       registration order
+        versioned (set[str]): Names of versioned components, whose loaders
+                              take the data directory
+        checks (list[Callable[[], None]]): Checks of a new generation,
+                                           raising on invalid data
+        reload_status (dict): Version, directory, status and error of
+                              the last reload
+
+    """
+
+    def __init__(self, directory: 'str|pathlib.Path' = DATA_PATH) -> None:
+        self.loaders = {}
+        self.versioned = set()
+        self.checks = []
+        self.reload_status = {}
+        self._numbers = itertools.count()
+        self._shared = Components()
+        self._active = Generation(next(self._numbers), directory)
+        self._pinned = contextvars.ContextVar('generation', default=None)
+        self._lock = threading.Lock()
+        self._warm_up = None
+        self._reload = None
+        self._watch = None
+        self._unwatch = threading.Event()
+
+    def register(self, name: str, loader, versioned: bool = False) -> None:
+        """Registers the loader of a component, unloading the previous one"""
+        with self._lock:
+            self.loaders[name] = loader
+            if versioned:
+                self.versioned.add(name)
+            else:
+                self.versioned.discard(name)
+            self._shared.unload(name)
+            self._active.unload(name)
+
+    def add_check(self, check) -> None:
+        """Adds a check of new generations, called with the generation pinned"""
+        self.checks.append(check)
+
+    def generation(self) -> Generation:
+        """Returns the pinned generation, or the active one"""
+        return self._pinned.get() or self._active
+
+    def version(self) -> str:
+        """Returns the version of the pinned generation, or the active one"""
+        return self.generation().version
+
+    def get(self, name: str):
+        """Returns the component, loads it if not loaded yet
+
+        Raises:
+            KeyError: If the component is not registered
+
+        """
+        loader = self.loaders[name]
+        if name in self.versioned:
+            generation = self.generation()
+            return generation.load(name, lambda: loader(generation.directory))
+        return self._shared.load(name, loader)
+
+    def pin(self) -> contextvars.Token:
+        """Pins the active generation in the current context, if not pinned yet"""
+        return self._pinned.set(self.generation())
+
+    def unpin(self, token: contextvars.Token) -> None:
+        """Restores the generation pinned before `pin`"""
+        self._pinned.reset(token)
+
+    @contextmanager
+    def snapshot(self):
+        """Uses one generation for every component requested inside"""
+        token = self.pin()
+        try:
+            yield self.generation()
+        finally:
+            self.unpin(token)
+
+    def is_loaded(self, name: str) -> bool:
+        """Returns true if the component is loaded"""
+        return name in self._store(name).components
+
+    def is_ready(self) -> bool:
+        """Returns true if all components are loaded"""
+        return all(self.is_loaded(name) for name in list(self.loaders))
+
+    def warm_up(self) -> threading.Thread:
+        """Loads all components in a background thread, if not running yet
+
+        A warm-up is started again once the previous one has finished, so
+        the components which failed to load are retried.
+
+        """
+        with self._lock:
+            if self._warm_up is None or not self._warm_up.is_alive():
+                self._warm_up = threading.Thread(
+                    target=self._load_all, name='model-warm-up', daemon=True)
+                self._warm_up.start()
+            return self._warm_up
+
+    def status(self) -> 'dict[str, dict]':
+        """Returns whether each component is loaded, its loading seconds and error"""
+        return {name: self._store(name).status(name) for name in list(self.loaders)}
+
+    def reload(self, directory: 'str|pathlib.Path|None' = None) -> threading.Thread:
+        """Loads the versioned components of directory in a background
+        thread and activates them if valid, if no reload is running
+
+        Reloads the data directory of the app if directory is None, which
+        picks up the new target if it is a symbolic link.
+
+        """
+        with self._lock:
+            if self._reload is None or not self._reload.is_alive():
+                generation = Generation(next(self._numbers), directory or DATA_PATH)
+                self.reload_status = {
+                    'version': generation.version,
+                    'directory': str(generation.directory),
+                    'status': 'loading',
+                    'error': None
+                }
+                self._reload = threading.Thread(
+                    target=self._activate, args=(generation,), name='model-reload', daemon=True)
+                self._reload.start()
+            return self._reload
+
+    def watch(self, interval: float) -> threading.Thread:
+        """Reloads in the background whenever the data directory of the app
+        resolves to another directory or its version changes, until
+        `unwatch` is called"""
+        with self._lock:
+            if self._watch is None or not self._watch.is_alive():
+                self._unwatch.clear()
+                self._watch = threading.Thread(
+                    target=self._watch_data, args=(interval, self._read_data()),
+                    name='model-watch', daemon=True)
+                self._watch.start()
+            return self._watch
+
+    def unwatch(self) -> None:
+        """Stops watching the data directory of the app"""
+        self._unwatch.set()
+        with self._lock:
+            watch = self._watch
+        if watch is not None:
+            watch.join()
+
+    def _store(self, name: str) -> Components:
+        """Returns the components holding name"""
+        return self.generation() if name in self.versioned else self._shared
+
+    def _load_all(self) -> None:
+        """Loads every component, logs the failures"""
+        for name in list(self.loaders):
+            try:
+                self.get(name)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.warning('Failed to load %s: %s', name, str(error))
+
+    def _activate(self, generation: Generation) -> None:
+        """Loads and checks every versioned component of generation, then
+        makes it the active generation"""
+        token = self._pinned.set(generation)
+        try:
+            for name in [n for n in list(self.loaders) if n in self.versioned]:
+                self.get(name)
+            for check in self.checks:
+                check()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning('Failed to reload version %s from %s: %s',
+                           generation.version, str(generation.directory), str(error))
+            self.reload_status = {**self.reload_status, 'status': 'failed', 'error': str(error)}
+            return
+        finally:
+            self._pinned.reset(token)
+        self._active = generation
+        self.reload_status = {**self.reload_status, 'status': 'active'}
+        logger.info('Activated version %s from %s', generation.version, str(generation.directory))
+
+    def _read_data(self) -> 'tuple[pathlib.Path, str]':
+        """Returns the resolved data directory of the app and its version"""
+        directory = DATA_PATH.resolve()
+        return directory, read_version(directory)
+
+    def _watch_data(self, interval: float, last: 'tuple[pathlib.Path, str]') -> None:
+        """Polls the data directory of the app, reloads when it differs from last"""
+        while not self._unwatch.wait(interval):
+            current = self._read_data()
+            if current != last:
+                last = current
+                self.reload(current[0])
+
+registry = ModelRegistry()
@@ -0,0 +1,123 @@
+"""Fast response serializer
+
+This module contains FastSerializer to dump a response with converters
+compiled once from a marshmallow schema and encode it with orjson, falling
+back to the standard json module if orjson is not installed.
+
+    Typical usage example:
+
+    from app.utils.serializer import FastSerializer
+
+    serializer = FastSerializer(ResponseSchema())
+    serializer.dumps(result)
+    serializer.make_response(result)
+
+"""
+import json
+import math
+
+from flask import Response
+from marshmallow import Schema, fields, missing
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+class NonFiniteError(ValueError):
+    """Raised by converters when a float is NaN or infinite"""
+
+def to_native(value):
+    """Converts numpy values into Python values for the json module"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def finite_float(value) -> float:
+    """Converts value into float, raises NonFiniteError if it is not finite"""
+    value = float(value)
+    if not math.isfinite(value):
+        raise NonFiniteError(value)
+    return value
+
+def compile_field(field: fields.Field, finite: bool):
+    """Compiles the converter of a field, None stays None as in marshmallow"""
+    if isinstance(field, fields.Nested):
+        convert = compile_schema(field.schema, finite)
+        if field.many:
+            return lambda v: None if v is None else [convert(x) for x in v]
+        return lambda v: None if v is None else convert(v)
+    if isinstance(field, fields.List):
+        inner = compile_field(field.inner, finite)
+        return lambda v: None if v is None else [inner(x) for x in v]
+    if isinstance(field, fields.Dict):
+        key = compile_field(field.key_field, finite) if field.key_field else None
+        value = compile_field(field.value_field, finite) if field.value_field else None
+        if key is None and value is None:
+            return lambda v: None if v is None else dict(v)
+        key = key or (lambda k: k)
+        value = value or (lambda x: x)
+        return lambda v: None if v is None else {key(k): value(x) for k, x in v.items()}
+    if isinstance(field, fields.Float) and not field.as_string:
+        convert = finite_float if finite else float
+        return lambda v: None if v is None else convert(v)
+    if isinstance(field, fields.Integer) and not field.as_string:
+        return lambda v: None if v is None else int(v)
+    if isinstance(field, fields.String):
+        return lambda v: None if v is None else str(v)
+    if type(field) is fields.Raw:  # pylint: disable=unidiomatic-typecheck
+        return lambda v: v
+    return lambda v: field._serialize(v, None, None)  # pylint: disable=protected-access
+
+def compile_schema(schema: Schema, finite: bool = False):
+    """Compiles the converter of a schema, the same as `schema.dump` on dicts"""
+    converters = [
+        (field.attribute or name, field.data_key or name, compile_field(field, finite))
+        for name, field in schema.dump_fields.items()
+    ]
+    def convert(obj: dict) -> dict:
+        result = {}
+        for attribute, key, converter in converters:
+            value = obj.get(attribute, missing)
+            if value is not missing:
+                result[key] = converter(value)
+        return result
+    return convert
+
+class FastSerializer(object):
+    """Serializer of responses bypassing marshmallow
+
+    Gives the same JSON as `jsonify(schema.dump(obj))` for dict objects,
+    with sorted keys and numpy values. orjson has no NaN, so responses with
+    a non-finite float field are encoded by the json module instead.
+
+    Attributes:
+        schema (Schema): Schema of the response
+
+    """
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self._convert = compile_schema(schema)
+        self._convert_finite = compile_schema(schema, finite=True)
+
+    def dumps(self, obj: dict) -> bytes:
+        """Returns the JSON bytes of obj"""
+        if orjson is not None:
+            try:
+                data = self._convert_finite(obj)
+            except NonFiniteError:
+                data = None
+            if data is not None:
+                return orjson.dumps(data, default=to_native, option=(
+                    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS
+                    | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+        return (json.dumps(self._convert(obj), default=to_native, sort_keys=True,
+                           separators=(',', ':'), ensure_ascii=False) + '\n').encode('utf-8')
+
+    def make_response(self, obj: dict, status: int = 200) -> Response:
+        """Returns the JSON response of obj"""
+        return Response(self.dumps(obj), status=status, mimetype='application/json')
@@ -0,0 +1,106 @@
+"""Pre-serialized static response
+
+This module contains StaticResponse to serve a static payload from JSON
+bytes serialized once, with gzip / brotli variants, ETag and 304 Not
+Modified support.
+
+    Typical usage example:
+
+    from app.utils.static_response import StaticResponse
+
+    response = StaticResponse(ResponseSchema(), 'path/to/data.pickle')
+    response.make_response()
+    response.reload()
+
+"""
+import gzip
+import hashlib
+import pathlib
+import pickle
+import threading
+
+from flask import Response, jsonify, request
+from marshmallow import Schema
+
+from app import app, logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+ENCODINGS = ['br', 'gzip']
+
+class StaticResponse(object):
+    """Static JSON response serialized once
+
+    The payload is dumped by the schema and encoded by `jsonify` once, so
+    the body is the same as marshalling it per request. Each content
+    coding has its own strong ETag.
+
+    Attributes:
+        schema (Schema): Schema to dump the payload
+        filename (pathlib.Path): Pickle file of the payload
+        bodies (dict[str, bytes]): Body of each content coding,
+                                   `identity` for the plain JSON
+        etags (dict[str, str]): ETag of each content coding
+
+    """
+
+    def __init__(self, schema: Schema, filename: 'str|pathlib.Path') -> None:
+        self.schema = schema
+        self.filename = pathlib.Path(filename)
+        self.bodies = {}
+        self.etags = {}
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> None:
+        """Load the payload from file and serialize it again"""
+        with open(self.filename, 'rb') as file:
+            data = pickle.load(file)
+        with app.app_context():
+            body = jsonify(self.schema.dump(data)).get_data()
+        bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies['br'] = brotli.compress(body, quality=11)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        etags = {
+            coding: digest if coding == 'identity' else f'{digest}-{coding}'
+            for coding in bodies
+        }
+        with self._lock:
+            self.bodies, self.etags = bodies, etags
+        logger.info('Serialized %s: %d bytes', self.filename.name, len(body))
+
+    def negotiate(self) -> str:
+        """Returns the best content coding accepted by the request"""
+        accepted = request.accept_encodings
+        qualities = {
+            coding: accepted.quality(coding)
+            for coding in ENCODINGS
+            if coding in self.bodies
+        }
+        best = max(qualities, key=qualities.get, default=None)
+        return best if best is not None and qualities[best] > 0 else 'identity'
+
+    def make_response(self) -> Response:
+        """Returns the response to the current request
+
+        Returns 304 Not Modified if the request has a matching ETag of any
+        content coding.
+
+        """
+        with self._lock:
+            bodies, etags = self.bodies, self.etags
+        coding = self.negotiate()
+        response = Response(mimetype='application/json')
+        response.set_etag(etags[coding])
+        response.vary.add('Accept-Encoding')
+        if any(request.if_none_match.contains_weak(e) for e in etags.values()):
+            response.status_code = 304
+            return response
+        response.set_data(bodies[coding])
+        if coding != 'identity':
+            response.content_encoding = coding
+        return response
@@ -9,195 +9,266 @@ This module provides function to suggest changes for project.
     get_suggestion(project, vector)
 
 """
-from functools import reduce
+import os
 import pathlib
-import pickle
-import time
 
 import numpy as np
-import pandas as pd
 
-from app import logger
-
-FILE_PATH = pathlib.Path(__file__).parent.resolve()
+from app.utils.artifacts import load_artifacts
+from app.utils.cache import PeerGroupCache
+from app.utils.metadata import CategoryTable, MetadataEncoder
+from app.utils.metrics import metrics
+from app.utils.peer_index import load_peer_index
+from app.utils.registry import registry
 
 THRESHOLD = .05
+TOP_K = 20
 
-dataset = pd.read_pickle(FILE_PATH / '../data/model/dataset.pickle')
-dataset['success'] = dataset['percentage'] >= 1
-
-with open(FILE_PATH / '../data/model/vectors_norm.pickle', 'rb') as file:
-    dataset_vectors = pickle.load(file)
+PEER_INDEX = os.environ.get('PEER_INDEX', 'exact')
+PEER_INDEX_PROBES = int(os.environ.get('PEER_INDEX_PROBES', 8))
+PEER_INDEX_FILE = 'model/peer_index.npz'
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '1') != '0'
+PEER_CACHE_SIZE = int(os.environ.get('PEER_CACHE_SIZE', 256))
 
-with open(FILE_PATH / '../data/model/tokens.pickle', 'rb') as file:
-    dataset_tokens = pickle.load(file)
+META_COLS = ['goal', 'content_length', 'duration_days', 'max_set_prices',
+             'description_length', 'min_set_prices']
+CATE_COLS = ['domain', 'type']
+BOX_PERCENTILES = {'box_min': 0, 'box_25': 25, 'box_50': 50, 'box_75': 75, 'box_max': 100}
 
-with open(FILE_PATH / '../data/model/filter_corpus.pickle', 'rb') as file:
-    filter_corpus = pickle.load(file)
+peer_cache = PeerGroupCache(max_size=PEER_CACHE_SIZE)
 
-with open(FILE_PATH / '../data/model/chi2.pickle', 'rb') as file:
-    chi2 = pickle.load(file)
+def load_suggest_artifacts(directory: pathlib.Path) -> dict:
+    """Load dataset and token statistics of the suggestion from data directory
 
-with open(FILE_PATH / '../data/model/odds.pickle', 'rb') as file:
-    odds = pickle.load(file)
+    The metadata columns are also kept as one row-major float array, so the
+    statistics of peers gather their rows at once, and type and domain as
+    codes of the tables of the metadata encoder, extended with the other
+    names in the dataset.
 
-def get_similar_project(vector: dict):
-    """Get dataframe of similar projects"""
-    cos = {
-        k: dataset_vectors[k] @ v.A.T
-        for k, v in vector.items()
-    }
-    cos_list = cos['content'].tolist()
-    dataset['cos'] = [item for sublist in cos_list for item in sublist]
-    return dataset[dataset['cos'] >= THRESHOLD].sort_values('cos', ascending=False).index.to_numpy()[:20]
-
-def get_text_suggestion(sim_proj, tokens: dict) -> dict:
-    """Generate text suggestion"""
-    peer_docs = {
-        c: np.array(v, dtype=object)[sim_proj]
-        for c, v in dataset_tokens.items()
-    }
-    peer_tokens = {
-        c: reduce(lambda x, y: x | set(y), v, set())
-        for c, v in peer_docs.items()
-    }
-    not_used_tokens = {
-        c: np.array(list(v - set(tokens[c])))
-        for c, v in peer_tokens.items()
-    }
-    not_used_tokens = {
-        k: v[np.isin(v, filter_corpus[k])]
-        for k, v in not_used_tokens.items()
-    }
-    not_used_tokens_docs = {
-        k: np.array([
-            [t in d for d in peer_docs[k]]
-            for t in v
-        ])
-        for k, v in not_used_tokens.items()
-    }
-    not_used_tokens_cnt = {
-        k: v.sum(axis=1)
-        for k, v in not_used_tokens_docs.items()
-    }
-    not_used_tokens_idx = {
-        k: [np.where(filter_corpus[k] == t)[0][0] for t in v]
-        for k, v in not_used_tokens.items()
-    }
-    not_used_chi2 = {
-        k: chi2[k][v]
-        for k, v in not_used_tokens_idx.items()
-    }
-    not_used_odds = {
-        k: odds[k][v]
-        for k, v in not_used_tokens_idx.items()
+    """
+    artifacts = load_artifacts(directory / 'model', mmap=MODEL_MMAP)
+    artifacts['dataset']['success'] = artifacts['dataset']['percentage'] >= 1
+    artifacts['meta_values'] = np.ascontiguousarray(
+        artifacts['dataset'][META_COLS].to_numpy(dtype=np.float64))
+    artifacts['success'] = artifacts['dataset']['success'].to_numpy(dtype=bool)
+    tables = MetadataEncoder().tables
+    artifacts['category_tables'] = {c: CategoryTable(tables[c].names) for c in CATE_COLS}
+    artifacts['category_codes'] = {
+        c: artifacts['category_tables'][c].encode(artifacts['dataset'][c], extend=True)
+        for c in CATE_COLS
     }
-    not_used_mult = {
-        k: v > 1
-        for k, v in not_used_tokens_cnt.items()
+    artifacts['corpus_index'] = {
+        c: {t: i for i, t in enumerate(v)}
+        for c, v in artifacts['filter_corpus'].items()
     }
-    not_used_positive = {
-        k: v > 1
-        for k, v in not_used_odds.items()
-    }
-    not_used_selected = {
-        k: v & not_used_positive[k]
-        for k, v in not_used_mult.items()
-    }
-    not_used_chi2_positive_rank = {
-        k: v[not_used_selected[k]].argsort()
-        for k, v in not_used_chi2.items()
+    return artifacts
+
+def load_suggest_peer_index(directory: pathlib.Path) -> 'ExactIndex|IVFIndex':
+    """Load peer index of dataset vectors from data directory"""
+    return load_peer_index(PEER_INDEX, registry.get('artifacts')['vectors_norm']['content'],
+                           directory / PEER_INDEX_FILE, PEER_INDEX_PROBES)
+
+def check_suggest_artifacts() -> None:
+    """Checks that the dataset and the token statistics have the same projects
+
+    Raises:
+        ValueError: If the number of rows differ
+
+    """
+    artifacts = registry.get('artifacts')
+    rows = {'dataset': len(artifacts['dataset'])}
+    for name in ['vectors_norm', 'doc_tokens']:
+        rows.update({f'{name}.{c}': v.shape[0] for c, v in artifacts[name].items()})
+    if len(set(rows.values())) > 1:
+        raise ValueError(f'Artifacts have different numbers of projects: {rows}')
+
+registry.register('artifacts', load_suggest_artifacts, versioned=True)
+registry.register('peer_index', load_suggest_peer_index, versioned=True)
+registry.add_check(check_suggest_artifacts)
+
+metrics.add_gauges('peer_cache', peer_cache.stats)
+
+def get_similar_project(vector: dict, k: int = TOP_K) -> 'tuple[np.ndarray, np.ndarray]':
+    """Get positions and cosine similarities of the top-k similar projects
+
+    Searches the peer index selected by PEER_INDEX and does not modify the
+    dataset, so it is safe to call from many threads.
+
+    """
+    return registry.get('peer_index').search(vector['content'].A.ravel(), k, THRESHOLD)
+
+def get_median(values: np.ndarray) -> np.ndarray:
+    """Returns median of each column, NaN if there is no row as in pandas"""
+    if len(values) == 0:
+        return np.full(values.shape[1], np.nan)
+    return np.median(values, axis=0)
+
+def aggregate_peer_group(peer_ids: np.ndarray) -> dict:
+    """Computes the aggregates of peers which do not depend on the project
+
+    Returns:
+        Dict with `peer_ids` (sorted positions of peers), `success_cnt`,
+        `text` (per column, the peer by token matrix, document frequencies
+        and candidate tokens ranked by chi-square p-value), `metadata`
+        (box statistics and medians of each metadata column, and metadata
+        rows of success peers).
+
+    """
+    artifacts = registry.get('artifacts')
+    chi2, odds = artifacts['chi2'], artifacts['odds']
+    text = {}
+    for col, doc_tokens in artifacts['doc_tokens'].items():
+        peer_docs = doc_tokens[peer_ids].tocsc()
+        doc_freq = np.diff(peer_docs.indptr)
+        candidates = np.flatnonzero(doc_freq > 1)
+        candidates = candidates[odds[col][candidates] > 1]
+        text[col] = {
+            'peer_docs': peer_docs,
+            'doc_freq': doc_freq,
+            'candidates': candidates[np.argsort(chi2[col][candidates], kind='stable')]
+        }
+    values = artifacts['meta_values'][peer_ids]
+    success = artifacts['success'][peer_ids]
+    box = np.percentile(values, list(BOX_PERCENTILES.values()), axis=0)
+    metadata = {
+        'box': {k: box[i] for i, k in enumerate(BOX_PERCENTILES)},
+        'success_median': get_median(values[success]),
+        'failure_median': get_median(values[~success]),
+        'success_values': values[success]
     }
-    recommend_tokens = {
-        k: pd.DataFrame(zip(
-            v[not_used_selected[k]][not_used_chi2_positive_rank[k]],
-            not_used_tokens_cnt[k][not_used_selected[k]][not_used_chi2_positive_rank[k]],
-            not_used_chi2[k][not_used_selected[k]][not_used_chi2_positive_rank[k]]
-        ), columns=['token', 'df', 'pvals'])
-        for k, v in not_used_tokens.items()
+    return {
+        'peer_ids': peer_ids,
+        'success_cnt': int(np.count_nonzero(success)),
+        'text': text,
+        'metadata': metadata
     }
+
+def get_peer_group(sim_proj: np.ndarray) -> dict:
+    """Returns the aggregates of peers, cached by the data generation and
+    the set of peers"""
+    peer_ids = np.sort(sim_proj)
+    key = (registry.generation().number, *peer_ids.tolist())
+    return peer_cache.get(key, lambda: aggregate_peer_group(peer_ids.astype(np.int64)))
+
+def get_text_suggestion(sim_proj, tokens: dict, group: 'dict|None' = None) -> dict:
+    """Generate text suggestion
+
+    Recommends the filtered tokens the project does not use but more than
+    one peer uses, with odds ratio above 1, ranked by chi-square p-value.
+    The peers using each token are listed in order of similarity. The
+    aggregates of peers are looked up if group is not given.
+
+    """
+    artifacts = registry.get('artifacts')
+    dataset, corpus_index = artifacts['dataset'], artifacts['corpus_index']
+    chi2 = artifacts['chi2']
+    group = group or get_peer_group(sim_proj)
+    similarity_order = np.argsort(sim_proj, kind='stable')
     peer_cols = ['title', 'link']
     peer_props = {
         c: dataset.iloc[sim_proj, :][c].to_numpy()
         for c in peer_cols
     }
-    cols = ['title', 'description', 'content']
-    for col in cols:
-        for peer_col in peer_cols:
-            recommend_tokens[col][f'peer_{peer_col}'] = [
-                peer_props[peer_col][d].tolist()
-                for d in not_used_tokens_docs[col][
-                    not_used_selected[col]][not_used_chi2_positive_rank[col]].tolist()
-            ]
+    recommend_tokens = {}
+    for col, aggregates in group['text'].items():
+        peer_docs, doc_freq = aggregates['peer_docs'], aggregates['doc_freq']
+        candidates = aggregates['candidates']
+        used = [corpus_index[col][t] for t in set(tokens[col]) if t in corpus_index[col]]
+        candidates = candidates[~np.isin(candidates, used)][:20]
+        recommend_tokens[col] = []
+        for token in candidates:
+            docs = peer_docs.indices[peer_docs.indptr[token]:peer_docs.indptr[token+1]]
+            docs = np.sort(similarity_order[docs])
+            recommend_tokens[col].append({
+                'token': str(artifacts['filter_corpus'][col][token]),
+                'df': int(doc_freq[token]),
+                'pvals': float(chi2[col][token]),
+                **{
+                    f'peer_{c}': v[docs].tolist()
+                    for c, v in peer_props.items()
+                }
+            })
     result = {
-        'recommend_tokens': {
-            k: v.to_dict('records')[:20]
-            for k, v in recommend_tokens.items()
-        }
+        'recommend_tokens': recommend_tokens
     }
     return result
 
-def get_meta_suggestion(sim_proj, project) -> dict:
-    """Generate metadata suggestion"""
-    cols = ['goal', 'content_length', 'duration_days', 'max_set_prices',
-            'description_length', 'min_set_prices']
-    indexes = ['min', '25%', '50%', '75%', 'max']
-    df_peer = dataset[cols + ['success']].iloc[sim_proj, :]
-    box = df_peer[cols].describe().loc[indexes, :].astype(float).rename(index={
-        ind: f'box_{ind.replace("%", "")}'
-        for ind in indexes
-    }).to_dict('dict')
-    success_median = df_peer[df_peer['success']][cols].median().astype(float).to_dict()
-    failure_median = df_peer[~df_peer['success']][cols].median().astype(float).to_dict()
+def get_meta_suggestion(sim_proj, project, group: 'dict|None' = None) -> dict:
+    """Generate metadata suggestion
+
+    The percentiles interpolate linearly, the same as `describe` of pandas.
+    The aggregates of peers are looked up if group is not given.
+
+    """
+    metadata = (group or get_peer_group(sim_proj))['metadata']
+    project_values = np.array([project[c] for c in META_COLS], dtype=np.float64)
+    success_greater = np.count_nonzero(metadata['success_values'] > project_values, axis=0)
+    success_less = np.count_nonzero(metadata['success_values'] < project_values, axis=0)
     result = {
         'metadata': {
             c: {
-                'success_median': success_median[c],
-                'failure_median': failure_median[c],
-                'success_greater': int(np.sum(df_peer[df_peer['success']][c] > project[c])),
-                'success_less': int(np.sum(df_peer[df_peer['success']][c] < project[c])),
+                'success_median': float(metadata['success_median'][i]),
+                'failure_median': float(metadata['failure_median'][i]),
+                'success_greater': int(success_greater[i]),
+                'success_less': int(success_less[i]),
                 'project_value': project[c],
-                **box[c]
+                **{k: float(v[i]) for k, v in metadata['box'].items()}
             }
-            for c in cols
+            for i, c in enumerate(META_COLS)
         }
     }
     return result
 
+def get_category_suggestion(sim_proj, project) -> dict:
+    """Generate category suggestion
+
+    Reports the share of peers in the category of the project, and the
+    most common category of peers, counted with `np.bincount` over the
+    category codes. Ties go to the category of the most similar peer.
+
+    """
+    artifacts = registry.get('artifacts')
+    cate = {}
+    for col in CATE_COLS:
+        table = artifacts['category_tables'][col]
+        codes = artifacts['category_codes'][col][sim_proj]
+        counts = np.bincount(codes, minlength=len(table))
+        top = counts.max()
+        code = table.codes.get(project[col])
+        cate[col] = {
+            'same_rate': float(counts[code] / len(codes)) if code is not None else 0.,
+            'most': {
+                'name': str(table.names[codes[np.argmax(counts[codes] == top)]]),
+                'rate': float(top / len(codes))
+            }
+        }
+    return cate
+
 def get_suggestion(project: dict, vector: dict, tokens: dict) -> dict:
     """Generates suggestion for project"""
-    start_time = time.time()
-    sim_proj = get_similar_project(vector)
-    logger.info('Cosine Similarity Time: %f', time.time() - start_time)
+    dataset = registry.get('artifacts')['dataset']
+    with metrics.timer('similarity'):
+        sim_proj, sim_cos = get_similar_project(vector)
     if len(sim_proj) > 0:
-        start_time = time.time()
-        cols = ['title', 'domain', 'type', 'success', 'cos', 'link']
-        peers = dataset[cols].iloc[sim_proj, :].to_dict('records')
-        cate = {}
-        for col in ['domain', 'type']:
-            cnt = dataset.iloc[sim_proj,:][col].value_counts()
-            cate[col] = {}
-            cate[col]['same_rate'] = float((dataset.iloc[sim_proj,:][col] == project[col]).mean())
-            cate[col]['most'] = {
-                'name': str(cnt.index[0]),
-                'rate': float(cnt[0] / sim_proj.shape[0])
-            }
-        logger.info('Category Suggestion Time: %f', time.time() - start_time)
-        start_time = time.time()
-        text_suggestion = get_text_suggestion(sim_proj, tokens)
-        logger.info('Text Suggestion Time: %f', time.time() - start_time)
-        start_time = time.time()
-        meta_suggestion = get_meta_suggestion(sim_proj, project)
-        logger.info('Metadata Suggestion Time: %f', time.time() - start_time)
-        start_time = time.time()
+        group = get_peer_group(sim_proj)
+        with metrics.timer('category_suggestion'):
+            cols = ['title', 'domain', 'type', 'success', 'cos', 'link']
+            peers = dataset.iloc[sim_proj, :].assign(cos=sim_cos)[cols].to_dict('records')
+            cate = get_category_suggestion(sim_proj, project)
+        with metrics.timer('text_suggestion'):
+            text_suggestion = get_text_suggestion(sim_proj, tokens, group)
+        with metrics.timer('meta_suggestion'):
+            meta_suggestion = get_meta_suggestion(sim_proj, project, group)
+        peer_success_cnt = group['success_cnt']
     else:
         peers = []
         cate = {}
         text_suggestion = {'recommend_tokens': {}}
         meta_suggestion = {'metadata': {}}
+        peer_success_cnt = 0
     result = {
         'peer_cnt': int(sim_proj.shape[0]),
-        'peer_success_cnt': int(dataset.iloc[sim_proj,:]['success'].sum()),
+        'peer_success_cnt': peer_success_cnt,
         'peers': peers,
         'categories': cate,
         **text_suggestion,
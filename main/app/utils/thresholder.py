@@ -9,6 +9,7 @@ This module contains main models to predict project success rate.
     thresholder = Thresholder().load('path/to/model.pickle')
     thresholder.predict_prob(dataframe)
     thresholder.predict(dataframe)
+    thresholder.feature_names()
 
 """
 import pickle
@@ -43,6 +44,32 @@ class Thresholder(BaseEstimator, ClassifierMixin):
         pred = (prob > self.threshold).astype(int)
         return pred
 
+    def feature_names(self) -> 'list[str]|None':
+        """Returns the feature names the estimator was fitted with, if recorded"""
+        if hasattr(self.estimator, 'get_booster'):
+            names = self.estimator.get_booster().feature_names
+        else:
+            names = getattr(self.estimator, 'feature_names_in_', None)
+        return None if names is None else list(names)
+
+    def drop_feature_names(self) -> None:
+        """Stops the estimator from checking feature names of input
+
+        Lets the estimator accept unnamed input (e.g. sparse matrix) once the
+        column order has been checked against `feature_names`.
+
+        """
+        if hasattr(self.estimator, 'get_booster'):
+            booster = self.estimator.get_booster()
+            booster.feature_names = None
+            booster.feature_types = None
+            return
+        estimator = self.estimator
+        if hasattr(estimator, 'steps'):
+            estimator = estimator.steps[0][1]
+        if 'feature_names_in_' in vars(estimator):
+            del estimator.feature_names_in_
+
     def save(self, filename: str) -> None:
         """Save the thresholder itself"""
         data = {
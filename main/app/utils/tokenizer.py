@@ -0,0 +1,89 @@
+"""Tokenization process pool
+
+This module contains TokenizerPool to segment and preprocess texts in
+child processes, so tokenization of concurrent requests is not serialized
+by the GIL of the server process.
+
+    Typical usage example:
+
+    from app.utils.tokenizer import TokenizerPool
+
+    pool = TokenizerPool(workers=4)
+    pool(['text', 'another text'])
+    pool.shutdown()
+
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from ckip_transformers.nlp import CkipWordSegmenter
+
+from app.utils.preprocessor import Preprocessor
+
+_segmentor = None
+_preprocessor = None
+
+def init_worker() -> None:
+    """Loads the segmenter and the preprocessor once per child process"""
+    global _segmentor, _preprocessor  # pylint: disable=global-statement
+    _segmentor = CkipWordSegmenter(level=3)
+    _preprocessor = Preprocessor()
+
+def tokenize_texts(texts: 'list[str]') -> 'list[list[str]]':
+    """Segments and preprocesses texts in a child process"""
+    return [
+        _preprocessor.preprocess(segmented)
+        for segmented in _segmentor(texts, show_progress=False)
+    ]
+
+def ping() -> bool:
+    """Does nothing, used to start the child processes"""
+    return True
+
+class TokenizerPool(object):
+    """Process pool of tokenization
+
+    Each child process loads its own segmenter and preprocessor once when it
+    starts. The texts of a call are split into at most `workers` chunks of at
+    least `min_chunk_size` texts, which are tokenized in parallel.
+
+    The children are forked when the first texts are submitted, or by
+    `start`. Do not start them while the `app` package is being imported,
+    since the children would inherit the held import lock.
+
+    Attributes:
+        workers (int): Number of child processes
+        min_chunk_size (int): Minimum number of texts sent to one child
+
+    """
+
+    def __init__(self, workers: int, min_chunk_size: int = 1,
+        start_method: str = 'fork') -> None:
+        self.workers = workers
+        self.min_chunk_size = max(1, min_chunk_size)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=init_worker
+        )
+
+    def __call__(self, texts: 'list[str]') -> 'list[list[str]]':
+        """Returns the preprocessed tokens of texts, waits for the children"""
+        if not texts:
+            return []
+        n_chunks = max(1, min(self.workers, len(texts) // self.min_chunk_size))
+        size = -(-len(texts) // n_chunks)
+        futures = [
+            self._executor.submit(tokenize_texts, texts[i:i+size])
+            for i in range(0, len(texts), size)
+        ]
+        return [tokens for future in futures for tokens in future.result()]
+
+    def start(self) -> None:
+        """Starts the child processes and waits for them to load the models"""
+        for future in [self._executor.submit(ping) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Stops the child processes"""
+        self._executor.shutdown()
@@ -5,15 +5,29 @@ This module define the router to each endpoints.
 """
 from app import api, docs
 from app.views.health import HealthAPI
+from app.views.ready import ReadyAPI
+from app.views.metrics import MetricsAPI
+from app.views.admin import ReloadAPI
 from app.views.overview import OverviewAPI
 from app.views.advice import AdviceAPI
 from app.views.project_list import ProjectListAPI
 from app.views.project import ProjectAPI
-from app.views.estimation import EstimationAPI
+from app.views.estimation import EstimationAPI, EstimationBatchAPI
+from app.views.estimation_jobs import EstimationJobsAPI, EstimationJobAPI
+from app.views.estimation_scenarios import EstimationScenariosAPI
 
 api.add_resource(HealthAPI, '/health')
 docs.register(HealthAPI)
 
+api.add_resource(ReadyAPI, '/ready')
+docs.register(ReadyAPI)
+
+api.add_resource(MetricsAPI, '/metrics')
+docs.register(MetricsAPI)
+
+api.add_resource(ReloadAPI, '/admin/reload')
+docs.register(ReloadAPI)
+
 api.add_resource(OverviewAPI, '/overview')
 docs.register(OverviewAPI)
 
@@ -28,3 +42,15 @@ docs.register(ProjectAPI)
 
 api.add_resource(EstimationAPI, '/estimation')
 docs.register(EstimationAPI)
+
+api.add_resource(EstimationBatchAPI, '/estimation/batch')
+docs.register(EstimationBatchAPI)
+
+api.add_resource(EstimationScenariosAPI, '/estimation/scenarios')
+docs.register(EstimationScenariosAPI)
+
+api.add_resource(EstimationJobsAPI, '/estimation/jobs')
+docs.register(EstimationJobsAPI)
+
+api.add_resource(EstimationJobAPI, '/estimation/jobs/<string:job_id>')
+docs.register(EstimationJobAPI)
@@ -0,0 +1,96 @@
+"""Admin endpoints for the application.
+
+This module contains the endpoint to reload the data of the estimation
+without restarting the server. POST /admin/reload loads a new data
+directory in the background, validates it and swaps it in once loaded,
+and GET /admin/reload returns the active version and the status of the
+last reload. Both require the `ADMIN_TOKEN` as a bearer token, and are
+disabled when it is not set.
+
+    Typical usage example:
+
+    from app import api, docs
+    from app.views.admin import ReloadAPI
+
+    api.add_resource(ReloadAPI, '/admin/reload')
+    docs.register(ReloadAPI)
+
+"""
+import hmac
+import os
+
+from flask import abort, request
+from flask_apispec import marshal_with, doc, use_kwargs
+from flask_apispec.views import MethodResource
+from flask_restful import Resource
+from marshmallow import Schema, fields
+
+from app.utils.registry import registry
+
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+def check_token() -> None:
+    """Aborts with 403 Forbidden unless the request has the admin token"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if not ADMIN_TOKEN or scheme.lower() != 'bearer' or not hmac.compare_digest(
+            token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        abort(403)
+
+class ReloadRequestSchema(Schema):
+    """Schema for the request to the reload endpoint.
+
+    Attributes:
+        directory (str): Data directory to load, the data directory of
+            the app (resolving symbolic links) if not given.
+
+    """
+    directory = fields.Str(load_default=None)
+
+class ReloadResponseSchema(Schema):
+    """Schema for the response to the reload endpoint.
+
+    Attributes:
+        version (str): Active version of the data.
+        reload (dict): Version, directory, status (`loading`, `active` or
+            `failed`) and error of the last reload.
+
+    """
+    version = fields.Str()
+    reload = fields.Dict(keys=fields.Str())
+
+def reload_status() -> dict:
+    """Returns the active version and the status of the last reload"""
+    return {'version': registry.version(), 'reload': registry.reload_status}
+
+class ReloadAPI(MethodResource, Resource):
+    """Data reload endpoint."""
+
+    @doc(description='Reload status', tags=['Admin'])
+    @marshal_with(ReloadResponseSchema)
+    def get(self) -> dict:
+        """Get the reload status.
+
+        Accepts GET request and return a 200 OK response with the active
+        version and the status of the last reload, or a 403 Forbidden
+        response without the admin token.
+
+        """
+        check_token()
+        return reload_status()
+
+    @doc(description='Reload data', tags=['Admin'])
+    @use_kwargs(ReloadRequestSchema, location=('json'))
+    @marshal_with(ReloadResponseSchema, code=202)
+    def post(self, directory: 'str|None') -> 'tuple[dict, int]':
+        """Post for the reload.
+
+        Accepts POST request and return a 202 Accepted response once the
+        reload has started in the background, or a 403 Forbidden response
+        without the admin token. The new version is used by the requests
+        received after it is loaded and validated. A reload is not
+        started while another one is running.
+
+        """
+        check_token()
+        registry.reload(directory)
+        return reload_status(), 202
@@ -11,35 +11,34 @@ This module contains the endpoint for the advice.
     docs.register(AdviceAPI)
 
 """
-import pathlib
-import pickle
 
+from flask import Response
 from flask_apispec import marshal_with, doc
 from flask_apispec.views import MethodResource
 from flask_restful import Resource
 from marshmallow import Schema, fields
 
+from app.utils.registry import registry
 from app.utils.schema import AdviceField
-
-FILE_PATH = pathlib.Path(__file__).parent.resolve()
-
-with open(FILE_PATH / '../data/preprocessed/advice.pickle', 'rb') as file:
-    data = pickle.load(file)
+from app.utils.static_response import StaticResponse
 
 class AdviceResponseSchema(Schema):
     """Schema for the response to the advice endpoint."""
     data = fields.Dict(keys=fields.Str, values=AdviceField)
 
+registry.register('advice', lambda directory: StaticResponse(
+    AdviceResponseSchema(), directory / 'preprocessed/advice.pickle'), versioned=True)
+
 class AdviceAPI(MethodResource, Resource):
     """Advice aendpoint."""
 
     @doc(description='Advice', tags=['Advice'])
     @marshal_with(AdviceResponseSchema)
-    def get(self) -> dict:
+    def get(self) -> Response:
         """Get for the advice.
 
         Accepts GET request and return a 200 OK response
-        with advice in JSON body.
+        with advice in JSON body, serialized once per version of the data.
 
         """
-        return data
+        return registry.get('advice').make_response()
@@ -1,36 +1,56 @@
 """Estimation endpoints for the application.
 
-This module contains the endpoint for the estimation.
+This module contains the endpoints for the estimation of single project
+and of projects in a batch.
 
     Typical usage example:
 
     from app import api, docs
-    from app.views.estimation import EstimationAPI
+    from app.views.estimation import EstimationAPI, EstimationBatchAPI
 
     api.add_resource(EstimationAPI, '/estimation')
     docs.register(EstimationAPI)
 
+    api.add_resource(EstimationBatchAPI, '/estimation/batch')
+    docs.register(EstimationBatchAPI)
+
 """
+import os
 import pathlib
 import pickle
 
-from flask import abort
+from flask import Response, abort, jsonify
 from flask_apispec import marshal_with, doc, use_kwargs
 from flask_apispec.views import MethodResource
 from flask_restful import Resource
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 from app.utils.schema import (ProjectSchema, TableField, CateField,
     MetadataField, StackedBarChartField)
-from app.utils.estimate import get_estimation
+from app.utils.estimate import get_estimation, get_estimations
+from app.utils.metrics import metrics
+from app.utils.registry import registry
+from app.utils.serializer import FastSerializer
+
+ESTIMATION_FAST_JSON = os.environ.get('ESTIMATION_FAST_JSON', '0') != '0'
+ESTIMATION_MAX_BATCH = int(os.environ.get('ESTIMATION_MAX_BATCH', 64))
 
-FILE_PATH = pathlib.Path(__file__).parent.resolve()
+def load_success_rates_by_score(directory: pathlib.Path) -> dict:
+    """Load success rates of the projects by score from data directory"""
+    with open(directory / 'preprocessed/success_rates_by_score.pickle', 'rb') as file:
+        return pickle.load(file)
 
-with open(FILE_PATH / '../data/preprocessed/success_rates_by_score.pickle', 'rb') as file:
-    success_rates_by_score = pickle.load(file)
+registry.register('success_rates_by_score', load_success_rates_by_score, versioned=True)
 
 EstimationRequestSchema = ProjectSchema
 
+def check_project(project: dict) -> None:
+    """Aborts with 400 Bad Request if any required text is empty"""
+    cols = ['content', 'title', 'description', 'domain', 'type']
+    for col in cols:
+        if project[col] == "":
+            abort(400)
+
 class EstimationResponseSchema(Schema):
     """Schema for the response to the estimation endpoint."""
     success_rates_by_score = StackedBarChartField
@@ -43,24 +63,65 @@ class EstimationResponseSchema(Schema):
     recommend_tokens = fields.Dict(key=fields.Str(), values=TableField)
     metadata = fields.Dict(keys=fields.Str(), values=MetadataField)
 
+def serialize(serializer: FastSerializer, result: dict) -> Response:
+    """Serializes response with the fast serializer if enabled, else marshmallow"""
+    with metrics.timer('serialization'):
+        if ESTIMATION_FAST_JSON:
+            return serializer.make_response(result)
+        return jsonify(serializer.schema.dump(result))
+
+estimation_serializer = FastSerializer(EstimationResponseSchema())
+
 class EstimationAPI(MethodResource, Resource):
     """Estimation aendpoint."""
 
     @doc(description='Estimation', tags=['Estimation'])
     @use_kwargs(EstimationRequestSchema, location=('json'))
     @marshal_with(EstimationResponseSchema)
-    def post(self, **kwargs) -> dict:
+    def post(self, **kwargs) -> Response:
         """Post for the estimation.
 
         Accepts POST request and return a 200 OK response
         with estimation in JSON body.
 
         """
-        cols = ['content', 'title', 'description', 'domain', 'type']
-        for col in cols:
-            if kwargs[col] == "":
-                abort(400)
-        return {
-            **success_rates_by_score,
+        check_project(kwargs)
+        return serialize(estimation_serializer, {
+            **registry.get('success_rates_by_score'),
             **get_estimation(kwargs)
-        }
+        })
+
+
+class EstimationBatchRequestSchema(Schema):
+    """Schema for the request to the batch estimation endpoint."""
+    projects = fields.List(fields.Nested(ProjectSchema), required=True,
+                           validate=validate.Length(min=1, max=ESTIMATION_MAX_BATCH))
+
+class EstimationBatchResponseSchema(Schema):
+    """Schema for the response to the batch estimation endpoint."""
+    results = fields.List(fields.Nested(EstimationResponseSchema))
+
+estimation_batch_serializer = FastSerializer(EstimationBatchResponseSchema())
+
+class EstimationBatchAPI(MethodResource, Resource):
+    """Batch estimation endpoint."""
+
+    @doc(description='Batch estimation', tags=['Estimation'])
+    @use_kwargs(EstimationBatchRequestSchema, location=('json'))
+    @marshal_with(EstimationBatchResponseSchema)
+    def post(self, projects: 'list[dict]') -> Response:
+        """Post for the batch estimation.
+
+        Accepts POST request with a list of projects and return
+        a 200 OK response with estimations in the same order.
+
+        """
+        for project in projects:
+            check_project(project)
+        success_rates_by_score = registry.get('success_rates_by_score')
+        return serialize(estimation_batch_serializer, {
+            'results': [
+                {**success_rates_by_score, **estimation}
+                for estimation in get_estimations(projects)
+            ]
+        })
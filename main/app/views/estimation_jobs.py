@@ -0,0 +1,140 @@
+"""Asynchronous estimation endpoints for the application.
+
+This module contains the endpoints to estimate a project in the
+background. POST /estimation/jobs queues the estimation and returns its
+job at once, GET /estimation/jobs/<job_id> returns the status of the job
+and its result once done, and DELETE /estimation/jobs/<job_id> cancels
+the job if it has not started yet.
+
+    Typical usage example:
+
+    from app import api, docs
+    from app.views.estimation_jobs import EstimationJobsAPI, EstimationJobAPI
+
+    api.add_resource(EstimationJobsAPI, '/estimation/jobs')
+    docs.register(EstimationJobsAPI)
+
+    api.add_resource(EstimationJobAPI, '/estimation/jobs/<string:job_id>')
+    docs.register(EstimationJobAPI)
+
+"""
+import os
+
+from flask import Response, abort, jsonify, url_for
+from flask_apispec import marshal_with, doc, use_kwargs
+from flask_apispec.views import MethodResource
+from flask_restful import Resource
+from marshmallow import Schema, fields
+
+from app.utils.estimate import get_estimation
+from app.utils.jobs import JobQueue, MemoryJobStore, QueueFullError, SQLiteJobStore
+from app.utils.metrics import metrics
+from app.utils.registry import registry
+from app.utils.serializer import FastSerializer
+from app.views.estimation import (EstimationRequestSchema, EstimationResponseSchema,
+    check_project, serialize)
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 32))
+JOB_TTL = float(os.environ.get('JOB_TTL', 600))
+JOB_STORE = os.environ.get('JOB_STORE') or None
+JOB_RETRY_AFTER = 1
+
+job_queue = JobQueue(
+    SQLiteJobStore(JOB_STORE, JOB_TTL) if JOB_STORE else MemoryJobStore(JOB_TTL),
+    workers=JOB_WORKERS,
+    max_queued=JOB_QUEUE_SIZE
+)
+metrics.add_gauges('jobs', job_queue.stats)
+
+def estimate(project: dict) -> dict:
+    """Estimates project with the same body as the estimation endpoint,
+    with the version of the data active when the job starts"""
+    with registry.snapshot():
+        return {**registry.get('success_rates_by_score'), **get_estimation(project)}
+
+class JobResponseSchema(Schema):
+    """Schema for the response to the estimation job endpoints.
+
+    Attributes:
+        id (str): ID of the job.
+        status (str): `queued`, `running`, `done`, `failed` or `cancelled`.
+        created_at (float): Unix time the job was submitted.
+        updated_at (float): Unix time the status last changed.
+        result (dict): Estimation once the job is done.
+        error (str): Error of the failed job.
+
+    """
+    id = fields.Str()
+    status = fields.Str()
+    created_at = fields.Float()
+    updated_at = fields.Float()
+    result = fields.Nested(EstimationResponseSchema, allow_none=True)
+    error = fields.Str(allow_none=True)
+
+job_serializer = FastSerializer(JobResponseSchema())
+
+class EstimationJobsAPI(MethodResource, Resource):
+    """Estimation job submission endpoint."""
+
+    @doc(description='Submit estimation job', tags=['Estimation'])
+    @use_kwargs(EstimationRequestSchema, location=('json'))
+    @marshal_with(JobResponseSchema, code=202)
+    def post(self, **kwargs) -> Response:
+        """Post for the estimation job.
+
+        Accepts POST request and return a 202 Accepted response with
+        the queued job in JSON body, or a 429 Too Many Requests
+        response if too many jobs are waiting.
+
+        """
+        check_project(kwargs)
+        try:
+            job_id = job_queue.submit(estimate, kwargs)
+        except QueueFullError:
+            response = jsonify(error=('429 Too Many Requests: '
+                                      'Too many estimation jobs are waiting.'))
+            response.status_code = 429
+            response.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+            return response
+        response = serialize(job_serializer, job_queue.get(job_id))
+        response.status_code = 202
+        response.headers['Location'] = url_for('estimationjobapi', job_id=job_id)
+        return response
+
+class EstimationJobAPI(MethodResource, Resource):
+    """Estimation job endpoint."""
+
+    @doc(description='Estimation job', tags=['Estimation'])
+    @marshal_with(JobResponseSchema)
+    def get(self, job_id: str) -> Response:
+        """Get the estimation job.
+
+        Accepts GET request and return a 200 OK response with the
+        job in JSON body, or a 404 Not Found response if the job is
+        unknown or expired.
+
+        """
+        job = job_queue.get(job_id)
+        if job is None:
+            abort(404)
+        return serialize(job_serializer, job)
+
+    @doc(description='Cancel estimation job', tags=['Estimation'])
+    @marshal_with(JobResponseSchema)
+    def delete(self, job_id: str) -> Response:
+        """Delete for the estimation job.
+
+        Accepts DELETE request and return a 200 OK response with the
+        cancelled job in JSON body, a 404 Not Found response if the job
+        is unknown or expired, or a 409 Conflict response if the job
+        has already started.
+
+        """
+        cancelled = job_queue.cancel(job_id)
+        job = job_queue.get(job_id)
+        if job is None:
+            abort(404)
+        if not cancelled:
+            abort(409)
+        return serialize(job_serializer, job)
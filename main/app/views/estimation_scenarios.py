@@ -0,0 +1,109 @@
+"""What-if scenario endpoint for the application.
+
+This module contains the endpoint to estimate a project with variants of
+its metadata (e.g. goal, duration, set prices), given as a list of
+overrides and / or a grid of values to combine. The text is tokenized
+once for all variants.
+
+    Typical usage example:
+
+    from app import api, docs
+    from app.views.estimation_scenarios import EstimationScenariosAPI
+
+    api.add_resource(EstimationScenariosAPI, '/estimation/scenarios')
+    docs.register(EstimationScenariosAPI)
+
+"""
+import math
+import os
+
+from flask import Response
+from flask_apispec import marshal_with, doc, use_kwargs
+from flask_apispec.views import MethodResource
+from flask_restful import Resource
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
+
+from app.utils.estimate import expand_grid, get_scenarios
+from app.utils.schema import ProjectSchema
+from app.utils.serializer import FastSerializer
+from app.views.estimation import check_project, serialize
+
+ESTIMATION_MAX_SCENARIOS = int(os.environ.get('ESTIMATION_MAX_SCENARIOS', 1000))
+
+class ScenarioOverrideSchema(Schema):
+    """Schema for the metadata overrides of a scenario.
+
+    Attributes:
+        goal (int): Target goal
+        duration_days (int): Days from start time to end time
+        set_count (int): Number of sets
+        min_set_prices (int): Minimum set price
+        max_set_prices (int): Maximum set price
+
+    """
+    goal = fields.Int(validate=validate.Range(min=0))
+    duration_days = fields.Int(validate=validate.Range(min=0))
+    set_count = fields.Int(validate=validate.Range(min=0))
+    min_set_prices = fields.Int(validate=validate.Range(min=0))
+    max_set_prices = fields.Int(validate=validate.Range(min=0))
+
+class ScenarioGridSchema(Schema):
+    """Schema for the grid of metadata overrides.
+
+    Every combination of the values of the fields is a scenario.
+
+    """
+    goal = fields.List(fields.Int(validate=validate.Range(min=0)))
+    duration_days = fields.List(fields.Int(validate=validate.Range(min=0)))
+    set_count = fields.List(fields.Int(validate=validate.Range(min=0)))
+    min_set_prices = fields.List(fields.Int(validate=validate.Range(min=0)))
+    max_set_prices = fields.List(fields.Int(validate=validate.Range(min=0)))
+
+class ScenarioRequestSchema(Schema):
+    """Schema for the request to the scenario endpoint."""
+    project = fields.Nested(ProjectSchema, required=True)
+    scenarios = fields.List(fields.Nested(ScenarioOverrideSchema), load_default=list)
+    grid = fields.Nested(ScenarioGridSchema, load_default=dict)
+
+    @validates_schema
+    def validate_count(self, data: dict, **kwargs) -> None:
+        """Checks that there are scenarios, and not too many"""
+        count = len(data['scenarios'])
+        if data['grid']:
+            count += math.prod(len(v) for v in data['grid'].values())
+        if count == 0:
+            raise ValidationError('No scenario is given.')
+        if count > ESTIMATION_MAX_SCENARIOS:
+            raise ValidationError(f'At most {ESTIMATION_MAX_SCENARIOS} scenarios are allowed.')
+
+class ScenarioSchema(Schema):
+    """Schema for the estimation of a scenario."""
+    overrides = fields.Nested(ScenarioOverrideSchema)
+    score = fields.Float()
+    greater_than = fields.Float()
+
+class ScenarioResponseSchema(Schema):
+    """Schema for the response to the scenario endpoint."""
+    score = fields.Float()
+    greater_than = fields.Float()
+    scenarios = fields.List(fields.Nested(ScenarioSchema))
+
+scenario_serializer = FastSerializer(ScenarioResponseSchema())
+
+class EstimationScenariosAPI(MethodResource, Resource):
+    """What-if scenario endpoint."""
+
+    @doc(description='What-if scenarios', tags=['Estimation'])
+    @use_kwargs(ScenarioRequestSchema, location=('json'))
+    @marshal_with(ScenarioResponseSchema)
+    def post(self, project: dict, scenarios: 'list[dict]', grid: dict) -> Response:
+        """Post for the what-if scenarios.
+
+        Accepts POST request and return a 200 OK response with the
+        score and percentile of the project and of each scenario, the
+        listed scenarios first and then the combinations of the grid.
+
+        """
+        check_project(project)
+        return serialize(scenario_serializer,
+                         get_scenarios(project, scenarios + expand_grid(grid)))
@@ -0,0 +1,35 @@
+"""Metrics endpoints for the application.
+
+This module contains the endpoint for the metrics, which accepts GET
+requests at /metrics and returns the latency histograms of estimation
+stages, the request counts and the cache gauges in the Prometheus text
+format.
+
+    Typical usage example:
+
+    from app import api, docs
+    from app.views.metrics import MetricsAPI
+
+    api.add_resource(MetricsAPI, '/metrics')
+    docs.register(MetricsAPI)
+
+"""
+from flask import Response
+from flask_apispec import doc
+from flask_apispec.views import MethodResource
+from flask_restful import Resource
+
+from app.utils.metrics import metrics
+
+class MetricsAPI(MethodResource, Resource):
+    """Metrics endpoint."""
+
+    @doc(description='Metrics in the Prometheus text format', tags=['Health'])
+    def get(self) -> Response:
+        """Get the metrics.
+
+        Accepts GET request and return a 200 OK response
+        with metrics in text body.
+
+        """
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
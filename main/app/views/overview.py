@@ -11,20 +11,16 @@ This module contains the endpoint for the overview.
     docs.register(OverviewAPI)
 
 """
-import pathlib
-import pickle
 
+from flask import Response
 from flask_apispec import marshal_with, doc
 from flask_apispec.views import MethodResource
 from flask_restful import Resource
 from marshmallow import Schema, fields
 
+from app.utils.registry import registry
 from app.utils.schema import WordcloudField, LineChartField, StackedBarChartField, TableField
-
-FILE_PATH = pathlib.Path(__file__).parent.resolve()
-
-with open(FILE_PATH / '../data/preprocessed/overview.pickle', 'rb') as file:
-    data = pickle.load(file)
+from app.utils.static_response import StaticResponse
 
 
 class OverviewResponseSchema(Schema):
@@ -41,16 +37,19 @@ class OverviewResponseSchema(Schema):
     success_rate_6_mon = fields.Float()
 
 
+registry.register('overview', lambda directory: StaticResponse(
+    OverviewResponseSchema(), directory / 'preprocessed/overview.pickle'), versioned=True)
+
 class OverviewAPI(MethodResource, Resource):
     """Overview aendpoint."""
 
     @doc(description='Overview', tags=['Overview'])
     @marshal_with(OverviewResponseSchema)
-    def get(self) -> dict:
+    def get(self) -> Response:
         """Get the overview.
 
         Accepts GET request and return a 200 OK response
-        with overview in JSON body.
+        with overview in JSON body, serialized once per version of the data.
 
         """
-        return data
+        return registry.get('overview').make_response()
@@ -0,0 +1,71 @@
+"""Readiness endpoints for the application.
+
+This module contains the endpoint for the readiness check, which accepts
+GET requests at /ready and reports which models of the estimation are
+loaded and how long each took. Unlike /health, it returns 503 Service
+Unavailable until every model is loaded.
+
+    Typical usage example:
+
+    from app import api, docs
+    from app.views.ready import ReadyAPI
+
+    api.add_resource(ReadyAPI, '/ready')
+    docs.register(ReadyAPI)
+
+"""
+from flask_apispec import marshal_with, doc
+from flask_apispec.views import MethodResource
+from flask_restful import Resource
+from marshmallow import Schema, fields
+
+from app.utils.registry import registry
+
+class ComponentSchema(Schema):
+    """Schema for the status of a model.
+
+    Attributes:
+        loaded (bool): Whether the model is loaded.
+        seconds (float): Seconds taken to load the model.
+        error (str): Error of the last failed load.
+
+    """
+    loaded = fields.Bool()
+    seconds = fields.Float(allow_none=True)
+    error = fields.Str(allow_none=True)
+
+class ReadyResponseSchema(Schema):
+    """Schema for the response to the readiness endpoint.
+
+    Attributes:
+        status (str): `ready` if every model is loaded, else `loading`.
+        version (str): Active version of the data.
+        components (dict): Status of each model.
+
+    """
+    status = fields.Str()
+    version = fields.Str()
+    components = fields.Dict(keys=fields.Str(), values=fields.Nested(ComponentSchema))
+
+class ReadyAPI(MethodResource, Resource):
+    """Readiness endpoint."""
+
+    @doc(description='Readiness check', tags=['Health'])
+    @marshal_with(ReadyResponseSchema, code=200)
+    @marshal_with(ReadyResponseSchema, code=503)
+    def get(self) -> 'tuple[dict, int]':
+        """Get the readiness status.
+
+        Accepts GET request and return a 200 OK response if every
+        model is loaded, otherwise starts loading them in the background
+        and return a 503 Service Unavailable response.
+
+        """
+        ready = registry.is_ready()
+        if not ready:
+            registry.warm_up()
+        return {
+            'status': 'ready' if ready else 'loading',
+            'version': registry.version(),
+            'components': registry.status()
+        }, 200 if ready else 503
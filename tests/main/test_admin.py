@@ -0,0 +1,58 @@
+"""Test admin endpoints"""
+import time
+import unittest
+from unittest import mock
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+class TestReload(TestAbstractClass, TestCase):
+    """Test case for reload endpoint"""
+
+    def test(self) -> None:
+        """Tests reload endpoint
+
+        Checks that reload endpoint rejects requests without the admin
+        token, reloads the data in the background and reports the active
+        version, which is also in the headers of every response
+
+        Raise:
+            AssertionError: If status code, JSON body or headers do not match
+
+        """
+        with mock.patch('app.views.admin.ADMIN_TOKEN', 'secret'):
+            self.assertEqual(self.client.post('/admin/reload', json={}).status_code, 403)
+            self.assertEqual(self.client.get('/admin/reload', headers={
+                'Authorization': 'Bearer wrong'}).status_code, 403)
+            headers = {'Authorization': 'Bearer secret'}
+            response = self.client.post('/admin/reload', json={}, headers=headers)
+            self.assertEqual(response.status_code, 202)
+            self.assertIn(response.json['reload']['status'], ['loading', 'active'])
+            deadline = time.time() + 120
+            while response.json['reload']['status'] == 'loading' and time.time() < deadline:
+                time.sleep(.1)
+                response = self.client.get('/admin/reload', headers=headers)
+            response = self.client.get('/admin/reload', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json['reload']['status'], 'active')
+            version = response.json['version']
+            self.assertEqual(version, response.json['reload']['version'])
+        response = self.client.get('/overview')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Model-Version'], version)
+
+    def test_disabled(self) -> None:
+        """Tests reload endpoint without admin token
+
+        Checks that reload endpoint is disabled if the admin token is not set
+
+        Raise:
+            AssertionError: If status code is not 403
+
+        """
+        with mock.patch('app.views.admin.ADMIN_TOKEN', ''):
+            response = self.client.post('/admin/reload', json={},
+                                        headers={'Authorization': 'Bearer '})
+            self.assertEqual(response.status_code, 403)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Test memory-mapped model artifacts"""
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.artifacts import (SOURCES, StringTable, export_artifacts, # pylint: disable=import-error,wrong-import-order
+    is_exported, load_artifacts, load_scores)
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+MODEL_PATH = FILE_PATH / '../../main/app/data/model'
+
+class TestArtifacts(unittest.TestCase):
+    """Test case for memory-mapped model artifacts"""
+
+    def setUp(self) -> None:
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+        for name in SOURCES:
+            shutil.copy(MODEL_PATH / f'{name}.pickle', self.directory)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test(self) -> None:
+        """Tests exported artifacts
+
+        Checks that the exported artifacts are memory-mapped and equal to
+        the ones loaded from pickles
+
+        Raise:
+            AssertionError: If the artifacts do not match
+
+        """
+        self.assertFalse(is_exported(self.directory))
+        expected = load_artifacts(self.directory)
+        export_artifacts(self.directory)
+        self.assertTrue(is_exported(self.directory))
+        result = load_artifacts(self.directory)
+        self.assertIsInstance(result['vectors_norm']['content'], np.memmap)
+        self.assertTrue(result['dataset'].equals(expected['dataset'].reset_index(drop=True)))
+        for name in ['vectors_norm', 'chi2', 'odds']:
+            for col, array in expected[name].items():
+                np.testing.assert_array_equal(result[name][col], array)
+        for col, corpus in expected['filter_corpus'].items():
+            self.assertEqual(list(result['filter_corpus'][col]), list(corpus))
+            self.assertEqual((result['doc_tokens'][col] != expected['doc_tokens'][col]).nnz, 0)
+        np.testing.assert_array_equal(
+            load_scores(self.directory), np.sort(load_scores(self.directory, mmap=False)))
+
+    def test_stale(self) -> None:
+        """Tests fallback to pickles
+
+        Checks that the pickles are loaded after they change
+
+        Raise:
+            AssertionError: If the stale artifacts are loaded
+
+        """
+        export_artifacts(self.directory)
+        shutil.copy(MODEL_PATH / 'odds.pickle', self.directory / 'odds.pickle')
+        (self.directory / 'odds.pickle').touch()
+        self.assertFalse(is_exported(self.directory))
+        self.assertNotIsInstance(load_artifacts(self.directory)['chi2']['content'], np.memmap)
+
+    def test_string_table(self) -> None:
+        """Tests string table
+
+        Raise:
+            AssertionError: If the strings do not match
+
+        """
+        strings = ['募資', '', 'a b', '😀', 'SurfacePoint']
+        table = StringTable.from_strings(strings)
+        StringTable.from_strings(strings).save(self.directory / 'table')
+        for table in [table, StringTable.load(self.directory / 'table')]:
+            self.assertEqual(len(table), len(strings))
+            self.assertEqual(list(table), strings)
+            self.assertEqual([table[i] for i in range(-5, 5)], strings + strings)
+            self.assertEqual(table.to_numpy().tolist(), strings)
+            with self.assertRaises(IndexError):
+                table[5] # pylint: disable=pointless-statement
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Test micro-batching scheduler"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.batcher import MicroBatcher # pylint: disable=import-error,wrong-import-order
+
+class TestMicroBatcher(unittest.TestCase):
+    """Test case for micro-batching scheduler"""
+
+    def setUp(self) -> None:
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def func(self, inputs: list) -> list:
+        """Records the batch and doubles the inputs"""
+        with self.lock:
+            self.calls.append(len(inputs))
+        return [x * 2 for x in inputs]
+
+    def test(self) -> None:
+        """Tests concurrent callers
+
+        Checks that every caller gets its own outputs and that
+        concurrent inputs are merged into fewer batches
+
+        Raise:
+            AssertionError: If outputs or batches do not match
+
+        """
+        batcher = MicroBatcher(self.func, max_batch_size=64, max_wait=.2)
+        inputs = [[i, i + 100, i + 200] for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(batcher, inputs))
+        self.assertEqual(outputs, [[x * 2 for x in i] for i in inputs])
+        self.assertLess(len(self.calls), len(inputs))
+        stats = batcher.stats()
+        self.assertEqual(stats['inputs'], 24)
+        self.assertEqual(stats['batches'], len(self.calls))
+
+    def test_max_batch_size(self) -> None:
+        """Tests size cap
+
+        Checks that batches do not exceed the size cap unless a
+        single caller has more inputs than the cap
+
+        Raise:
+            AssertionError: If a batch exceeds the cap
+
+        """
+        batcher = MicroBatcher(self.func, max_batch_size=4, max_wait=.2)
+        inputs = [[1, 2, 3]] * 6 + [list(range(10))]
+        with ThreadPoolExecutor(max_workers=7) as executor:
+            outputs = list(executor.map(batcher, inputs))
+        self.assertEqual(outputs, [[x * 2 for x in i] for i in inputs])
+        self.assertTrue(all(c <= 4 or c == 10 for c in self.calls))
+
+    def test_error(self) -> None:
+        """Tests failing function
+
+        Checks that the exception is raised to the callers
+
+        Raise:
+            AssertionError: If the exception is not raised
+
+        """
+        def fail(inputs):
+            raise ValueError('failed')
+        batcher = MicroBatcher(fail, max_wait=.01)
+        with self.assertRaises(ValueError):
+            batcher(['text'])
+
+    def test_disabled(self) -> None:
+        """Tests zero waiting time
+
+        Checks that each call runs directly as its own batch
+
+        Raise:
+            AssertionError: If outputs or batches do not match
+
+        """
+        batcher = MicroBatcher(self.func, max_wait=0)
+        self.assertEqual(batcher([1, 2]), [2, 4])
+        self.assertEqual(batcher([]), [])
+        self.assertEqual(self.calls, [2])
+
+if __name__ == "__main__":
+    unittest.main()
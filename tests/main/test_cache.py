@@ -0,0 +1,119 @@
+"""Test token cache"""
+import os
+import tempfile
+import unittest
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.cache import PeerGroupCache, TokenCache # pylint: disable=import-error,wrong-import-order
+
+class TestTokenCache(unittest.TestCase):
+    """Test case for token cache"""
+
+    def test(self) -> None:
+        """Tests hits and misses
+
+        Checks that cached tokens are returned and counted
+
+        Raise:
+            AssertionError: If tokens or counters do not match
+
+        """
+        cache = TokenCache(max_size=2)
+        self.assertIsNone(cache.get('募資'))
+        cache.set('募資', ['募資'])
+        self.assertEqual(cache.get('募資'), ['募資'])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+
+    def test_lru(self) -> None:
+        """Tests size limit
+
+        Checks that the least recently used entry is evicted
+
+        Raise:
+            AssertionError: If the wrong entry is evicted
+
+        """
+        cache = TokenCache(max_size=2)
+        cache.set('a', ['a'])
+        cache.set('b', ['b'])
+        cache.get('a')
+        cache.set('c', ['c'])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), ['a'])
+        self.assertEqual(cache.get('c'), ['c'])
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_disk(self) -> None:
+        """Tests on-disk tier
+
+        Checks that entries survive a new cache instance
+
+        Raise:
+            AssertionError: If the entry is not loaded from disk
+
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            TokenCache(directory=directory).set('集資', ['集資'])
+            cache = TokenCache(directory=directory)
+            self.assertEqual(cache.get('集資'), ['集資'])
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+            self.assertIsNone(TokenCache(directory=directory, namespace='v2').get('集資'))
+
+    def test_disk_limit(self) -> None:
+        """Tests size limit of on-disk tier
+
+        Checks that the least recently used files are removed once the
+        on-disk tier holds more entries than its limit
+
+        Raise:
+            AssertionError: If the wrong entries are removed or the size
+                            does not match
+
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TokenCache(max_size=0, directory=directory, disk_max_size=10)
+            for i in range(10):
+                cache.set(str(i), [str(i)])
+                path = cache._path(cache.key(str(i))) # pylint: disable=protected-access
+                os.utime(path, (i, i))
+            self.assertEqual(cache.get('0'), ['0'])
+            cache.set('10', ['10'])
+            stats = cache.stats()
+            self.assertEqual((stats['disk_size'], stats['disk_max_size']), (9, 10))
+            self.assertEqual(TokenCache(directory=directory).stats()['disk_size'], 9)
+            self.assertEqual(cache.get('0'), ['0'])
+            self.assertIsNone(cache.get('1'))
+            self.assertIsNone(cache.get('2'))
+            self.assertEqual(cache.get('3'), ['3'])
+            self.assertEqual(cache.get('10'), ['10'])
+
+class TestPeerGroupCache(unittest.TestCase):
+    """Test case for peer group cache"""
+
+    def test(self) -> None:
+        """Tests hits, misses and size limit
+
+        Checks that aggregates are computed once per key and the least
+        recently used entry is evicted
+
+        Raise:
+            AssertionError: If aggregates or counters do not match
+
+        """
+        calls = []
+        cache = PeerGroupCache(max_size=2)
+        compute = lambda key: lambda: calls.append(key) or sum(key)
+        self.assertEqual(cache.get((1, 2), compute((1, 2))), 3)
+        self.assertEqual(cache.get((1, 2), compute((1, 2))), 3)
+        cache.get((3,), compute((3,)))
+        cache.get((1, 2), compute((1, 2)))
+        cache.get((4,), compute((4,)))
+        cache.get((3,), compute((3,)))
+        self.assertEqual(calls, [(1, 2), (3,), (4,), (3,)])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (2, 4, 2))
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Test batch estimation endpoint"""
+import json
+import pathlib
+import unittest
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+class TestEstimationBatch(TestAbstractClass, TestCase):
+    """Test case for batch estimation endpoint"""
+
+    param_type = {
+        'score': float,
+        'greater_than': float,
+        'peers': list
+    }
+
+    def test(self) -> None:
+        """Tests batch estimation endpoint
+
+        Checks that batch estimation endpoint returns 200 and
+        one estimation per project
+
+        Raise:
+            AssertionError: If status code is not 200 or JSON
+                            body does not match
+
+        """
+        projects = [mock_data, {**mock_data, 'domain': '設計'}]
+        response = self.client.post('/estimation/batch', json={'projects': projects})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json, dict)
+        self.assertEqual(len(response.json['results']), len(projects))
+        for result in response.json['results']:
+            for k, v in self.param_type.items():
+                self.assertIn(k, result)
+                self.assertIsInstance(result[k], v)
+
+    def test_single(self) -> None:
+        """Tests batch of one project
+
+        Checks that the batch result is the same as the single
+        estimation endpoint
+
+        Raise:
+            AssertionError: If the results do not match
+
+        """
+        single = self.client.post('/estimation', json=mock_data)
+        batch = self.client.post('/estimation/batch', json={'projects': [mock_data]})
+        self.assertEqual(batch.status_code, 200)
+        self.assertAlmostEqual(batch.json['results'][0]['score'], single.json['score'])
+        self.assertEqual(batch.json['results'][0]['peers'], single.json['peers'])
+
+    def test_empty_text(self) -> None:
+        """Tests 400 response with empty text
+
+        Checks that batch estimation endpoint returns 400 if any
+        project has empty text
+
+        Raise:
+            AssertionError: If status code is not 400
+
+        """
+        projects = [mock_data, {**mock_data, 'content': ''}]
+        response = self.client.post('/estimation/batch', json={'projects': projects})
+        self.assertEqual(response.status_code, 400)
+
+    def test_empty(self) -> None:
+        """Tests 422 response with empty input
+
+        Checks that batch estimation endpoint returns 422 for empty input
+
+        Raise:
+            AssertionError: If status code is not 422
+
+        """
+        response = self.client.post('/estimation/batch', json={})
+        self.assertEqual(response.status_code, 422)
+
+    def test_size(self) -> None:
+        """Tests 422 response with no or too many projects
+
+        Checks that batch estimation endpoint returns 422 if the batch
+        is empty or larger than ESTIMATION_MAX_BATCH
+
+        Raise:
+            AssertionError: If status code is not 422
+
+        """
+        from app.views.estimation import ESTIMATION_MAX_BATCH # pylint: disable=import-error,import-outside-toplevel
+        for projects in [[], [mock_data] * (ESTIMATION_MAX_BATCH + 1)]:
+            response = self.client.post('/estimation/batch', json={'projects': projects})
+            self.assertEqual(response.status_code, 422)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Test concurrent estimation requests"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pathlib
+import unittest
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+class TestEstimationConcurrency(TestAbstractClass, TestCase):
+    """Test case for concurrent estimation requests"""
+
+    def estimate(self, project: dict) -> list:
+        """Posts project to estimation endpoint and returns the peers"""
+        response = self.app.test_client().post('/estimation', json=project)
+        self.assertEqual(response.status_code, 200)
+        return response.json['peers']
+
+    def test(self) -> None:
+        """Tests parallel estimation requests
+
+        Fires different projects in parallel and checks that each
+        gets the same peers as when requested alone
+
+        Raise:
+            AssertionError: If peers do not match
+
+        """
+        content = mock_data['content']
+        step = len(content) // 8
+        projects = [
+            {**mock_data, 'content': content[i*step:(i+2)*step]}
+            for i in range(7)
+        ]
+        expected = [self.estimate(p) for p in projects]
+        with ThreadPoolExecutor(max_workers=len(projects)) as executor:
+            for _ in range(3):
+                self.assertEqual(list(executor.map(self.estimate, projects)), expected)
+
+if __name__ == "__main__":
+    unittest.main()
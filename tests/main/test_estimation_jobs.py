@@ -0,0 +1,90 @@
+"""Test estimation job endpoints"""
+import json
+import pathlib
+import time
+import unittest
+from unittest import mock
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+class TestEstimationJobs(TestAbstractClass, TestCase):
+    """Test case for estimation job endpoints"""
+
+    def test(self) -> None:
+        """Tests estimation job endpoints
+
+        Checks that the job endpoint returns 202 with the job, and
+        that polling returns the same estimation as the estimation
+        endpoint once done
+
+        Raise:
+            AssertionError: If status code or JSON body does not match
+
+        """
+        response = self.client.post('/estimation/jobs', json=mock_data)
+        self.assertEqual(response.status_code, 202)
+        self.assertIn(response.json['status'], ['queued', 'running', 'done'])
+        location = response.headers['Location']
+        self.assertEqual(location, f'/estimation/jobs/{response.json["id"]}')
+        deadline = time.time() + 120
+        job = self.client.get(location).json
+        while job['status'] in ['queued', 'running'] and time.time() < deadline:
+            time.sleep(.05)
+            job = self.client.get(location).json
+        self.assertEqual(job['status'], 'done')
+        self.assertIsNone(job['error'])
+        single = self.client.post('/estimation', json=mock_data)
+        self.assertEqual(job['result'], single.json)
+        self.assertEqual(self.client.delete(location).status_code, 409)
+
+    def test_not_found(self) -> None:
+        """Tests 404 response with unknown job
+
+        Raise:
+            AssertionError: If status code is not 404
+
+        """
+        self.assertEqual(self.client.get('/estimation/jobs/unknown').status_code, 404)
+        self.assertEqual(self.client.delete('/estimation/jobs/unknown').status_code, 404)
+
+    def test_queue_full(self) -> None:
+        """Tests 429 response and cancellation
+
+        Checks that job endpoint returns 429 with Retry-After while too
+        many jobs are waiting, and that a waiting job can be cancelled
+
+        Raise:
+            AssertionError: If status code or JSON body does not match
+
+        """
+        from app.views.estimation_jobs import job_queue # pylint: disable=import-error,import-outside-toplevel
+        with mock.patch.object(job_queue, 'max_queued', 0):
+            response = self.client.post('/estimation/jobs', json=mock_data)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        with mock.patch.object(job_queue, '_executor') as executor:
+            response = self.client.post('/estimation/jobs', json=mock_data)
+            cancelled = self.client.delete(f'/estimation/jobs/{response.json["id"]}')
+            self.assertEqual(cancelled.status_code, 200)
+            self.assertEqual(cancelled.json['status'], 'cancelled')
+            run, job_id, *_ = executor.submit.call_args[0]
+            run(job_id, lambda project: self.fail('cancelled job ran'), ())
+        self.assertEqual(job_queue.stats()['queued'], 0)
+
+    def test_empty_text(self) -> None:
+        """Tests 400 response with empty text
+
+        Raise:
+            AssertionError: If status code is not 400
+
+        """
+        response = self.client.post('/estimation/jobs', json={**mock_data, 'content': ''})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main()
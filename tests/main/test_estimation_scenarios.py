@@ -0,0 +1,78 @@
+"""Test what-if scenario endpoint"""
+import datetime
+import json
+import pathlib
+import unittest
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+class TestEstimationScenarios(TestAbstractClass, TestCase):
+    """Test case for what-if scenario endpoint"""
+
+    def test(self) -> None:
+        """Tests what-if scenario endpoint
+
+        Checks that the score of each scenario is the same as the
+        estimation of the project with its overrides, listed scenarios
+        first and then the combinations of the grid
+
+        Raise:
+            AssertionError: If status code or JSON body does not match
+
+        """
+        scenarios = [{'goal': 10000, 'duration_days': 45}, {'set_count': 1}]
+        grid = {'goal': [20000, 500000], 'min_set_prices': [0, 1000], 'max_set_prices': [30000]}
+        response = self.client.post('/estimation/scenarios', json={
+            'project': mock_data, 'scenarios': scenarios, 'grid': grid})
+        self.assertEqual(response.status_code, 200)
+        single = self.client.post('/estimation', json=mock_data).json
+        self.assertAlmostEqual(response.json['score'], single['score'])
+        self.assertAlmostEqual(response.json['greater_than'], single['greater_than'])
+        overrides = [s['overrides'] for s in response.json['scenarios']]
+        self.assertEqual(overrides, scenarios + [
+            {'goal': g, 'min_set_prices': p, 'max_set_prices': 30000}
+            for g in grid['goal'] for p in grid['min_set_prices']
+        ])
+        start_time = datetime.datetime.fromisoformat(mock_data['start_time'].replace('Z', '+00:00'))
+        for scenario in response.json['scenarios']:
+            project = {**mock_data, **scenario['overrides']}
+            if 'duration_days' in project:
+                end_time = start_time + datetime.timedelta(days=project.pop('duration_days'))
+                project['end_time'] = end_time.isoformat()
+            estimation = self.client.post('/estimation', json=project).json
+            self.assertAlmostEqual(scenario['score'], estimation['score'])
+            self.assertAlmostEqual(scenario['greater_than'], estimation['greater_than'])
+
+    def test_invalid(self) -> None:
+        """Tests 422 response with no or too many scenarios
+
+        Raise:
+            AssertionError: If status code is not 422
+
+        """
+        for body in [
+            {'project': mock_data},
+            {'project': mock_data, 'grid': {'goal': list(range(1001))}},
+            {'project': mock_data, 'scenarios': [{'goal': -1}]},
+        ]:
+            response = self.client.post('/estimation/scenarios', json=body)
+            self.assertEqual(response.status_code, 422)
+
+    def test_empty_text(self) -> None:
+        """Tests 400 response with empty text
+
+        Raise:
+            AssertionError: If status code is not 400
+
+        """
+        response = self.client.post('/estimation/scenarios', json={
+            'project': {**mock_data, 'content': ''}, 'scenarios': [{'goal': 1}]})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""Test estimation jobs"""
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.jobs import JobQueue, MemoryJobStore, QueueFullError, SQLiteJobStore # pylint: disable=import-error,wrong-import-order
+
+def wait(queue: JobQueue, job_id: str, timeout: float = 10) -> dict:
+    """Waits until job finishes, returns the job"""
+    deadline = time.time() + timeout
+    job = queue.get(job_id)
+    while job['status'] in ('queued', 'running') and time.time() < deadline:
+        time.sleep(.01)
+        job = queue.get(job_id)
+    return job
+
+class TestJobQueue(unittest.TestCase):
+    """Test case for job queue"""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.stores = {
+            'memory': lambda ttl: MemoryJobStore(ttl),
+            'sqlite': lambda ttl: SQLiteJobStore(pathlib.Path(self.directory.name) / 'jobs', ttl)
+        }
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test(self) -> None:
+        """Tests result and error of jobs
+
+        Checks that jobs run in the background and keep their result,
+        or their error if failed, in every store
+
+        Raise:
+            AssertionError: If status, result or error does not match
+
+        """
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                queue = JobQueue(store(600), workers=2)
+                job = wait(queue, queue.submit(lambda x: {'score': x}, .5))
+                self.assertEqual((job['status'], job['result']), ('done', {'score': .5}))
+                job = wait(queue, queue.submit(lambda: 1 / 0))
+                self.assertEqual(job['status'], 'failed')
+                self.assertIn('division by zero', job['error'])
+                self.assertIsNone(queue.get('unknown'))
+
+    def test_queue_full(self) -> None:
+        """Tests queue depth limit and cancellation
+
+        Checks that submitting fails while too many jobs are waiting,
+        and that only waiting jobs can be cancelled
+
+        Raise:
+            AssertionError: If submission or cancellation does not match
+
+        """
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                event = threading.Event()
+                queue = JobQueue(store(600), workers=1, max_queued=1)
+                running = queue.submit(event.wait)
+                while queue.get(running)['status'] != 'running':
+                    time.sleep(.01)
+                waiting = queue.submit(lambda: 'done')
+                self.assertRaises(QueueFullError, queue.submit, lambda: 'done')
+                self.assertFalse(queue.cancel(running))
+                self.assertTrue(queue.cancel(waiting))
+                event.set()
+                self.assertEqual(wait(queue, running)['status'], 'done')
+                self.assertEqual(wait(queue, waiting)['status'], 'cancelled')
+                self.assertIsNone(wait(queue, waiting)['result'])
+                self.assertEqual(queue.stats()['queued'], 0)
+
+    def test_cancel_frees_slot(self) -> None:
+        """Tests queue depth after cancellation
+
+        Checks that cancelled jobs free their slot at once, while the
+        worker is still busy
+
+        Raise:
+            AssertionError: If submission fails or the depth does not match
+
+        """
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                event = threading.Event()
+                queue = JobQueue(store(600), workers=1, max_queued=2)
+                running = queue.submit(event.wait)
+                while queue.get(running)['status'] != 'running':
+                    time.sleep(.01)
+                waiting = [queue.submit(lambda: 'done') for _ in range(2)]
+                self.assertRaises(QueueFullError, queue.submit, lambda: 'done')
+                self.assertTrue(all(queue.cancel(job_id) for job_id in waiting))
+                self.assertEqual(queue.stats()['queued'], 0)
+                job_id = queue.submit(lambda: 'done')
+                self.assertEqual(queue.stats()['queued'], 1)
+                event.set()
+                self.assertEqual(wait(queue, job_id)['status'], 'done')
+                self.assertEqual(queue.stats()['queued'], 0)
+
+    def test_ttl(self) -> None:
+        """Tests expiry of finished jobs
+
+        Checks that finished jobs are dropped after ttl seconds, and
+        that waiting jobs never expire
+
+        Raise:
+            AssertionError: If a job is kept or dropped wrongly
+
+        """
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                store = store(60)
+                queue = JobQueue(store, workers=1)
+                event = threading.Event()
+                finished = queue.submit(lambda: 'done')
+                wait(queue, finished)
+                running = queue.submit(event.wait)
+                with mock.patch('time.time', return_value=time.time() + 120):
+                    self.assertIsNone(queue.get(finished))
+                    store.purge()
+                    self.assertIsNotNone(queue.get(running))
+                event.set()
+                self.assertEqual(wait(queue, running)['status'], 'done')
+
+    def test_shared(self) -> None:
+        """Tests SQLite store shared by processes
+
+        Checks that a job submitted to one queue can be polled and
+        cancelled through another queue on the same database
+
+        Raise:
+            AssertionError: If the job is not shared
+
+        """
+        path = pathlib.Path(self.directory.name) / 'shared'
+        event = threading.Event()
+        queue = JobQueue(SQLiteJobStore(path), workers=1)
+        other = JobQueue(SQLiteJobStore(path), workers=1)
+        running = queue.submit(event.wait)
+        waiting = queue.submit(lambda: 'done')
+        self.assertTrue(other.cancel(waiting))
+        event.set()
+        self.assertEqual(wait(other, running)['status'], 'done')
+        self.assertTrue(wait(other, running)['result'])
+        self.assertEqual(wait(queue, waiting)['status'], 'cancelled')
+
+if __name__ == "__main__":
+    unittest.main()
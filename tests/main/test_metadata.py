@@ -0,0 +1,97 @@
+"""Test metadata encoder"""
+import json
+import pathlib
+import unittest
+
+import numpy as np
+import pandas as pd
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.metadata import META_FEATURES, CategoryTable, MetadataEncoder # pylint: disable=import-error,wrong-import-order
+from app.utils.schema import ProjectSchema # pylint: disable=import-error,wrong-import-order
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+def get_metadata(project: dict):
+    """Preprocesses metadata with pandas as the reference of the encoder"""
+    cols = ['facebook', 'instagram', 'youtube', 'website', 'set_count', 'start_time', 'end_time']
+    df_project = pd.DataFrame([project])[cols]
+
+    df_project['duration_days'] = (df_project['end_time'] - df_project['start_time']).dt.days
+    project['duration_days'] = int(df_project['duration_days'].values[0])
+
+    df_project['description_length'] = project['description_length'] = len(project['description'])
+    df_project['content_length'] = project['content_length'] = len(project['content'])
+    df_project['title_length'] = len(project['title'])
+
+    cate = [f for f in META_FEATURES if f.startswith(('type_', 'domain_'))]
+
+    df_project[cate] = 0
+    df_project[f'type_{project["type"]}'] = 1
+    df_project[f'domain_{project["domain"]}'] = 1
+
+    df_project['log_goal'] = np.log(project['goal']) if project['goal'] else 1
+    df_project['log_max_set_prices'] = np.log(
+        project['max_set_prices']) if project['max_set_prices'] else 1
+    df_project['log_min_set_prices'] = np.log(project['min_set_prices'] + 1)
+
+    df_project = df_project.drop(columns=['start_time', 'end_time'])
+    df_project = df_project[META_FEATURES]
+    return df_project.to_numpy().astype(float), project
+
+class TestMetadataEncoder(unittest.TestCase):
+    """Test case for metadata encoder"""
+
+    variants = [
+        {},
+        {'goal': 0, 'max_set_prices': 0, 'min_set_prices': 0},
+        {'type': '預購式專案', 'domain': '設計', 'facebook': False, 'youtube': True},
+        {'type': 'unknown', 'domain': 'unknown'},
+        {'start_time': '2021-09-07T23:59:59+08:00', 'end_time': '2021-09-08T00:00:01+00:00'},
+    ]
+
+    def test(self) -> None:
+        """Tests parity with the pandas implementation
+
+        Checks that the encoded metadata of the mock request and its
+        variants is bit-identical to the pandas implementation
+
+        Raise:
+            AssertionError: If the encoded metadata does not match
+
+        """
+        encoder = MetadataEncoder()
+        projects = [ProjectSchema().load({**mock_data, **v}) for v in self.variants]
+        expected = [get_metadata(dict(p)) for p in projects]
+        x_meta = encoder.encode(projects)
+        self.assertEqual(x_meta.dtype, np.float64)
+        self.assertTrue(np.array_equal(x_meta, np.vstack([x for x, _ in expected])))
+        for project, (_, expected_project) in zip(projects, expected):
+            self.assertEqual(project, expected_project)
+
+class TestCategoryTable(unittest.TestCase):
+    """Test case for category table"""
+
+    def test(self) -> None:
+        """Tests codes of categories
+
+        Checks that known names are coded in order, unknown names are
+        coded -1, or appended to the table if extended
+
+        Raise:
+            AssertionError: If the codes or names do not match
+
+        """
+        table = CategoryTable(['出版', '設計'])
+        codes = table.encode(['設計', '出版', 'unknown'])
+        self.assertEqual(codes.tolist(), [1, 0, -1])
+        codes = table.encode(['unknown', '設計', 'other', 'unknown'], extend=True)
+        self.assertEqual(codes.tolist(), [2, 1, 3, 2])
+        self.assertEqual(table.names, ['出版', '設計', 'unknown', 'other'])
+        self.assertEqual(len(table), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Test metrics endpoint"""
+import json
+import pathlib
+import unittest
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+STAGES = ['segmentation', 'preprocessing', 'vectorization', 'metadata', 'prediction',
+          'similarity', 'text_suggestion', 'meta_suggestion', 'serialization']
+
+def parse(text: str) -> 'dict[str, float]':
+    """Parses the samples of metrics in the Prometheus text format"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+class TestMetrics(TestAbstractClass, TestCase):
+    """Test case for metrics endpoint"""
+
+    def test(self) -> None:
+        """Tests metrics endpoint
+
+        Checks that an estimation request records each stage and
+        is counted with its status code
+
+        Raise:
+            AssertionError: If the samples do not match
+
+        """
+        from app.utils.estimate import token_cache # pylint: disable=import-error,import-outside-toplevel
+        from app.utils.metrics import metrics # pylint: disable=import-error,import-outside-toplevel
+        token_cache.clear()
+        metrics.clear()
+        self.assertEqual(self.client.post('/estimation', json=mock_data).status_code, 200)
+        self.assertEqual(self.client.get('/not-found').status_code, 404)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        samples = parse(response.get_data(as_text=True))
+        for stage in STAGES:
+            self.assertEqual(samples[f'crowditor_stage_seconds_count{{stage="{stage}"}}'], 1)
+            self.assertEqual(samples[f'crowditor_stage_seconds_bucket{{stage="{stage}",le="+Inf"}}'], 1)
+            self.assertGreater(samples[f'crowditor_stage_seconds_sum{{stage="{stage}"}}'], 0)
+        self.assertEqual(samples[
+            'crowditor_requests_total{method="POST",endpoint="/estimation",status="200"}'], 1)
+        self.assertEqual(samples[
+            'crowditor_requests_total{method="GET",endpoint="unmatched",status="404"}'], 1)
+        self.assertGreater(samples['crowditor_token_cache_misses'], 0)
+
+    def test_histogram(self) -> None:
+        """Tests histogram buckets
+
+        Checks that buckets are cumulative and bounds are inclusive
+
+        Raise:
+            AssertionError: If the samples do not match
+
+        """
+        from app.utils.metrics import Metrics # pylint: disable=import-error,import-outside-toplevel
+        metrics = Metrics(prefix='test', log_sample_rate=0)
+        for seconds in [.001, .002, 20]:
+            metrics.observe('stage', seconds)
+        samples = parse(metrics.render())
+        self.assertEqual(samples['test_stage_seconds_bucket{stage="stage",le="0.0005"}'], 0)
+        self.assertEqual(samples['test_stage_seconds_bucket{stage="stage",le="0.001"}'], 1)
+        self.assertEqual(samples['test_stage_seconds_bucket{stage="stage",le="0.0025"}'], 2)
+        self.assertEqual(samples['test_stage_seconds_bucket{stage="stage",le="10.0"}'], 2)
+        self.assertEqual(samples['test_stage_seconds_bucket{stage="stage",le="+Inf"}'], 3)
+        self.assertAlmostEqual(samples['test_stage_seconds_sum{stage="stage"}'], 20.003)
+        self.assertEqual(samples['test_stage_seconds_count{stage="stage"}'], 3)
+
+if __name__ == "__main__":
+    unittest.main()
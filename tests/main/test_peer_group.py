@@ -0,0 +1,123 @@
+"""Test peer group aggregates"""
+import unittest
+from unittest import mock
+
+import numpy as np
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils import suggest # pylint: disable=import-error,wrong-import-order
+from app.utils.registry import registry # pylint: disable=import-error,wrong-import-order
+
+class TestPeerGroup(unittest.TestCase):
+    """Test case for peer group aggregates"""
+
+    def setUp(self) -> None:
+        suggest.peer_cache.clear()
+        self.dataset = registry.get('artifacts')['dataset']
+        self.rng = np.random.default_rng(0)
+
+    def test(self) -> None:
+        """Tests suggestions of the same peers in another order
+
+        Checks that the aggregates are reused for the same set of peers,
+        and that the peers of recommended tokens follow the similarity
+        order of each request
+
+        Raise:
+            AssertionError: If the suggestions or counters do not match
+
+        """
+        tokens = {c: [] for c in ['title', 'description', 'content']}
+        sim_proj = self.rng.choice(len(self.dataset), 20, replace=False)
+        titles = self.dataset['title'].to_numpy()
+        for peers in [sim_proj, sim_proj[::-1], self.rng.permutation(sim_proj)]:
+            position = {t: i for i, t in enumerate(titles[peers])}
+            for col, values in suggest.get_text_suggestion(peers, tokens)['recommend_tokens'].items():
+                for value in values:
+                    self.assertEqual(value['peer_title'],
+                                     sorted(value['peer_title'], key=position.get))
+                    self.assertEqual(len(value['peer_title']), value['df'], col)
+        stats = suggest.peer_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+    def test_suggestion(self) -> None:
+        """Tests peer cache lookups of a whole suggestion
+
+        Checks that a suggestion looks the peer group up once, so new
+        peers count one miss and the same peers in another order one hit
+
+        Raise:
+            AssertionError: If the counters do not match
+
+        """
+        tokens = {c: [] for c in ['title', 'description', 'content']}
+        project = {**{c: 0. for c in suggest.META_COLS}, 'domain': '', 'type': ''}
+        sim_proj = self.rng.choice(len(self.dataset), 20, replace=False)
+        for peers, expected in [(sim_proj, (0, 1)), (sim_proj[::-1], (1, 1))]:
+            with mock.patch.object(suggest, 'get_similar_project',
+                                   return_value=(peers, np.ones(len(peers)))):
+                result = suggest.get_suggestion(project, {}, tokens)
+            stats = suggest.peer_cache.stats()
+            self.assertEqual((stats['hits'], stats['misses']), expected)
+            self.assertEqual(result['peer_success_cnt'],
+                             int(self.dataset['success'].iloc[peers].sum()))
+
+    def test_meta(self) -> None:
+        """Tests parity of metadata suggestion with pandas
+
+        Checks the box statistics, medians and counts against pandas,
+        including peer groups without success or failure
+
+        Raise:
+            AssertionError: If the statistics do not match
+
+        """
+        for _ in range(20):
+            sim_proj = self.rng.choice(len(self.dataset), int(self.rng.integers(1, 21)),
+                                       replace=False)
+            project = {c: float(self.rng.integers(0, 10000)) for c in suggest.META_COLS}
+            result = suggest.get_meta_suggestion(sim_proj, project)['metadata']
+            df_peer = self.dataset.iloc[sim_proj, :]
+            success = df_peer[df_peer['success']]
+            failure = df_peer[~df_peer['success']]
+            for col in suggest.META_COLS:
+                describe = df_peer[col].describe()
+                self.assertEqual(result[col]['box_min'], describe['min'])
+                self.assertEqual(result[col]['box_25'], describe['25%'])
+                self.assertEqual(result[col]['box_50'], describe['50%'])
+                self.assertEqual(result[col]['box_75'], describe['75%'])
+                self.assertEqual(result[col]['box_max'], describe['max'])
+                self.assertEqual(result[col]['success_greater'],
+                                 int((success[col] > project[col]).sum()))
+                self.assertEqual(result[col]['success_less'],
+                                 int((success[col] < project[col]).sum()))
+                np.testing.assert_equal(result[col]['success_median'],
+                                        float(success[col].median()))
+                np.testing.assert_equal(result[col]['failure_median'],
+                                        float(failure[col].median()))
+
+    def test_categories(self) -> None:
+        """Tests category suggestion
+
+        Checks the rates against pandas, and that ties of the most common
+        category go to the most similar peer
+
+        Raise:
+            AssertionError: If the rates or the category do not match
+
+        """
+        for _ in range(20):
+            sim_proj = self.rng.choice(len(self.dataset), int(self.rng.integers(1, 21)),
+                                       replace=False)
+            project = {'domain': self.dataset['domain'].iloc[sim_proj[-1]], 'type': '群眾集資'}
+            result = suggest.get_category_suggestion(sim_proj, project)
+            for col in ['domain', 'type']:
+                values = self.dataset[col].iloc[sim_proj]
+                counts = values.value_counts()
+                self.assertEqual(result[col]['same_rate'], (values == project[col]).mean())
+                self.assertEqual(result[col]['most']['rate'], counts.iloc[0] / len(sim_proj))
+                tied = set(counts[counts == counts.iloc[0]].index)
+                self.assertEqual(result[col]['most']['name'], next(v for v in values if v in tied))
+
+if __name__ == "__main__":
+    unittest.main()
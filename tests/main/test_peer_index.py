@@ -0,0 +1,69 @@
+"""Test peer retrieval index"""
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.peer_index import ExactIndex, IVFIndex, load_peer_index # pylint: disable=import-error,wrong-import-order
+
+class TestPeerIndex(unittest.TestCase):
+    """Test case for peer retrieval index"""
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        vectors = rng.random((500, 30)) ** 4
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.queries = self.vectors[:20]
+
+    def test_exact(self) -> None:
+        """Tests exact index
+
+        Checks that the exact index returns the top-k similarities
+        above threshold in descending order
+
+        Raise:
+            AssertionError: If the result does not match brute force
+
+        """
+        positions, cos = ExactIndex(self.vectors).search(self.queries[0], 20, .5)
+        expected = np.sort(self.vectors @ self.queries[0])[::-1][:20]
+        self.assertTrue(np.allclose(cos, expected[expected >= .5]))
+        self.assertTrue(np.allclose(self.vectors[positions] @ self.queries[0], cos))
+
+    def test_ivf(self) -> None:
+        """Tests IVF index probing every cluster
+
+        Checks that the IVF index probing every cluster matches the
+        exact index, and survives saving and loading
+
+        Raise:
+            AssertionError: If the results do not match
+
+        """
+        exact = ExactIndex(self.vectors)
+        ivf = IVFIndex.build(self.vectors, n_lists=10, n_probe=10)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = pathlib.Path(directory) / 'peer_index.npz'
+            ivf.save(filename)
+            loaded = load_peer_index('ivf', self.vectors, filename, n_probe=10)
+        for query in self.queries:
+            expected = exact.search(query, 20, .05)
+            for index in [ivf, loaded]:
+                positions, cos = index.search(query, 20, .05)
+                self.assertTrue(np.array_equal(positions, expected[0]))
+                self.assertTrue(np.allclose(cos, expected[1]))
+
+    def test_unknown(self) -> None:
+        """Tests unknown backend
+
+        Raise:
+            AssertionError: If ValueError is not raised
+
+        """
+        with self.assertRaises(ValueError):
+            load_peer_index('unknown', self.vectors, 'peer_index.npz')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+"""Test percentile lookup of dataset scores"""
+import unittest
+
+import numpy as np
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils import estimate # pylint: disable=import-error,wrong-import-order,unused-import
+from app.utils.registry import registry # pylint: disable=import-error,wrong-import-order
+
+class TestPercentile(unittest.TestCase):
+    """Test case for percentile lookup"""
+
+    def test(self) -> None:
+        """Tests parity with linear scan
+
+        Checks that the percentile of probabilities, including the
+        scores themselves, matches the linear scan
+
+        Raise:
+            AssertionError: If the percentiles do not match
+
+        """
+        bundle = registry.get('bundle')
+        probs = np.concatenate([np.linspace(0, 1, 101), bundle.scores[::7]])
+        expected = [(bundle.scores < p).mean() for p in probs]
+        self.assertTrue(np.array_equal(bundle.percentile(probs), expected))
+        self.assertTrue(np.all(np.diff(bundle.scores) >= 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Test text preprocessor"""
+from functools import reduce
+import json
+import pathlib
+import unittest
+
+from hypothesis import given, settings, strategies as st
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.preprocessor import (Preprocessor, DELEMINATORS, EMOJI_PATTERN, # pylint: disable=import-error,wrong-import-order
+    FITLER_WORDS)
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+def full2half(string: str) -> str:
+    """Convert full-width text to half-width one, char by char"""
+    result = ''
+    for char in string:
+        num = ord(char)
+        if num == 0x3000:
+            num = 32
+        elif 0xFF01 <= num <= 0xFF5E:
+            num -= 0xfee0
+        num = chr(num)
+        result += num
+    return result
+
+def reference_preprocess(doc: 'list[str]', deliminators: 'list[str]' = DELEMINATORS,
+    filter_words: 'list[str]' = FITLER_WORDS) -> 'list[str]':
+    """Preprocesses token by token as the reference of Preprocessor"""
+    def deli(string):
+        return reduce(lambda x, y: x.replace(y, ' '), deliminators, string)
+    tokens = reduce(
+        lambda x, y: x+deli(EMOJI_PATTERN.sub(r'', full2half(y))).split(), doc, [])
+    return [s for s in tokens if s and not any(f in s for f in filter_words)]
+
+REAL_CONTENT = ''.join(mock_data[c] for c in ['title', 'description', 'content'])
+ALPHABET = sorted(set(REAL_CONTENT + ''.join(DELEMINATORS) + 'ab.- 　\n\t１２Ａ！？😀🚀$%7'))
+
+tokens = st.lists(st.text(alphabet=ALPHABET, max_size=6), max_size=40)
+
+class TestPreprocessor(unittest.TestCase):
+    """Test case for text preprocessor"""
+
+    def test_content(self) -> None:
+        """Tests real content
+
+        Checks that the mock request, cut into tokens of different
+        lengths, is preprocessed the same as the reference
+
+        Raise:
+            AssertionError: If the tokens do not match
+
+        """
+        preprocessor = Preprocessor()
+        for size in [1, 2, 3, 5, 8]:
+            doc = [REAL_CONTENT[i:i+size] for i in range(0, len(REAL_CONTENT), size)]
+            self.assertEqual(preprocessor.preprocess(doc), reference_preprocess(doc))
+
+    @settings(max_examples=300, deadline=None)
+    @given(tokens)
+    def test_property(self, doc: 'list[str]') -> None:
+        """Tests random tokens of real characters
+
+        Raise:
+            AssertionError: If the tokens do not match
+
+        """
+        self.assertEqual(Preprocessor().preprocess(doc), reference_preprocess(doc))
+
+    @settings(max_examples=300, deadline=None)
+    @given(tokens, st.lists(st.text(alphabet='ab.- \n', min_size=1, max_size=3), max_size=5))
+    def test_property_deliminators(self, doc: 'list[str]', deliminators: 'list[str]') -> None:
+        """Tests random deliminators whose order may matter
+
+        Raise:
+            AssertionError: If the tokens do not match
+
+        """
+        preprocessor = Preprocessor(deliminators=deliminators)
+        self.assertEqual(preprocessor.preprocess(doc), reference_preprocess(doc, deliminators))
+
+    def test_batch(self) -> None:
+        """Tests list of documents
+
+        Raise:
+            AssertionError: If the tokens do not match
+
+        """
+        docs = [['募資', '１２３'], [], ['【', 'SurfacePoint', '】']]
+        self.assertEqual(Preprocessor().preprocess(docs), [reference_preprocess(d) for d in docs])
+        self.assertEqual(Preprocessor().preprocess([]), [])
+
+if __name__ == "__main__":
+    unittest.main()
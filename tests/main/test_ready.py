@@ -0,0 +1,38 @@
+"""Test readiness endpoint"""
+import time
+import unittest
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+class TestReady(TestAbstractClass, TestCase):
+    """Test case for readiness endpoint"""
+
+    def test(self) -> None:
+        """Tests readiness endpoint
+
+        Checks that readiness endpoint starts loading the models and
+        returns 200 with the loading time of each model once loaded
+
+        Raise:
+            AssertionError: If status code or JSON body does not match
+
+        """
+        deadline = time.time() + 120
+        response = self.client.get('/ready')
+        while response.status_code == 503 and time.time() < deadline:
+            self.assertEqual(response.json['status'], 'loading')
+            time.sleep(.1)
+            response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['status'], 'ready')
+        self.assertEqual(set(response.json['components']),
+                         {'artifacts', 'peer_index', 'segmentor', 'bundle',
+                          'overview', 'advice', 'success_rates_by_score'})
+        self.assertEqual(response.json['version'], response.headers['X-Model-Version'])
+        for component in response.json['components'].values():
+            self.assertTrue(component['loaded'])
+            self.assertGreaterEqual(component['seconds'], 0)
+            self.assertIsNone(component['error'])
+
+if __name__ == "__main__":
+    unittest.main()
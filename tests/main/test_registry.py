@@ -0,0 +1,179 @@
+"""Test model registry"""
+from concurrent.futures import ThreadPoolExecutor
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils.registry import ModelRegistry # pylint: disable=import-error,wrong-import-order
+
+class TestModelRegistry(unittest.TestCase):
+    """Test case for model registry"""
+
+    def test(self) -> None:
+        """Tests loading on first use
+
+        Checks that a component is loaded once on first use, even if
+        requested from many threads
+
+        Raise:
+            AssertionError: If the component is not loaded once
+
+        """
+        calls = []
+        def load():
+            calls.append(1)
+            time.sleep(.05)
+            return object()
+        registry = ModelRegistry()
+        registry.register('model', load)
+        self.assertFalse(registry.is_ready())
+        self.assertEqual(registry.status(), {'model': {'loaded': False, 'seconds': None, 'error': None}})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            components = list(executor.map(lambda _: registry.get('model'), range(8)))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(c is components[0] for c in components))
+        self.assertTrue(registry.is_ready())
+        self.assertGreaterEqual(registry.status()['model']['seconds'], .05)
+
+    def test_error(self) -> None:
+        """Tests failed loading
+
+        Checks that a failed load is reported and retried
+
+        Raise:
+            AssertionError: If the error is not reported or not retried
+
+        """
+        results = [ValueError('broken'), 'model']
+        def load():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        registry = ModelRegistry()
+        registry.register('model', load)
+        registry.warm_up().join()
+        self.assertEqual(registry.status()['model'], {'loaded': False, 'seconds': None, 'error': 'broken'})
+        self.assertEqual(registry.get('model'), 'model')
+        self.assertEqual(registry.status()['model']['error'], None)
+
+    def test_warm_up_retry(self) -> None:
+        """Tests warm-up after a failed one
+
+        Checks that a new warm-up is started once the previous one failed,
+        and loads the component
+
+        Raise:
+            AssertionError: If the component is not loaded again
+
+        """
+        calls = []
+        def load():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError('broken')
+            return 'model'
+        registry = ModelRegistry()
+        registry.register('model', load)
+        registry.warm_up().join()
+        self.assertFalse(registry.is_ready())
+        registry.warm_up().join()
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(registry.is_ready())
+        self.assertEqual(registry.status()['model']['error'], None)
+
+    def test_reload(self) -> None:
+        """Tests reloading versioned components
+
+        Checks that a new data directory is loaded in the background and
+        swapped in once loaded, while a pinned snapshot keeps the version
+        it started with, and that an invalid directory is not swapped in
+
+        Raise:
+            AssertionError: If the versions are mixed or swapped too early
+
+        """
+        with tempfile.TemporaryDirectory() as root:
+            directories = {}
+            for version in ['v1', 'v2', 'v3']:
+                directories[version] = pathlib.Path(root) / version
+                directories[version].mkdir()
+                (directories[version] / 'VERSION').write_text(version, encoding='utf-8')
+            loading = threading.Event()
+            def load(directory):
+                if directory.name == 'v2':
+                    loading.wait()
+                return directory.name
+            def check():
+                if registry.get('model') == 'v3':
+                    raise ValueError('invalid')
+            registry = ModelRegistry(directories['v1'])
+            registry.register('model', load, versioned=True)
+            registry.register('shared', object)
+            registry.add_check(check)
+            shared = registry.get('shared')
+            self.assertEqual(registry.get('model'), 'v1')
+
+            with registry.snapshot():
+                thread = registry.reload(directories['v2'])
+                self.assertEqual(registry.reload_status['status'], 'loading')
+                self.assertEqual(registry.get('model'), 'v1')
+                loading.set()
+                thread.join()
+                self.assertEqual(registry.get('model'), 'v1')
+                self.assertEqual(registry.version(), 'v1')
+            self.assertEqual(registry.get('model'), 'v2')
+            self.assertEqual(registry.version(), 'v2')
+            self.assertEqual(registry.reload_status['status'], 'active')
+            self.assertIs(registry.get('shared'), shared)
+
+            registry.reload(directories['v3']).join()
+            self.assertEqual(registry.reload_status['status'], 'failed')
+            self.assertEqual(registry.reload_status['error'], 'invalid')
+            self.assertEqual(registry.get('model'), 'v2')
+
+    def test_watch(self) -> None:
+        """Tests reloading on changes of the data directory
+
+        Checks that the watch reloads once the VERSION file of the data
+        directory changes, and once the data directory link points to
+        another directory
+
+        Raise:
+            AssertionError: If the new version is not activated
+
+        """
+        with tempfile.TemporaryDirectory() as root:
+            root = pathlib.Path(root)
+            for version in ['v1', 'v2']:
+                (root / version).mkdir()
+                (root / version / 'VERSION').write_text(version, encoding='utf-8')
+            data = root / 'data'
+            data.symlink_to(root / 'v1', target_is_directory=True)
+            with mock.patch('app.utils.registry.DATA_PATH', data):
+                registry = ModelRegistry(data)
+                registry.register('model', lambda directory: directory.name, versioned=True)
+                registry.watch(.01)
+                try:
+                    for version, change in [
+                        ('v1.1', lambda: (root / 'v1' / 'VERSION').write_text(
+                            'v1.1', encoding='utf-8')),
+                        ('v2', lambda: (data.unlink(), data.symlink_to(root / 'v2')))
+                    ]:
+                        change()
+                        deadline = time.time() + 10
+                        while registry.version() != version and time.time() < deadline:
+                            time.sleep(.01)
+                        self.assertEqual(registry.version(), version)
+                        self.assertEqual(registry.reload_status['status'], 'active')
+                        self.assertEqual(registry.reload_status['version'], version)
+                    self.assertEqual(registry.get('model'), 'v2')
+                finally:
+                    registry.unwatch()
+
+if __name__ == "__main__":
+    unittest.main()
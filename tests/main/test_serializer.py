@@ -0,0 +1,102 @@
+"""Contract test of the fast estimation serializer"""
+import copy
+import json
+import math
+import pathlib
+import unittest
+from unittest import mock
+
+import numpy as np
+from flask import jsonify
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_request = json.load(file)
+
+with open(FILE_PATH / '../../mock_data/estimation_response.json', 'r', encoding='utf-8') as file:
+    mock_response = json.load(file)
+
+def same(x, y) -> bool:
+    """Returns true if parsed JSON values are equal, with NaN equal to NaN"""
+    if isinstance(x, dict) and isinstance(y, dict):
+        return x.keys() == y.keys() and all(same(x[k], y[k]) for k in x)
+    if isinstance(x, list) and isinstance(y, list):
+        return len(x) == len(y) and all(same(a, b) for a, b in zip(x, y))
+    if isinstance(x, float) and isinstance(y, float) and math.isnan(x) and math.isnan(y):
+        return True
+    return type(x) is type(y) and x == y
+
+def with_numpy(response: dict) -> dict:
+    """Returns the response with numpy values as the estimation gives"""
+    response = copy.deepcopy(response)
+    if 'score' in response:
+        response['score'] = np.float64(response['score'])
+        response['peer_cnt'] = np.int64(response['peer_cnt'])
+    for peer in response.get('peers', []):
+        peer['success'] = np.bool_(peer['success'])
+        peer['cos'] = np.float64(peer['cos'])
+    for value in response.get('metadata', {}).values():
+        value['project_value'] = np.int64(value['project_value'])
+        value['success_median'] = np.float64(value['success_median'])
+        value['success_greater'] = np.int64(value['success_greater'])
+    for tokens in response.get('recommend_tokens', {}).values():
+        for token in tokens:
+            token['df'] = np.int64(token['df'])
+            token['peer_link'] = np.array(token['peer_link'], dtype=object)
+    response['unknown'] = 'dropped'
+    return response
+
+class TestSerializer(TestAbstractClass, TestCase):
+    """Test case for the fast estimation serializer"""
+
+    def marshal(self, obj: dict) -> dict:
+        """Returns the response marshalled by EstimationResponseSchema"""
+        from app.views.estimation import EstimationResponseSchema # pylint: disable=import-error,import-outside-toplevel
+        return json.loads(jsonify(EstimationResponseSchema().dump(obj)).get_data())
+
+    def fast(self, obj: dict) -> dict:
+        """Returns the response of the fast serializer"""
+        from app.views.estimation import estimation_serializer # pylint: disable=import-error,import-outside-toplevel
+        return json.loads(estimation_serializer.dumps(obj))
+
+    def test(self) -> None:
+        """Tests equivalence with EstimationResponseSchema
+
+        Checks the mock response, the one with missing fields and the
+        one with NaN median, also with numpy values that marshmallow
+        cannot encode, with orjson and with the json module
+
+        Raise:
+            AssertionError: If the responses do not match
+
+        """
+        partial = copy.deepcopy(mock_response)
+        del partial['peers'], partial['categories']
+        nan = copy.deepcopy(mock_response)
+        next(iter(nan['metadata'].values()))['success_median'] = float('nan')
+        for obj in [mock_response, partial, nan, {}]:
+            expected = self.marshal(obj)
+            self.assertTrue(same(self.fast(obj), expected))
+            self.assertTrue(same(self.fast(with_numpy(obj)), expected))
+            with mock.patch('app.utils.serializer.orjson', None):
+                self.assertTrue(same(self.fast(with_numpy(obj)), expected))
+
+    def test_endpoint(self) -> None:
+        """Tests estimation endpoint with the fast serializer
+
+        Raise:
+            AssertionError: If the responses do not match
+
+        """
+        response = self.client.post('/estimation', json=mock_request)
+        with mock.patch('app.views.estimation.ESTIMATION_FAST_JSON', True):
+            fast = self.client.post('/estimation', json=mock_request)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.mimetype, 'application/json')
+        self.assertTrue(same(fast.json, response.json))
+
+if __name__ == "__main__":
+    unittest.main()
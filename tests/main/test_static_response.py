@@ -0,0 +1,75 @@
+"""Test pre-serialized responses of overview and advice endpoints"""
+import gzip
+import pickle
+import pathlib
+import unittest
+
+import brotli
+from flask import jsonify
+from flask_testing import TestCase
+from . import TestAbstractClass
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+DATA_PATH = FILE_PATH / '../../main/app/data/preprocessed'
+
+class TestStaticResponse(TestAbstractClass, TestCase):
+    """Test case for pre-serialized responses"""
+
+    def expected(self, name: str) -> bytes:
+        """Returns the body of the endpoint marshalled per request"""
+        from app.views.overview import OverviewResponseSchema # pylint: disable=import-error,import-outside-toplevel
+        from app.views.advice import AdviceResponseSchema # pylint: disable=import-error,import-outside-toplevel
+        schema = {'overview': OverviewResponseSchema, 'advice': AdviceResponseSchema}[name]()
+        with open(DATA_PATH / f'{name}.pickle', 'rb') as file:
+            return jsonify(schema.dump(pickle.load(file))).get_data()
+
+    def test(self) -> None:
+        """Tests content coding
+
+        Checks that every content coding decodes to the body
+        marshalled per request
+
+        Raise:
+            AssertionError: If the body or headers do not match
+
+        """
+        for name in ['overview', 'advice']:
+            expected = self.expected(name)
+            response = self.client.get(f'/{name}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_data(), expected)
+            self.assertIsNone(response.content_encoding)
+            self.assertIn('Accept-Encoding', response.vary)
+            response = self.client.get(f'/{name}', headers={'Accept-Encoding': 'gzip, deflate'})
+            self.assertEqual(response.content_encoding, 'gzip')
+            self.assertEqual(gzip.decompress(response.get_data()), expected)
+            response = self.client.get(f'/{name}', headers={'Accept-Encoding': 'gzip, br'})
+            self.assertEqual(response.content_encoding, 'br')
+            self.assertEqual(brotli.decompress(response.get_data()), expected)
+            response = self.client.get(f'/{name}', headers={'Accept-Encoding': 'gzip;q=1, br;q=0.5'})
+            self.assertEqual(response.content_encoding, 'gzip')
+            response = self.client.get(f'/{name}', headers={'Accept-Encoding': 'br;q=0'})
+            self.assertIsNone(response.content_encoding)
+
+    def test_not_modified(self) -> None:
+        """Tests ETag
+
+        Checks that a request with the ETag of the response gets 304
+        without body, and that other ETags get the full response
+
+        Raise:
+            AssertionError: If the status code or body do not match
+
+        """
+        for name in ['overview', 'advice']:
+            etag = self.client.get(f'/{name}').headers['ETag']
+            response = self.client.get(f'/{name}', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b'')
+            self.assertEqual(response.headers['ETag'], etag)
+            response = self.client.get(f'/{name}', headers={'If-None-Match': '"stale"'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_data(), self.expected(name))
+
+if __name__ == "__main__":
+    unittest.main()
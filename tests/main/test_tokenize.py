@@ -0,0 +1,99 @@
+"""Test incremental tokenization"""
+import json
+import pathlib
+import unittest
+from unittest import mock
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from app.utils import estimate # pylint: disable=import-error,wrong-import-order
+from app.utils.registry import registry # pylint: disable=import-error,wrong-import-order
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+content = mock_data['content']
+paragraphs = [content[:300], content[300:1200], content[1200:]]
+
+class TestTokenize(unittest.TestCase):
+    """Test case for incremental tokenization"""
+
+    def segmented(self) -> int:
+        """Returns the number of texts segmented so far"""
+        return registry.get('segmentor').stats()['inputs']
+
+    def test(self) -> None:
+        """Tests re-tokenization of edited content
+
+        Checks that only the edited paragraph is segmented again if
+        paragraphs are enabled, and that the tokens match a tokenization
+        without cache
+
+        Raise:
+            AssertionError: If tokens or segmented texts do not match
+
+        """
+        estimate.token_cache.clear()
+        project = {**mock_data, 'content': '\n'.join(paragraphs)}
+        edited = {**project, 'content': '\n'.join([paragraphs[0], '全新的段落。', paragraphs[2]])}
+        with mock.patch.object(estimate, 'TOKENIZE_PARAGRAPHS', True):
+            estimate.tokenize([project])
+            start = self.segmented()
+            tokens = estimate.tokenize([edited])[0]
+            self.assertEqual(self.segmented() - start, 1)
+            estimate.token_cache.clear()
+            self.assertEqual(tokens, estimate.tokenize([edited])[0])
+
+    def test_paragraphs_whole_document(self) -> None:
+        """Tests paragraph tokens against the whole document
+
+        Checks that the tokens stitched from the paragraphs of content
+        with line breaks match segmenting the whole document at once
+
+        Raise:
+            AssertionError: If tokens do not match
+
+        """
+        estimate.token_cache.clear()
+        project = {**mock_data, 'content': '\n'.join(paragraphs)}
+        expected = estimate.preprocessor.preprocess(
+            registry.get('segmentor')([project['content']])[0])
+        with mock.patch.object(estimate, 'TOKENIZE_PARAGRAPHS', True):
+            tokens = estimate.tokenize([project])[0]
+        self.assertGreater(len(estimate.split_paragraphs(project['content'])), 1)
+        self.assertEqual(tokens['content'], expected)
+
+    def test_whole_text(self) -> None:
+        """Tests tokenization without paragraphs
+
+        Checks that content is segmented as one text by default, with the
+        same tokens as segmenting the whole document
+
+        Raise:
+            AssertionError: If tokens do not match
+
+        """
+        estimate.token_cache.clear()
+        project = {**mock_data, 'content': '\n'.join(paragraphs)}
+        expected = estimate.preprocessor.preprocess(
+            registry.get('segmentor')([project['content']])[0])
+        start = self.segmented()
+        tokens = estimate.tokenize([project])[0]
+        self.assertEqual(self.segmented() - start, len(estimate.COLS))
+        self.assertEqual(tokens['content'], expected)
+
+    def test_split_paragraphs(self) -> None:
+        """Tests paragraph splitting
+
+        Checks that blank lines are dropped
+
+        Raise:
+            AssertionError: If paragraphs do not match
+
+        """
+        self.assertEqual(estimate.split_paragraphs('a\n\r\n b\n \n'), ['a', ' b'])
+        self.assertEqual(estimate.split_paragraphs(''), [])
+
+if __name__ == "__main__":
+    unittest.main()
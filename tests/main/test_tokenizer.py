@@ -0,0 +1,50 @@
+"""Test tokenization process pool"""
+import json
+import pathlib
+import unittest
+from . import TestAbstractClass # pylint: disable=unused-import
+
+from ckip_transformers.nlp import CkipWordSegmenter # pylint: disable=wrong-import-order
+from app.utils.preprocessor import Preprocessor # pylint: disable=import-error,wrong-import-order
+from app.utils.tokenizer import TokenizerPool # pylint: disable=import-error,wrong-import-order
+
+FILE_PATH = pathlib.Path(__file__).parent.resolve()
+
+with open(FILE_PATH / '../../mock_data/estimation_request.json', 'r', encoding='utf-8') as file:
+    mock_data = json.load(file)
+
+class TestTokenizerPool(unittest.TestCase):
+    """Test case for tokenization process pool"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.pool = TokenizerPool(2, min_chunk_size=2)
+        cls.pool.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.pool.shutdown()
+
+    def test(self) -> None:
+        """Tests tokens of the pool
+
+        Checks that the tokens are the same as tokenizing in process,
+        in the order of texts
+
+        Raise:
+            AssertionError: If the tokens do not match
+
+        """
+        texts = [mock_data['title'], mock_data['description']] + mock_data['content'].split('\n')
+        texts = [t for t in texts if t.strip()]
+        preprocessor = Preprocessor()
+        expected = [
+            preprocessor.preprocess(s)
+            for s in CkipWordSegmenter(level=3)(texts, show_progress=False)
+        ]
+        for size in [1, 2, 3, len(texts)]:
+            self.assertEqual(self.pool(texts[:size]), expected[:size])
+        self.assertEqual(self.pool([]), [])
+
+if __name__ == "__main__":
+    unittest.main()